@@ -1,35 +1,156 @@
 import pygame
-from constants import FONT
+import assets
+from text_cache import get_glyph_atlas, GlyphAtlas
 
+# constants
+RISE_SPEED = 20  # pixels per second
+LIFETIME = 1500  # ms
+MAX_ACTION_TEXTS = 32  # texts on screen at once; the oldest is reused beyond that
 
-class ActionText(pygame.sprite.Sprite):
-    def __init__(self, x: int, y: int, action_text: str, colour: tuple[int, int, int], delay: int):
+
+class ActionText:
+    """
+    A floating text rising above a fighter, such as damage or healing. Texts are
+    pooled by ActionTextPool and reused rather than created per event.
+
+    Attributes:
+        image (pygame.Surface | None): Pre-rendered label, or None for numbers.
+        atlas (GlyphAtlas | None): Glyphs numbers are drawn from, or None for labels.
+        text (str): Text shown.
+        left (int): X-coordinate of the left of the text.
+        start_y (int): Y-coordinate of the top of the text before it rises.
+        timer (int): Milliseconds since the text appeared, negative while delayed.
+    """
+
+    __slots__ = ("image", "atlas", "text", "left", "start_y", "timer")
+
+    def __init__(self):
+        self.image: pygame.Surface | None = None
+        self.atlas: GlyphAtlas | None = None
+        self.text: str = ""
+        self.left: int = 0
+        self.start_y: int = 0
+        self.timer: int = 0
+
+    def draw(self, screen: pygame.Surface) -> pygame.Rect:
+        """
+        Draws the text at its current height.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+
+        Returns:
+            pygame.Rect: Region covered by the text.
+        """
+        y = self.start_y - RISE_SPEED * self.timer // 1000
+        if self.image is not None:
+            return screen.blit(self.image, (self.left, y))
+        return self.atlas.draw(screen, self.text, (self.left, y))
+
+
+class ActionTextPool:
+    """
+    Fixed-size pool of the action texts shown during battles.
+
+    Numbers are drawn from glyph atlases and labels are rendered once and kept, so
+    showing a text never renders or allocates a surface. Texts are updated and
+    drawn in a single pass, oldest first so newer texts are drawn on top. Once
+    every text is in use, the oldest one is reused.
+
+    Attributes:
+        capacity (int): Maximum number of texts shown at once.
+    """
+
+    def __init__(self, capacity: int = MAX_ACTION_TEXTS):
+        self.capacity: int = capacity
+        self._free: list[ActionText] = [ActionText() for _ in range(capacity)]
+        self._active: list[ActionText] = []  # oldest first
+        self._labels: dict[tuple, pygame.Surface] = {}
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def prepare(self, text: str, colour) -> tuple[pygame.Surface | None, GlyphAtlas]:
         """
-        Initializes the ActionText sprite.
+        Gets ready to draw a text: numbers use the glyph atlas of their colour and
+        anything else is rendered once and kept. Called ahead of a battle for the
+        labels it can show, so they are never rendered mid-battle.
+
+        Args:
+            text (str): Text to show.
+            colour (tuple[int, int, int]): RGB colour of the text.
+
+        Returns:
+            tuple[pygame.Surface | None, GlyphAtlas]: Rendered label, or None if the
+                text is drawn from the atlas, and the atlas.
+        """
+        atlas = get_glyph_atlas(assets.FONT, colour, True)
+        if atlas.supports(text):
+            return None, atlas
+
+        image = self._labels.get((text, colour))
+        if image is None:
+            image = self._labels[(text, colour)] = assets.FONT.render(
+                text, True, colour
+            )
+        return image, atlas
+
+    def show(self, x: int, y: int, text: str, colour, delay: int = 0) -> None:
+        """
+        Shows a text centred on a point, reusing the oldest text if the pool is full.
 
         Args:
             x (int): X-coordinate for the center of the text.
             y (int): Y-coordinate for the center of the text.
-            action_text (str): Text to display.
-            colour (Tuple[int, int, int]): RGB colour for the text.
-            delay (int): Number of frames to delay before displaying the text.
+            text (str): Text to display.
+            colour (tuple[int, int, int]): RGB colour for the text.
+            delay (int): Milliseconds to wait before displaying the text.
         """
-        super().__init__()
-        self.image = FONT.render(action_text, True, colour)
-        self.rect = self.image.get_rect(center=(x, y))
-        self.counter: int = -delay  # start at negative counter to use the delay
-        self.delay: int = delay
+        action_text = self._free.pop() if self._free else self._active.pop(0)
+        image, atlas = self.prepare(text, colour)
+        width, height = image.get_size() if image else atlas.get_size(text)
 
-    def update(self) -> None:
+        action_text.image = image
+        action_text.atlas = atlas
+        action_text.text = text
+        action_text.left = int(x) - width // 2
+        action_text.start_y = int(y) - height // 2
+        action_text.timer = -delay  # start at negative timer to use the delay
+        self._active.append(action_text)
+
+    def update(self, dt: int) -> None:
         """
-        Updates the position of the action text; moves it upwards then removes it after a set time.
+        Moves every text upwards and frees those that have been shown long enough.
+
+        Args:
+            dt (int): Milliseconds since the previous update.
+        """
+        active = self._active
+        kept = 0
+        for action_text in active:
+            action_text.timer += dt
+            if action_text.timer > LIFETIME:
+                self._free.append(action_text)
+            else:
+                active[kept] = action_text
+                kept += 1
+        del active[kept:]
+
+    def draw(self, screen: pygame.Surface) -> list[pygame.Rect]:
+        """
+        Draws every text that isn't waiting on its delay.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+
+        Returns:
+            list[pygame.Rect]: Regions of the screen that were drawn.
         """
-        self.counter += 1
-        if self.counter >= 0:
-            self.rect.y -= 2
-        
-        if self.counter > 15:
-            self.kill()
-        
-        
+        return [
+            action_text.draw(screen)
+            for action_text in self._active
+            if action_text.timer >= 0
+        ]
+
 
+ACTION_TEXTS = ActionTextPool()
@@ -1,54 +1,71 @@
+import os
 import pygame
-from spritesheet import Spritesheet
+from types import MappingProxyType
+from typing import Mapping, Sequence
+from spritesheet import Spritesheet, Atlas
+from frame_cache import FRAME_CACHE, CachedFrame
 
 # constants
 FRAME_WIDTH = 250
 FRAME_HEIGHT = 300
-ANIMATION_SPEED = 10
+ANIMATION_SPEED = 10  # default frames per second
+ATLAS_IMAGE = "graphics/atlas.png"
+ATLAS_INDEX = "graphics/atlas.bin"
 
 
 class Animation:
     def __init__(
         self,
-        spritesheet: Spritesheet,
-        frame_names: list[str],
+        frames: Sequence[pygame.Surface],
         frame_width: int,
         frame_height: int,
+        fps: int = ANIMATION_SPEED,
+        name: str = "",
+        action: str = "",
     ):
         """
         Initializes the Animation object.
 
+        Animations only store frames and are shared between fighters, so the
+        playback position lives in an AnimationPlayback owned by each user.
+
         Args:
-            spritesheet (Spritesheet): Spritesheet containing the animation frames.
-            frame_names (list[str]): List of frame to be used in the animation.
+            frames (Sequence[pygame.Surface]): Fixed-size frames of the animation.
             frame_width (int): Width of each frame.
             frame_height (int): Height of each frame.
+            fps (int): Playback speed in frames per second. Defaults to ANIMATION_SPEED.
+            name (str): Name of the character, used to key cached frames.
+            action (str): Action the animation shows, used to key cached frames.
         """
-        self.frames = [spritesheet.parse_sprite(name) for name in frame_names]
+        self.frames: tuple[pygame.Surface, ...] = tuple(frames)
         self.frame_width: int = frame_width
         self.frame_height: int = frame_height
-        self.current_frame: int = 0
-        self.animation_speed: int = ANIMATION_SPEED
-        self.clock = pygame.time.Clock()
+        self.fps: int = fps
+        self.name: str = name
+        self.action: str = action
+
+    @property
+    def duration(self) -> float:
+        """
+        Returns the time one full cycle of the animation takes.
+
+        Returns:
+            float: Duration of the animation in milliseconds.
+        """
+        return len(self.frames) * 1000 / self.fps
 
-    def get_current_frame(self, scale: float = 1) -> pygame.Surface:
+    def get_frame(self, index: int, scale: float = 1) -> CachedFrame:
         """
-        Gets the current, scaled frame of the animation.
+        Gets a scaled frame of the animation from the shared frame cache.
 
         Args:
+            index (int): Index of the frame.
             scale (float): Scale for the frame. Defaults to 1.
 
         Returns:
-            pygame.Surface: The current animation frame.
+            CachedFrame: The requested animation frame, trimmed to its visible pixels.
         """
-        frame = self.frames[self.current_frame]
-        if scale != 1:
-            frame = pygame.transform.scale(
-                frame, (int(self.frame_width * scale), int(self.frame_height * scale))
-            )
-        self.current_frame = (self.current_frame + 1) % len(self.frames)
-        self.clock.tick(self.animation_speed)
-        return frame
+        return FRAME_CACHE.get(self, index, scale)
 
     def get_frame_count(self) -> int:
         """
@@ -59,179 +76,442 @@ class Animation:
         """
         return len(self.frames)
 
-    def get_last_death_frame(self, scale: float = 1) -> pygame.Surface:
+
+class AnimationPlayback:
+    """
+    Playback cursor for a shared Animation, owned by a single fighter or screen.
+
+    Attributes:
+        animation (Animation): Animation currently being played, or None.
+        frame_index (int): Index of the frame that is shown next.
+        elapsed (int): Milliseconds spent playing the current animation.
+        loop (bool): Whether playback wraps around or holds the last frame.
+    """
+
+    __slots__ = ("animation", "frame_index", "elapsed", "loop")
+
+    def __init__(self):
+        self.animation: Animation | None = None
+        self.frame_index: int = 0
+        self.elapsed: int = 0
+        self.loop: bool = True
+
+    @property
+    def finished(self) -> bool:
+        """
+        Returns whether the current animation has played through at least once.
+
+        Returns:
+            bool: True once a full cycle has elapsed, False otherwise.
+        """
+        return self.animation is not None and self.elapsed >= self.animation.duration
+
+    def play(self, animation: Animation, loop: bool = True) -> None:
         """
-        Gets the last scaled frame of the death animation.
+        Switches to the given animation, restarting it if it was not already playing.
+
+        Args:
+            animation (Animation): Animation to play.
+            loop (bool): Whether the animation repeats. Defaults to True.
+        """
+        if animation is not self.animation:
+            self.restart(animation, loop)
+        self.loop = loop
+
+    def restart(self, animation: Animation, loop: bool = True) -> None:
+        """
+        Plays the given animation from its first frame.
+
+        Args:
+            animation (Animation): Animation to play.
+            loop (bool): Whether the animation repeats. Defaults to True.
+        """
+        self.animation = animation
+        self.frame_index = 0
+        self.elapsed = 0
+        self.loop = loop
+
+    def advance(self, dt: int) -> None:
+        """
+        Advances playback by the elapsed game time, wrapping or holding the last
+        frame depending on the loop mode.
+
+        Args:
+            dt (int): Milliseconds since the previous update.
+        """
+        if self.animation is None:
+            return
+
+        self.elapsed += dt
+        frame = int(self.elapsed * self.animation.fps // 1000)
+        frame_count = self.animation.get_frame_count()
+        if self.loop:
+            self.frame_index = frame % frame_count
+        else:
+            self.frame_index = min(frame, frame_count - 1)
+
+    def get_frame(self, scale: float = 1) -> CachedFrame:
+        """
+        Gets the frame under the cursor without advancing it.
 
         Args:
             scale (float): Scale for the frame. Defaults to 1.
 
         Returns:
-            pygame.Surface: Last frame of the death animation.
+            CachedFrame: The current animation frame.
         """
-        frame = self.frames[-1]
-        if scale != 1:
-            frame = pygame.transform.scale(
-                frame, (int(self.frame_width * scale), int(self.frame_height * scale))
-            )
-        return frame
+        return self.animation.get_frame(self.frame_index, scale)
+
+
+def generate_frame_names(count: int, reverse: bool = False) -> list[str]:
+    """
+    Generates a list of frame filenames.
+
+    Args:
+        count (int): Number of frames.
+        reverse (bool): Whether to reverse the frame order. Defaults to False.
+
+    Returns:
+        list[str]: List of frames.
+    """
+    frames = [f"{i}.png" for i in range(1, count + 1)]
+    return frames[::-1] if reverse else frames
+
+
+PLAYER_CHARACTERS = ["berserker", "brute", "huntress", "rogue", "warrior"]
+
+CHARACTER_FRAMES = {
+    # players
+    "berserker": {
+        "attack": generate_frame_names(7),
+        "death": generate_frame_names(7),
+        "hurt": generate_frame_names(3),
+        "idle": generate_frame_names(10),
+        "special": generate_frame_names(8),
+        "walk": generate_frame_names(8),
+    },
+    "brute": {
+        "attack": generate_frame_names(7),
+        "death": generate_frame_names(11),
+        "hurt": generate_frame_names(4),
+        "idle": generate_frame_names(11),
+        "special": generate_frame_names(7),
+        "walk": generate_frame_names(8),
+    },
+    "huntress": {
+        "attack": generate_frame_names(6),
+        "death": generate_frame_names(10),
+        "hurt": generate_frame_names(3),
+        "idle": generate_frame_names(10),
+        "special": generate_frame_names(6),
+        "walk": generate_frame_names(8),
+    },
+    "rogue": {
+        "attack": generate_frame_names(4),
+        "death": generate_frame_names(6),
+        "hurt": generate_frame_names(4),
+        "idle": generate_frame_names(8),
+        "special": generate_frame_names(4),
+        "walk": generate_frame_names(8),
+    },
+    "warrior": {
+        "attack": generate_frame_names(4),
+        "death": generate_frame_names(9),
+        "hurt": generate_frame_names(3),
+        "idle": generate_frame_names(10),
+        "special": generate_frame_names(5),
+        "walk": generate_frame_names(6),
+    },
+    # enemies
+    "witch": {
+        "attack": generate_frame_names(13, reverse=True),
+        "death": generate_frame_names(18, reverse=True),
+        "hurt": generate_frame_names(3, reverse=True),
+        "idle": generate_frame_names(10, reverse=True),
+        "walk": generate_frame_names(8, reverse=True),
+    },
+    "fireworm": {
+        "attack": generate_frame_names(16, reverse=True),
+        "death": generate_frame_names(8, reverse=True),
+        "hurt": generate_frame_names(3, reverse=True),
+        "idle": generate_frame_names(9, reverse=True),
+        "walk": generate_frame_names(9, reverse=True),
+    },
+    "golem": {
+        "attack": generate_frame_names(11, reverse=True),
+        "death": generate_frame_names(13, reverse=True),
+        "hurt": generate_frame_names(4, reverse=True),
+        "idle": generate_frame_names(8, reverse=True),
+        "walk": generate_frame_names(10, reverse=True),
+    },
+    # bosses
+    "bringer": {
+        "attack": generate_frame_names(10),
+        "death": generate_frame_names(11),
+        "hurt": generate_frame_names(3),
+        "idle": generate_frame_names(8),
+        "walk": generate_frame_names(8),
+    },
+    "oldking": {
+        "attack": generate_frame_names(4, reverse=True),
+        "death": generate_frame_names(6, reverse=True),
+        "hurt": generate_frame_names(4, reverse=True),
+        "idle": generate_frame_names(8, reverse=True),
+        "walk": generate_frame_names(8, reverse=True),
+    },
+    "mage": {
+        "attack": generate_frame_names(8, reverse=True),
+        "death": generate_frame_names(7, reverse=True),
+        "hurt": generate_frame_names(3, reverse=True),
+        "idle": generate_frame_names(8, reverse=True),
+        "walk": generate_frame_names(8, reverse=True),
+    },
+}
+
+
+def get_spritesheet_path(name: str, action: str) -> str:
+    """
+    Builds the path of the spritesheet image for a character action.
+
+    Args:
+        name (str): Name of the character.
+        action (str): Action of the character.
+
+    Returns:
+        str: Path to the spritesheet image.
+    """
+    folder = "characters" if name in PLAYER_CHARACTERS else "enemies"
+    return f"graphics/{folder}/{name}/{name}_{action}.png"
+
+
+def load_spritesheet_frames(
+    name: str,
+    action: str,
+    image: pygame.Surface | None = None,
+    data: dict | None = None,
+) -> list[pygame.Surface]:
+    """
+    Loads the outlined, fixed-size frames of a character action from its spritesheet.
+
+    Args:
+        name (str): Name of the character.
+        action (str): Action of the character.
+        image (pygame.Surface): Spritesheet image already decoded, if any.
+        data (dict): Spritesheet metadata already read, if any.
+
+    Returns:
+        list[pygame.Surface]: Frames of the action, in playback order.
+    """
+    spritesheet = Spritesheet(
+        get_spritesheet_path(name, action), FRAME_WIDTH, FRAME_HEIGHT, image, data
+    )
+    return [
+        spritesheet.parse_sprite(frame_name)
+        for frame_name in CHARACTER_FRAMES[name][action]
+    ]
+
+
+def atlas_is_current() -> bool:
+    """
+    Checks whether the compiled sprite atlas exists and is newer than every spritesheet.
+
+    Returns:
+        bool: True if the atlas should be used, False otherwise.
+    """
+    if not os.path.exists(ATLAS_INDEX) or not os.path.exists(ATLAS_IMAGE):
+        return False
+
+    built = min(os.path.getmtime(ATLAS_INDEX), os.path.getmtime(ATLAS_IMAGE))
+    for name, actions in CHARACTER_FRAMES.items():
+        for action in actions:
+            path = get_spritesheet_path(name, action)
+            metadata = path.replace("png", "json")
+            if max(os.path.getmtime(path), os.path.getmtime(metadata)) > built:
+                return False
+    return True
+
+
+def load_atlas() -> Atlas | None:
+    """
+    Loads the compiled sprite atlas if it exists and is newer than every spritesheet.
+
+    Returns:
+        Atlas | None: Loaded atlas, or None if the spritesheets should be used instead.
+    """
+    if not atlas_is_current():
+        return None
+
+    try:
+        return Atlas(ATLAS_IMAGE, ATLAS_INDEX)
+    except ValueError:  # built by an older version of build_atlas.py
+        return None
+
+
+def load_animation(
+    name: str,
+    action: str,
+    atlas: Atlas | None,
+    image: pygame.Surface | None = None,
+    data: dict | None = None,
+) -> Animation:
+    """
+    Loads one character action, from the atlas if it has the frames, otherwise
+    from the spritesheet.
+
+    Args:
+        name (str): Name of the character.
+        action (str): Action of the character.
+        atlas (Atlas | None): Compiled sprite atlas, if it is up to date.
+        image (pygame.Surface): Spritesheet image already decoded, if any.
+        data (dict): Spritesheet metadata already read, if any.
+
+    Returns:
+        Animation: Animation of the action.
+    """
+    if atlas is not None and atlas.has_frames(name, action):
+        frames = atlas.get_frames(name, action)
+        fps = atlas.get_fps(name, action)
+    else:
+        frames = load_spritesheet_frames(name, action, image, data)
+        fps = ANIMATION_SPEED
+
+    return Animation(
+        frames,
+        FRAME_WIDTH,
+        FRAME_HEIGHT,
+        fps=fps,
+        name=name,
+        action=action,
+    )
 
 
 def load_character_animations() -> dict[str, dict[str, Animation]]:
     """
     Loads and returns a dictionary of character animations.
 
+    Frames come from the compiled atlas when it is up to date (see build_atlas.py),
+    otherwise every spritesheet is decoded and outlined on the fly.
+
     Returns:
         dict: Dictionary where keys are character names and values are dictionaries of animations.
     """
-    animations = {}
+    atlas = load_atlas()
+    return {
+        name: {action: load_animation(name, action, atlas) for action in actions}
+        for name, actions in CHARACTER_FRAMES.items()
+    }
+
+
+class AnimationRegistry(Mapping[str, Mapping[str, Animation]]):
+    """
+    Read-only mapping of character names to their action animations, shared by
+    every fighter and screen so spritesheets are only decoded once per process.
+
+    Each character is loaded the first time it is looked up, unless the preloader
+    has already added it.
+    """
+
+    def __init__(self):
+        self._characters: dict[str, Mapping[str, Animation]] = {}
+        self._atlas: Atlas | None = None
+        self._atlas_loaded: bool = False
+
+    def __getitem__(self, name: str) -> Mapping[str, Animation]:
+        actions = self._characters.get(name)
+        if actions is None:
+            if name not in CHARACTER_FRAMES:
+                raise KeyError(name)
+            atlas = self.get_atlas()
+            actions = self.add(
+                name,
+                {
+                    action: load_animation(name, action, atlas)
+                    for action in CHARACTER_FRAMES[name]
+                },
+            )
+        return actions
 
-    def load_spritesheet(folder: str, name: str, action: str) -> Spritesheet:
+    def __iter__(self):
+        return iter(CHARACTER_FRAMES)
+
+    def __len__(self) -> int:
+        return len(CHARACTER_FRAMES)
+
+    def is_loaded(self, name: str) -> bool:
         """
-        Loads a spritesheet for a specific character action.
+        Checks whether a character's animations have been loaded.
 
         Args:
-            folder (str): Folder containing the character spritesheets.
             name (str): Name of the character.
-            action (str): Action of the character.
 
         Returns:
-            Spritesheet: Loaded spritesheet.
+            bool: True if looking the character up won't load anything.
         """
-        return Spritesheet(
-            f"graphics/{folder}/{name}/{name}_{action}.png", FRAME_WIDTH, FRAME_HEIGHT
-        )
+        return name in self._characters
 
-    def create_animation_dict(
-        name: str, frames_dict: dict[str, list[str]]
-    ) -> dict[str, Animation]:
+    def add(self, name: str, actions: dict[str, Animation]) -> Mapping[str, Animation]:
         """
-        Creates a dictionary of animations for a character.
+        Adds a character loaded elsewhere, keeping the first copy if it was
+        already loaded.
 
         Args:
             name (str): Name of the character.
-            frames_dict (dict[str, list[str]]): Dictionary where keys are actions and values are lists of frames.
+            actions (dict[str, Animation]): Animation of every action.
 
         Returns:
-            dict: Dictionary where keys are actions and values are Animation objects.
-        """
-        return {
-            action: Animation(
-                load_spritesheet(folder, name, action),
-                frames,
-                FRAME_WIDTH,
-                FRAME_HEIGHT,
-            )
-            for action, frames in frames_dict.items()
-        }
+            Mapping[str, Animation]: Animations registered for the character.
+        """
+        return self._characters.setdefault(name, MappingProxyType(actions))
 
-    def generate_frame_names(count: int, reverse: bool = False) -> list[str]:
+    def get_atlas(self) -> Atlas | None:
         """
-        Generates a list of frame filenames.
+        Returns the compiled sprite atlas, loading it on first use.
+
+        Returns:
+            Atlas | None: Atlas, or None if it is missing or out of date.
+        """
+        if not self._atlas_loaded:
+            self.set_atlas(load_atlas())
+        return self._atlas
+
+    def set_atlas(self, atlas: Atlas | None) -> None:
+        """
+        Sets the atlas characters are loaded from, e.g. once the preloader has
+        loaded it, unless one was already loaded.
 
         Args:
-            count (int): Number of frames.
-            reverse (bool): Whether to reverse the frame order. Defaults to False.
+            atlas (Atlas | None): Atlas, or None if it is missing or out of date.
+        """
+        if not self._atlas_loaded:
+            self._atlas = atlas
+            self._atlas_loaded = True
 
-        Returns:
-            list[str]: List of frames.
-        """
-        frames = [f"{i}.png" for i in range(1, count + 1)]
-        return frames[::-1] if reverse else frames
-
-    character_animations = {
-        # players
-        "berserker": {
-            "attack": generate_frame_names(7),
-            "death": generate_frame_names(7),
-            "hurt": generate_frame_names(3),
-            "idle": generate_frame_names(10),
-            "special": generate_frame_names(8),
-            "walk": generate_frame_names(8),
-        },
-        "brute": {
-            "attack": generate_frame_names(7),
-            "death": generate_frame_names(11),
-            "hurt": generate_frame_names(4),
-            "idle": generate_frame_names(11),
-            "special": generate_frame_names(7),
-            "walk": generate_frame_names(8),
-        },
-        "huntress": {
-            "attack": generate_frame_names(6),
-            "death": generate_frame_names(10),
-            "hurt": generate_frame_names(3),
-            "idle": generate_frame_names(10),
-            "special": generate_frame_names(6),
-            "walk": generate_frame_names(8),
-        },
-        "rogue": {
-            "attack": generate_frame_names(4),
-            "death": generate_frame_names(6),
-            "hurt": generate_frame_names(4),
-            "idle": generate_frame_names(8),
-            "special": generate_frame_names(4),
-            "walk": generate_frame_names(8),
-        },
-        "warrior": {
-            "attack": generate_frame_names(4),
-            "death": generate_frame_names(9),
-            "hurt": generate_frame_names(3),
-            "idle": generate_frame_names(10),
-            "special": generate_frame_names(5),
-            "walk": generate_frame_names(6),
-        },
-        # enemies
-        "witch": {
-            "attack": generate_frame_names(13, reverse=True),
-            "death": generate_frame_names(18, reverse=True),
-            "hurt": generate_frame_names(3, reverse=True),
-            "idle": generate_frame_names(10, reverse=True),
-            "walk": generate_frame_names(8, reverse=True),
-        },
-        "fireworm": {
-            "attack": generate_frame_names(16, reverse=True),
-            "death": generate_frame_names(8, reverse=True),
-            "hurt": generate_frame_names(3, reverse=True),
-            "idle": generate_frame_names(9, reverse=True),
-            "walk": generate_frame_names(9, reverse=True),
-        },
-        "golem": {
-            "attack": generate_frame_names(11, reverse=True),
-            "death": generate_frame_names(13, reverse=True),
-            "hurt": generate_frame_names(4, reverse=True),
-            "idle": generate_frame_names(8, reverse=True),
-            "walk": generate_frame_names(10, reverse=True),
-        },
-        # bosses
-        "bringer": {
-            "attack": generate_frame_names(10),
-            "death": generate_frame_names(11),
-            "hurt": generate_frame_names(3),
-            "idle": generate_frame_names(8),
-            "walk": generate_frame_names(8),
-        },
-        "oldking": {
-            "attack": generate_frame_names(4, reverse=True),
-            "death": generate_frame_names(6, reverse=True),
-            "hurt": generate_frame_names(4, reverse=True),
-            "idle": generate_frame_names(8, reverse=True),
-            "walk": generate_frame_names(8, reverse=True),
-        },
-        "mage": {
-            "attack": generate_frame_names(8, reverse=True),
-            "death": generate_frame_names(7, reverse=True),
-            "hurt": generate_frame_names(3, reverse=True),
-            "idle": generate_frame_names(8, reverse=True),
-        },
-    }
 
-    for name, frames in character_animations.items():
-        folder = (
-            "characters"
-            if name in ["berserker", "brute", "huntress", "rogue", "warrior"]
-            else "enemies"
-        )
-        animations[name] = create_animation_dict(name, frames)
+def get_animations() -> AnimationRegistry:
+    """
+    Returns the process-wide animation registry.
+
+    Every fighter and screen shares this single read-only copy of the frame
+    data, and characters are loaded on first lookup.
+
+    Returns:
+        AnimationRegistry: Read-only mapping of character names to their action animations.
+    """
+    return ANIMATIONS
+
+
+def get_animation(name: str, action: str) -> Animation:
+    """
+    Looks up a single animation in the shared registry.
+
+    Args:
+        name (str): Name of the character, case-insensitive.
+        action (str): Action of the animation (e.g. "idle").
+
+    Returns:
+        Animation: Shared animation for the character action.
+    """
+    return ANIMATIONS[name.lower()][action]
+
 
-    return animations
+ANIMATIONS = AnimationRegistry()
@@ -0,0 +1,122 @@
+"""
+Lazily created display, clock, fonts and images.
+
+Importing this module does nothing. Each asset is created the first time it is
+used, e.g. `assets.SCREEN` opens the window and `assets.SWORD` loads the sword
+icon (opening the window first, as images are converted to its pixel format).
+Modules should `import assets` and look assets up when they need them, rather
+than `from assets import ...` at import time, which would load them straight away.
+"""
+
+import time
+from typing import Callable
+import pygame
+from constants import WIDTH, HEIGHT, CAPTION, FONT_NAME, FONT_SIZES, IMAGES
+
+# time in ms taken to create each asset, in load order
+load_times: dict[str, float] = {}
+
+
+def create_screen() -> pygame.Surface:
+    """
+    Initialises pygame and opens the game window.
+
+    Returns:
+        pygame.Surface: Display surface.
+    """
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(CAPTION)
+    return screen
+
+
+def create_font(size: int) -> pygame.font.Font:
+    """
+    Creates the game font at a point size.
+
+    Args:
+        size (int): Point size.
+
+    Returns:
+        pygame.font.Font: Font.
+    """
+    pygame.font.init()
+    return pygame.font.SysFont(FONT_NAME, size)
+
+
+def ensure_display() -> None:
+    """
+    Opens the game window if no display exists yet. Images can only be converted
+    to the display's pixel format once there is one.
+    """
+    if pygame.display.get_surface() is None:
+        get("SCREEN")
+
+
+def load_image(path: str) -> pygame.Surface:
+    """
+    Loads an image and converts it to the display's pixel format.
+
+    Args:
+        path (str): Path of the image.
+
+    Returns:
+        pygame.Surface: Image with per-pixel alpha.
+    """
+    ensure_display()
+    return pygame.image.load(path).convert_alpha()
+
+
+LOADERS: dict[str, Callable[[], object]] = {
+    "SCREEN": create_screen,
+    "CLOCK": pygame.time.Clock,
+    **{
+        name: (lambda size=size: create_font(size)) for name, size in FONT_SIZES.items()
+    },
+    **{name: (lambda path=path: load_image(path)) for name, path in IMAGES.items()},
+}
+
+
+def get(name: str, loader: Callable[[], object] | None = None):
+    """
+    Returns an asset, creating it on first use. Once created, the asset is also
+    stored as a module attribute, so later `assets.NAME` lookups are plain
+    attribute reads.
+
+    Args:
+        name (str): Name of the asset, a key of LOADERS.
+        loader (Callable[[], object]): Creates the asset instead of LOADERS[name],
+            e.g. from an image the preloader has already decoded.
+
+    Returns:
+        Display surface, clock, font or image.
+    """
+    asset = globals().get(name)
+    if asset is None:
+        if name in IMAGES:
+            ensure_display()  # timed as SCREEN, not as the image
+        start = time.perf_counter()
+        asset = (loader or LOADERS[name])()
+        load_times[name] = (time.perf_counter() - start) * 1000
+        globals()[name] = asset
+    return asset
+
+
+def __getattr__(name: str):
+    # only called for assets that haven't been created yet
+    if name in LOADERS:
+        return get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def report() -> list[str]:
+    """
+    Lists the assets created so far with the time each took, slowest first.
+
+    Returns:
+        list[str]: One line per asset.
+    """
+    return [
+        f"  {name:<10} {ms:>8.1f} ms"
+        for name, ms in sorted(load_times.items(), key=lambda item: -item[1])
+    ]
@@ -0,0 +1,517 @@
+"""
+Autoplay.
+
+Plays the game without a human: AutoplayController chooses each of the player's
+turns with an expectimax search over the attack, critical hit, double hit,
+healing and potion drop rolls, deepening it until a per-turn time budget runs
+out. Solved positions are kept in a transposition table for the whole battle, so
+later turns reuse the earlier searches.
+
+Run as a script, it plays whole games unattended, either in a window at normal
+speed for demos and kiosks, or headless and uncapped for soak tests.
+
+Usage:
+    python autoplay.py --games 0
+    python autoplay.py --games 100 --headless --seed 1
+"""
+
+import argparse
+import math
+import os
+import time
+from itertools import count
+import pygame
+import assets
+from combat import (
+    HEAL_AMOUNT,
+    USE_POTION,
+    CombatEngine,
+    Combatant,
+    damage_distribution,
+    heal_distribution,
+)
+from constants import CHARACTERS, FPS
+from game import Game, GameState, SIM_STEP
+from random_source import RNG, RandomSource
+from replay import FrameInput, SessionSummary, OVERLAY_KEY, ODDS_KEY
+
+# constants
+TURN_BUDGET = 100  # ms of search per player turn
+EXIT_DELAY = 3000  # ms the journey over screen is shown before exiting
+HEURISTIC_SCALE = 10  # HP of margin that moves the leaf estimate by about 25%
+TIE_TOLERANCE = 1e-12  # actions this close count as equal; attacking wins ties
+CHECK_INTERVAL = 1024  # positions searched between checks of the time budget
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search once its time budget has run out.
+    """
+
+
+class GameFinished(Exception):
+    """
+    Raised when an autoplayed game ends, with the state it ended in.
+    """
+
+    def __init__(self, summary: SessionSummary):
+        super().__init__(summary)
+        self.summary = summary
+
+
+class Expectimax:
+    """
+    Expectimax search of one battle from the start of the player's turn.
+
+    Player turns are max nodes over attacking each living enemy and drinking a
+    potion; attacks, enemy turns and potions are chance nodes over every roll.
+    Positions deeper than the search depth are scored by a heuristic, so the
+    search is deepened one round at a time until the budget runs out or the whole
+    battle fits in the tree. Like the battle solver, it plays the battle in rounds,
+    so every combatant must have the same speed.
+
+    Attributes:
+        enemies (list[Combatant]): Enemies of the battle being searched.
+        table (dict[tuple, tuple[int, float, bool]]): Transposition table: depth
+            searched, value and whether the value is exact, keyed by player HP,
+            potions and enemy HP at the start of the player's turn.
+        positions (int): Number of positions searched.
+    """
+
+    def __init__(self, player: Combatant, enemies: list[Combatant]):
+        self.enemies = enemies
+        self.table: dict[tuple, tuple[int, float, bool]] = {}
+        self.positions: int = 0
+        self._max_hp: int = player.max_hp
+        self._potion_chance: float = player.potion_chance / 100
+        self._player_damage = damage_distribution(
+            player.strength, player.crit_chance, player.double_chance
+        )
+        self._enemy_damage = [
+            damage_distribution(enemy.strength, enemy.crit_chance) for enemy in enemies
+        ]
+        self._heal = heal_distribution()
+        self._rounds: dict[tuple, list[tuple[int, float]]] = {}
+        self._mean_player_damage = sum(d * p for d, p in self._player_damage)
+        self._mean_enemy_damage = [
+            sum(d * p for d, p in dist) for dist in self._enemy_damage
+        ]
+        self._deadline: float = math.inf
+        self._exact: bool = True
+
+    def search(
+        self, hp: int, potions: int, enemy_hps: tuple[int, ...], budget: float
+    ) -> tuple[int, int]:
+        """
+        Finds the best action for the player, deepening the search one round at a
+        time. The first depth is always finished, whatever the budget.
+
+        Args:
+            hp (int): Player HP.
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+            budget (float): Milliseconds the search may take.
+
+        Returns:
+            tuple[int, int]: Index of the enemy to attack or USE_POTION, and the
+                depth in rounds of the last finished search.
+        """
+        deadline = time.perf_counter() + budget / 1000
+        action, searched = None, 0
+
+        for depth in count(1):
+            self._deadline = deadline if depth > 1 else math.inf
+            self._exact = True
+            try:
+                _, action = self.best_action(hp, potions, enemy_hps, depth)
+            except SearchTimeout:
+                break
+            searched = depth
+            if self._exact:  # the tree already reaches the end of the battle
+                break
+        return action, searched
+
+    def value(self, hp: int, potions: int, enemy_hps: tuple[int, ...], depth: int):
+        """
+        Scores the start of a player's turn, searching `depth` more rounds.
+
+        Args:
+            hp (int): Player HP.
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+            depth (int): Rounds left to search.
+
+        Returns:
+            float: Chance of winning, estimated at the search horizon.
+        """
+        self.positions += 1
+        if (
+            self.positions % CHECK_INTERVAL == 0
+            and time.perf_counter() > self._deadline
+        ):
+            raise SearchTimeout()
+
+        if not any(enemy_hps):
+            return 1.0
+
+        key = (hp, potions, enemy_hps)
+        entry = self.table.get(key)
+        if entry and (entry[2] or entry[0] >= depth):
+            self._exact = self._exact and entry[2]
+            return entry[1]
+
+        if depth == 0:
+            self._exact = False
+            return self.estimate(hp, potions, enemy_hps)
+
+        exact = self._exact
+        self._exact = True
+        value, _ = self.best_action(hp, potions, enemy_hps, depth)
+        self.table[key] = (depth, value, self._exact)
+        self._exact = exact and self._exact
+        return value
+
+    def best_action(
+        self, hp: int, potions: int, enemy_hps: tuple[int, ...], depth: int
+    ) -> tuple[float, int]:
+        """
+        Weighs every action of the player's turn.
+
+        Args:
+            hp (int): Player HP.
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+            depth (int): Rounds left to search, including this one.
+
+        Returns:
+            tuple[float, int]: Value of the best action and the action.
+        """
+        best, action = -1.0, None
+        for i, enemy_hp in enumerate(enemy_hps):
+            if enemy_hp <= 0:
+                continue
+            outcomes: dict[int, float] = {}
+            for damage, p in self._player_damage:
+                left = max(enemy_hp - damage, 0)
+                outcomes[left] = outcomes.get(left, 0.0) + p
+
+            win = 0.0
+            for left, p in outcomes.items():
+                after = enemy_hps[:i] + (left,) + enemy_hps[i + 1 :]
+                value = self.enemies_act(hp, potions, after, depth)
+                if left == 0 and self._potion_chance:  # a potion may drop
+                    dropped = self.enemies_act(hp, potions + 1, after, depth)
+                    value += self._potion_chance * (dropped - value)
+                win += p * value
+            if win > best + TIE_TOLERANCE:
+                best, action = win, i
+
+        if potions > 0 and hp < self._max_hp:
+            win = sum(
+                p
+                * self.enemies_act(
+                    min(hp + heal, self._max_hp), potions - 1, enemy_hps, depth
+                )
+                for heal, p in self._heal
+            )
+            if win > best + TIE_TOLERANCE:
+                best, action = win, USE_POTION
+        return best, action
+
+    def enemies_act(
+        self, hp: int, potions: int, enemy_hps: tuple[int, ...], depth: int
+    ) -> float:
+        """
+        Averages the attacks of every living enemy over the player's HP after them.
+
+        Args:
+            hp (int): Player HP.
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+            depth (int): Rounds left to search, including this one.
+
+        Returns:
+            float: Chance of winning, estimated at the search horizon.
+        """
+        if not any(enemy_hps):
+            return 1.0
+        alive = tuple(enemy_hp > 0 for enemy_hp in enemy_hps)
+        return sum(
+            p * self.value(hp_left, potions, enemy_hps, depth - 1)
+            for hp_left, p in self.enemy_round(hp, alive)
+        )
+
+    def enemy_round(self, hp: int, alive: tuple[bool, ...]) -> list[tuple[int, float]]:
+        """
+        Works out the player's HP after the living enemies attack in turn, leaving
+        out the rolls that kill the player. Cached, as every search meets the same
+        few rounds many times.
+
+        Args:
+            hp (int): Player HP before the enemies attack.
+            alive (tuple[bool, ...]): Whether each enemy is alive.
+
+        Returns:
+            list[tuple[int, float]]: Player HP and its probability.
+        """
+        key = (hp, alive)
+        outcomes = self._rounds.get(key)
+        if outcomes is None:
+            hps = {hp: 1.0}
+            for damage_dist, is_alive in zip(self._enemy_damage, alive):
+                if not is_alive:
+                    continue
+                after: dict[int, float] = {}
+                for before, p in hps.items():
+                    # enemies can roll negative damage, which raises the player's HP
+                    for damage, q in damage_dist:
+                        if damage < before:
+                            after[before - damage] = (
+                                after.get(before - damage, 0) + p * q
+                            )
+                hps = after
+            outcomes = self._rounds[key] = list(hps.items())
+        return outcomes
+
+    def estimate(self, hp: int, potions: int, enemy_hps: tuple[int, ...]) -> float:
+        """
+        Estimates the chance of winning at the search horizon from a race: the
+        damage the enemies deal on average while the player kills them in order,
+        against the player's HP and potions.
+
+        Args:
+            hp (int): Player HP.
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+
+        Returns:
+            float: Estimated chance of winning, between 0 and 1.
+        """
+        damage_taken = 0.0
+        attacks = 0
+        for enemy_hp, mean_damage in zip(enemy_hps, self._mean_enemy_damage):
+            if enemy_hp > 0:
+                attacks += math.ceil(enemy_hp / self._mean_player_damage)
+                damage_taken += mean_damage * (attacks - 1)
+
+        margin = hp + potions * HEAL_AMOUNT - damage_taken
+        return 1 / (1 + math.exp(-margin / HEURISTIC_SCALE))
+
+
+class AutoplayController:
+    """
+    Plays the player's side with an expectimax search, and presses the exit
+    button once the journey over screen has been shown for a while.
+
+    Attributes:
+        budget (float): Milliseconds of search per player turn.
+        exit_delay (int): Milliseconds of game time before pressing a button.
+        turns (int): Number of player turns played.
+        search_time (float): Total milliseconds spent searching.
+        max_depth (int): Deepest search finished, in rounds.
+    """
+
+    def __init__(self, budget: float = TURN_BUDGET, exit_delay: int = EXIT_DELAY):
+        self.budget: float = budget
+        self.exit_delay: int = exit_delay
+        self.turns: int = 0
+        self.search_time: float = 0.0
+        self.max_depth: int = 0
+        self._search: Expectimax | None = None
+        self._waited: int = 0
+
+    def choose_action(
+        self, engine: CombatEngine, clicked: bool, pos: tuple[int, int], potion_button
+    ) -> int:
+        """
+        Searches for the player's best action. Mouse input is ignored.
+
+        Args:
+            engine (CombatEngine): Battle being played.
+            clicked (bool): Whether the mouse was clicked.
+            pos (tuple[int, int]): Mouse position.
+            potion_button (PotionButton): Potion button object.
+
+        Returns:
+            int: Index of the enemy to attack, or USE_POTION.
+        """
+        if self._search is None or self._search.enemies is not engine.enemies:
+            self._search = Expectimax(engine.player, engine.enemies)
+
+        start = time.perf_counter()
+        action, depth = self._search.search(
+            engine.player.hp,
+            engine.player.potions,
+            tuple(enemy.hp for enemy in engine.enemies),
+            self.budget,
+        )
+        self.search_time += (time.perf_counter() - start) * 1000
+        self.turns += 1
+        self.max_depth = max(self.max_depth, depth)
+        return action
+
+    def press(self, button, clicked: bool, pos: tuple[int, int], dt: int) -> bool:
+        """
+        Presses the button once it has been waiting for exit_delay ms.
+
+        Args:
+            button (Button): Button waiting to be pressed.
+            clicked (bool): Whether the mouse was clicked.
+            pos (tuple[int, int]): Mouse position.
+            dt (int): Milliseconds of game time since the previous frame.
+
+        Returns:
+            bool: True if the button is pressed, False otherwise.
+        """
+        self._waited += dt
+        if self._waited < self.exit_delay:
+            return False
+        self._waited = 0
+        return True
+
+    def report(self) -> str:
+        """
+        Summarises the searches.
+
+        Returns:
+            str: Turns played, average search time and deepest search.
+        """
+        mean = self.search_time / self.turns if self.turns else 0.0
+        return (
+            f"{self.turns} turns searched, {mean:.1f} ms per turn,"
+            f" up to {self.max_depth} rounds deep"
+        )
+
+
+class UnattendedInput:
+    """
+    Input source for autoplayed games: never clicks, but still lets the window be
+    closed and the F3 and F4 overlays be toggled.
+
+    Attributes:
+        clock (pygame.time.Clock | None): Clock capping the frame rate, or None to
+            play as fast as possible with SIM_STEP ms per frame.
+        fps (int): Maximum frame rate when a clock is given.
+        frames (int): Number of frames read.
+        closed (bool): Whether the window has been closed.
+    """
+
+    def __init__(self, clock=None, fps: int = FPS):
+        self.clock = clock
+        self.fps: int = fps
+        self.frames: int = 0
+        self.closed: bool = False
+
+    def read(self) -> FrameInput:
+        """
+        Waits for the next frame, if capped, and collects the window events.
+
+        Returns:
+            FrameInput: Input of the frame.
+        """
+        dt = self.clock.tick(self.fps) if self.clock else SIM_STEP
+        quit = overlay = odds = False
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit = True
+            if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+                overlay = True
+            if event.type == pygame.KEYDOWN and event.key == ODDS_KEY:
+                odds = True
+
+        self.closed = self.closed or quit
+        self.frames += 1
+        return FrameInput(dt, False, quit, (0, 0), overlay, odds)
+
+    def close(self, summary: SessionSummary) -> None:
+        """
+        Ends the game.
+
+        Args:
+            summary (SessionSummary): State of the game when it ended.
+
+        Raises:
+            GameFinished: Always.
+        """
+        raise GameFinished(summary)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play the game unattended.")
+    parser.add_argument(
+        "--games", type=int, default=1, help="games to play, 0 to play forever"
+    )
+    parser.add_argument(
+        "--character",
+        choices=[character["name"] for character in CHARACTERS],
+        help="character to play (default: every character in turn)",
+    )
+    parser.add_argument("--seed", type=int, help="seed for reproducible games")
+    parser.add_argument(
+        "--budget", type=float, default=TURN_BUDGET, help="ms of search per turn"
+    )
+    parser.add_argument(
+        "--speed", type=int, default=1, help="fast-forward the game N times"
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="don't open a window or draw anything, and play as fast as possible",
+    )
+    parser.add_argument(
+        "--uncapped", action="store_true", help="play as fast as possible"
+    )
+    args = parser.parse_args()
+
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    RNG.reseed(args.seed)
+    names = [character["name"] for character in CHARACTERS]
+    uncapped = args.headless or args.uncapped
+    wins = 0
+
+    start = time.perf_counter()
+    for number in count(1) if args.games == 0 else range(1, args.games + 1):
+        character = (
+            names.index(args.character)
+            if args.character
+            else (number - 1) % len(CHARACTERS)
+        )
+        seed = RNG.randrange(2**32)
+        controller = AutoplayController(args.budget)
+        unattended = UnattendedInput(None if uncapped else assets.CLOCK)
+        game = Game(
+            character,
+            on_exit=None,
+            rng=RandomSource(seed),
+            input_source=unattended,
+            headless=args.headless,
+            speed=args.speed,
+            controller=controller,
+        )
+
+        try:
+            game.run()
+        except GameFinished as finished:
+            summary = finished.summary
+        won = game.game_state == GameState.GAME_OVER_PLAYER_WIN
+        wins += won
+        print(
+            f"game {number}: {names[character]} (seed {seed})"
+            f" {'won' if won else 'lost'} at level {summary.level}"
+            f" round {summary.round} with {summary.hp} HP and"
+            f" {summary.potions} potions after {summary.frames} frames;"
+            f" {controller.report()}"
+        )
+        if unattended.closed:
+            break
+
+    games = number
+    elapsed = time.perf_counter() - start
+    print(f"won {wins} of {games} games ({wins / games:.0%}) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
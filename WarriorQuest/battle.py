@@ -1,196 +1,288 @@
 import pygame
-from constants import SWORD
-from action_text import ActionText
+import assets
+from action_text import ACTION_TEXTS
+from combat import CombatEngine, CombatEvent, EventType, USE_POTION
+from fighter import Action
 
 
-# constants
-PLAYER_COOLDOWN = 20
-ENEMY_COOLDOWN = 25
+# constants (ms)
+PLAYER_COOLDOWN = 2000
+ENEMY_COOLDOWN = 2500
+LAST_ENEMY_COOLDOWN = ENEMY_COOLDOWN - 1000
+POTION_TEXT_DELAY = 1000
+DAMAGE_DELAY = 1000
 
-# sprite groups
-damage_text_group = pygame.sprite.Group()
-heal_text_group = pygame.sprite.Group()
-potion_text_group = pygame.sprite.Group()
-crit_text_group = pygame.sprite.Group()
+# action texts
+DAMAGE_COLOUR = (255, 0, 0)
+HEAL_COLOUR = (0, 255, 0)
+CRIT_COLOUR = (0, 0, 255)
+CRIT_TEXT = "Critical hit!"
+POTION_TEXT = "+1 Potion"
+
+
+class MouseController:
+    """
+    Plays the player's side from the mouse: clicking a living enemy attacks it and
+    clicking the potion button drinks a potion.
+
+    Controllers choose the player's actions for the game. Any object with the same
+    choose_action() and press() methods can stand in for the mouse, such as
+    autoplay.AutoplayController.
+    """
+
+    def choose_action(
+        self,
+        engine: CombatEngine,
+        clicked: bool,
+        pos: tuple[int, int],
+        potion_button,
+    ) -> int | None:
+        """
+        Chooses the player's action, called every step of the player's turn until
+        it returns one.
+
+        Args:
+            engine (CombatEngine): Battle being played.
+            clicked (bool): Whether the mouse was clicked.
+            pos (tuple[int, int]): Mouse position.
+            potion_button (PotionButton): Potion button object.
+
+        Returns:
+            int | None: Index of the enemy to attack, USE_POTION, or None to keep
+                waiting.
+        """
+        if not clicked:
+            return None
+
+        for i, enemy in enumerate(engine.enemies):
+            if enemy.alive and enemy.hit_test(pos):
+                return i
+        if potion_button.rect.collidepoint(pos):
+            return USE_POTION
+        return None
+
+    def press(self, button, clicked: bool, pos: tuple[int, int], dt: int) -> bool:
+        """
+        Checks whether a button outside of battle, such as exit, is pressed.
+
+        Args:
+            button (Button): Button waiting to be pressed.
+            clicked (bool): Whether the mouse was clicked.
+            pos (tuple[int, int]): Mouse position.
+            dt (int): Milliseconds of game time since the previous frame.
+
+        Returns:
+            bool: True if the button is pressed, False otherwise.
+        """
+        return clicked and button.rect.collidepoint(pos)
+
+
+# plays the player's side unless the game is given another controller
+MOUSE = MouseController()
 
 
 def handle_actions(
-    screen: pygame.Surface,
     clicked: bool,
-    current_fighter: int,
-    player,
-    enemies,
+    pos: tuple[int, int],
+    engine: CombatEngine,
     potion_button,
     action_cooldown: int,
-) -> tuple[int, int]:
+    dt: int,
+    controller=None,
+) -> int:
     """
     Handles the game actions based on the current state and user inputs.
 
     Args:
-        screen (pygame.Surface): Game screen surface.
         clicked (bool): Whether the mouse was clicked.
-        current_fighter (int): Indicates which character is the current fighter.
-        player (Player): Player object.
-        enemies (List[Enemy]): List of enemy objects.
+        pos (tuple[int, int]): Mouse position.
+        engine (CombatEngine): Battle being played.
         potion_button (PotionButton): Potion button object.
-        action_cooldown (int): Cooldown timer for actions.
+        action_cooldown (int): Remaining cooldown before the next action, in ms.
+        dt (int): Milliseconds since the previous frame.
+        controller (MouseController): Chooses the player's actions. Defaults to
+            the mouse.
 
     Returns:
-        tuple[int, int]: Updated current_fighter index and action_cooldown.
+        int: Updated action_cooldown.
     """
-    pygame.mouse.set_visible(True)
-    action_cooldown = max(0, action_cooldown - 1)
+    action_cooldown = max(0, action_cooldown - dt)
 
-    if action_cooldown == 0:
-        current_fighter, action_cooldown = execute_turn(
-            screen, clicked, current_fighter, player, enemies, potion_button
+    # no more turns once the battle is decided, while the round over message shows
+    if action_cooldown == 0 and not engine.is_over():
+        action_cooldown = execute_turn(
+            clicked, pos, engine, potion_button, controller or MOUSE
         )
 
-    return current_fighter, action_cooldown
+    return action_cooldown
 
 
 def execute_turn(
-    screen: pygame.Surface,
     clicked: bool,
-    current_fighter: int,
-    player,
-    enemies,
+    pos: tuple[int, int],
+    engine: CombatEngine,
     potion_button,
-) -> tuple[int, int]:
+    controller,
+) -> int:
     """
-    Executes the current turn based on the current fighter.
+    Executes the current turn and passes the turn on once it is done.
 
     Args:
-        screen (pygame.Surface): Game screen surface.
         clicked (bool): Whether the mouse was clicked.
-        current_fighter (int): Indicates which character is the current fighter.
-        player (Player): Player object.
-        enemies (List[Enemy]): List of enemy objects.
+        pos (tuple[int, int]): Mouse position.
+        engine (CombatEngine): Battle being played.
         potion_button (PotionButton): Potion button object.
+        controller (MouseController): Chooses the player's actions.
 
     Returns:
-        tuple[int, int]: Updated current_fighter index and action_cooldown.
+        int: Cooldown before the next turn, in ms.
     """
-    if current_fighter == 0:  # player's turn
-        if player_turn(screen, clicked, player, enemies, potion_button):
-            return 1, PLAYER_COOLDOWN
-    elif current_fighter == 1:  # first enemy's turn
-        enemy_turn(enemies[0], player)
-        return (2, ENEMY_COOLDOWN) if len(enemies) == 2 else (0, ENEMY_COOLDOWN - 10)
-    elif current_fighter == 2:  # second enemy's turn
-        enemy_turn(enemies[1], player)
-        return 0, ENEMY_COOLDOWN - 10
+    if engine.is_player_turn():
+        if not player_turn(clicked, pos, engine, potion_button, controller):
+            return 0
+        engine.end_turn()
+        return PLAYER_COOLDOWN
 
-    return current_fighter, 0
+    engine.enemy_turn()
+    engine.end_turn()
+    return LAST_ENEMY_COOLDOWN if engine.is_player_turn() else ENEMY_COOLDOWN
 
 
 def player_turn(
-    screen: pygame.Surface, clicked: bool, player, enemies, potion_button
+    clicked: bool,
+    pos: tuple[int, int],
+    engine: CombatEngine,
+    potion_button,
+    controller,
 ) -> bool:
     """
     Handles the player's turn actions.
 
     Args:
-        screen (pygame.Surface): Game screen surface.
         clicked (bool): Whether the mouse was clicked.
-        player (Player): Player object.
-        enemies (List[Enemy]): List of enemy objects.
+        pos (tuple[int, int]): Mouse position.
+        engine (CombatEngine): Battle being played.
         potion_button (PotionButton): Potion button object.
+        controller (MouseController): Chooses the player's actions.
 
     Returns:
         bool: True if the player's turn is done, False otherwise.
     """
-    pos = pygame.mouse.get_pos()
-    turn_done = False
+    action = controller.choose_action(engine, clicked, pos, potion_button)
 
-    for enemy in enemies:
-        if enemy.hitbox.collidepoint(pos) and enemy.alive:
-            pygame.mouse.set_visible(False)
-            screen.blit(SWORD, pos)
+    if action is None:
+        return False
+    if action == USE_POTION:
+        return use_potion_if_possible(engine)
 
-            if clicked and enemy.alive:
-                perform_attack(player, enemy)
-                turn_done = True
+    engine.attack(engine.player, engine.enemies[action])
+    return True
 
-    if potion_button.rect.collidepoint(pos) and clicked:
-        turn_done = use_potion_if_possible(player)
 
-    return turn_done
+def draw_cursor(
+    screen: pygame.Surface,
+    pos: tuple[int, int],
+    engine: CombatEngine,
+    action_cooldown: int,
+) -> None:
+    """
+    Replaces the mouse pointer with a sword while the player can attack the
+    enemy under it.
 
+    Args:
+        screen (pygame.Surface | DirtyRectRenderer): Surface the cursor is drawn on.
+        pos (tuple[int, int]): Mouse position.
+        engine (CombatEngine): Battle being played.
+        action_cooldown (int): Remaining cooldown before the next action, in ms.
+    """
+    pygame.mouse.set_visible(True)
+    if action_cooldown > 0 or not engine.is_player_turn():
+        return
+
+    for enemy in engine.enemies:
+        if enemy.alive and enemy.hit_test(pos):
+            pygame.mouse.set_visible(False)
+            screen.blit(assets.SWORD, pos)
 
-def use_potion_if_possible(player) -> bool:
+
+def use_potion_if_possible(engine: CombatEngine) -> bool:
     """
     Uses a potion if the player has one available and can be healed.
 
     Args:
-        player (Player): Player object.
+        engine (CombatEngine): Battle being played.
 
     Returns:
         bool: True if the potion was used, False otherwise.
     """
-    if player.potions > 0 and player.hp < player.max_hp:
-        heal = player.heal()
-        display_action_text(
-            target=player, text_group=heal_text_group, text=heal, colour=(0, 255, 0)
-        )
+    if engine.can_heal():
+        engine.heal()
         return True
     return False
 
 
-def enemy_turn(enemy, player) -> None:
+def warm_up_action_texts() -> None:
     """
-    Handles an enemy's turn actions.
-
-    Args:
-        enemy (Enemy): Enemy taking the turn.
-        player (Player): Player being attacked.
+    Renders the labels and builds the glyph atlases of every action text a battle
+    can show, so none is rendered mid-battle. Does nothing without a display, as
+    headless runs never show action texts.
     """
-    if enemy.alive:
-        perform_attack(enemy, player)
+    if pygame.display.get_surface() is None:
+        return
+
+    ACTION_TEXTS.prepare(CRIT_TEXT, CRIT_COLOUR)
+    ACTION_TEXTS.prepare(POTION_TEXT, HEAL_COLOUR)
+    ACTION_TEXTS.prepare("0", DAMAGE_COLOUR)
 
 
-def perform_attack(attacker, target) -> None:
+def handle_combat_event(event: CombatEvent) -> None:
     """
-    Performs an attack from the attacker to the target.
+    Plays the animation for an event of the combat engine. Enemies are hit tested
+    against their current frame, so headless runs play the animations too.
 
     Args:
-        attacker (Fighter): Attacking fighter.
-        target (Fighter): Target fighter being attacked.
+        event (CombatEvent): Event emitted by the combat engine.
     """
-    from player import Player  # avoid circular import
+    if event.type == EventType.ATTACK:
+        event.source.set_action(Action.ATTACK)
+    elif event.type == EventType.DOUBLE_HIT:
+        event.source.set_action(Action.SPECIAL)
+    elif event.type == EventType.DAMAGE:
+        target = event.target
+        target.set_action(Action.HURT if target.alive else Action.DEATH)
 
-    damage = attacker.attack()
-    target.take_damage(damage)
-    target.update_animation()
 
-    if target.hp - damage <= 0 and isinstance(attacker, Player):  # accounts for delayed damage
-        potion_received = attacker.get_potion()
-        if potion_received:
-            display_action_text(
-                target=attacker,
-                text_group=potion_text_group,
-                text="+1 Potion",
-                colour=(0, 255, 0),
-            )
+def show_combat_event_text(event: CombatEvent) -> None:
+    """
+    Shows the action text for an event of the combat engine. Only subscribed when
+    the battle is drawn.
+
+    Args:
+        event (CombatEvent): Event emitted by the combat engine.
+    """
+    if event.type == EventType.CRITICAL_HIT:
+        display_action_text(target=event.source, text=CRIT_TEXT, colour=CRIT_COLOUR)
+    elif event.type == EventType.DAMAGE:
+        display_action_text(target=event.target, text=event.value, colour=DAMAGE_COLOUR)
+    elif event.type == EventType.HEAL:
+        display_action_text(target=event.target, text=event.value, colour=HEAL_COLOUR)
+    elif event.type == EventType.POTION_DROP:
+        display_action_text(
+            target=event.target,
+            text=POTION_TEXT,
+            colour=HEAL_COLOUR,
+            delay=POTION_TEXT_DELAY,
+        )
 
 
-def display_action_text(
-    target, text: int, colour, text_group=damage_text_group
-) -> None:
+def display_action_text(target, text, colour, delay: int = 0) -> None:
     """
     Displays action text on the screen for a given target.
 
     Args:
         target (Fighter): Target receiving action text.
-        text (str): Action text to be displayed.
+        text (str | int): Action text to be displayed.
         colour (tuple[int, int, int]): RGB colour for the text.
-        text_group (pygame.sprite.Group): Sprite group to which the text belongs.
-    """
-    x, y = target.x_pos, target.y_pos - 210
-    delay = 10 if "Potion" in str(text) else 0
-    
-    if str(text).find('Critical'):
-        text_group = crit_text_group
-    
-    action_text = ActionText(x, y, str(text), colour, delay=delay)
-    text_group.add(action_text)
+        delay (int): Milliseconds to wait before displaying the text. Defaults to 0.
+    """
+    ACTION_TEXTS.show(target.x_pos, target.y_pos - 210, str(text), colour, delay)
@@ -0,0 +1,360 @@
+"""
+Vectorised battle kernel.
+
+Plays thousands of independent journeys in lockstep with NumPy arrays: every lane
+is one journey, and each step plays a whole round of every lane at once. The
+rules are the same as combat.CombatEngine with the simulator's heal policy, so
+the outcome distributions match the scalar simulator at a fraction of the cost;
+benchmark.py reports the journeys per second of both. Requires NumPy.
+
+Usage:
+    python battle_kernel.py --journeys 1000000 --validate 20000
+"""
+
+import argparse
+import time
+import numpy
+from enemy import ENEMIES, BOSSES
+from player import PLAYERS
+from random_source import RandomSource
+from simulator import LEVELS, HEAL_THRESHOLD, BalanceStats, simulate, heal_when_low
+
+# constants
+MAX_ENEMIES = 2  # enemy slots per round
+LANES = 100000  # journeys played in lockstep per batch
+ROLL_BITS = 16  # bits per roll; chances are exact to within 2 ** -16
+
+# enemy stat rows (max hp, strength, crit chance) with a column per kind of
+# enemy: the regular enemies, then the boss of each level, then an empty slot
+ENEMY_STATS = numpy.array(
+    [row[2:5] for row in ENEMIES + BOSSES] + [(0, 0, 0)], dtype=numpy.int32
+).T.copy()
+FIRST_BOSS = len(ENEMIES)
+EMPTY_SLOT = len(ENEMIES) + len(BOSSES)
+
+
+def draw_rolls(rng: numpy.random.Generator, rolls: int, lanes: int) -> numpy.ndarray:
+    """
+    Draws uniform rolls of ROLL_BITS bits for every lane. Each 64-bit draw of the
+    bit generator is split into several rolls, which costs a fraction of drawing
+    every roll with its own call.
+
+    Args:
+        rng (numpy.random.Generator): Random number generator.
+        rolls (int): Number of rolls per lane.
+        lanes (int): Number of lanes.
+
+    Returns:
+        numpy.ndarray: Rolls in [0, 2 ** ROLL_BITS), a row per roll.
+    """
+    per_draw = 64 // ROLL_BITS
+    draws = rng.bit_generator.random_raw(-(-rolls * lanes // per_draw))
+    bits = draws.view(f"u{ROLL_BITS // 8}")[: rolls * lanes]
+    return bits.reshape(rolls, lanes).astype(numpy.int32)
+
+
+def spread(rolls: numpy.ndarray) -> numpy.ndarray:
+    """
+    Maps rolls to a uniform spread of -5 to 5, the spread of damage and healing.
+    """
+    return (rolls * 11 >> ROLL_BITS) - 5
+
+
+def threshold(percent) -> numpy.ndarray | int:
+    """
+    Converts a percentage chance to the roll below which it happens.
+    """
+    return numpy.asarray(percent, dtype=numpy.int32) * (1 << ROLL_BITS) // 100
+
+
+def roll_damage(strength, crit_threshold, spread_rolls, crit_rolls) -> numpy.ndarray:
+    """
+    Rolls base damage and critical hits for every lane.
+
+    Args:
+        strength (int | numpy.ndarray): Attacker strength per lane.
+        crit_threshold (int | numpy.ndarray): Roll below which a hit is critical.
+        spread_rolls (numpy.ndarray): Rolls for the damage spread.
+        crit_rolls (numpy.ndarray): Rolls for critical hits.
+
+    Returns:
+        numpy.ndarray: Damage per lane.
+    """
+    damage = strength + spread(spread_rolls)
+    # adding half, rounded down by the shift, floors damage * 1.5 like the engine
+    damage += (damage >> 1) * (crit_rolls < crit_threshold)
+    return damage
+
+
+def fight(
+    player: tuple,
+    hp: numpy.ndarray,
+    potions: numpy.ndarray,
+    enemy_hp: numpy.ndarray,
+    enemy_strength: numpy.ndarray,
+    enemy_crit: numpy.ndarray,
+    rng: numpy.random.Generator,
+    heal_threshold: float = HEAL_THRESHOLD,
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Plays one battle in every lane until the player or every enemy is defeated.
+
+    Every step plays a whole round in every lane, the player's turn and then each
+    enemy slot's in order, so all lanes are on the same turn. Each turn is masked
+    arithmetic over contiguous arrays, rather than a gather of the lanes whose
+    turn it is. Lanes whose player is dead or whose enemy slots are all empty don't
+    play. The player's HP and potions are updated in place.
+
+    Args:
+        player (tuple): Row of player.PLAYERS for the character.
+        hp (numpy.ndarray): Player HP per lane.
+        potions (numpy.ndarray): Player potions per lane.
+        enemy_hp (numpy.ndarray): HP per lane of each enemy slot, a row per slot,
+            0 for empty slots.
+        enemy_strength (numpy.ndarray): Strength per lane of each enemy slot.
+        enemy_crit (numpy.ndarray): Crit chance per lane of each enemy slot.
+        rng (numpy.random.Generator): Random number generator.
+        heal_threshold (float): Fraction of max HP below which a potion is drunk.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Turns taken and potions drunk per lane.
+    """
+    _, max_hp, strength, crit_chance, double_chance, potion_chance, _ = player
+    crit, double, drop = threshold([crit_chance, double_chance, potion_chance])
+    turns = numpy.zeros(hp.shape, dtype=numpy.int32)
+    potions_used = numpy.zeros(hp.shape, dtype=numpy.int32)
+
+    # the fighting lanes are packed into smaller arrays, repacked once most of
+    # their battles have ended
+    lanes = numpy.flatnonzero((hp > 0) & (enemy_hp > 0).any(axis=0))
+    lane_hp, lane_potions = hp.take(lanes), potions.take(lanes)
+    lane_enemy_hp = enemy_hp.take(lanes, axis=1)
+    lane_strength = enemy_strength.take(lanes, axis=1)
+    lane_crit = threshold(enemy_crit.take(lanes, axis=1))
+    lane_turns = numpy.zeros(lanes.size, dtype=numpy.int32)
+    lane_used = numpy.zeros(lanes.size, dtype=numpy.int32)
+    playing = numpy.ones(lanes.size, dtype=bool)
+    slots = len(lane_enemy_hp)
+
+    while lanes.size:
+        rolls = draw_rolls(rng, 3 + 2 * slots, lanes.size)
+
+        # player's turn: heal below the threshold, otherwise attack the first enemy;
+        # only a few lanes heal or kill each round, so only they roll for it
+        lane_turns += playing
+        heal = (
+            playing
+            & (lane_hp < max_hp * heal_threshold)
+            & (lane_potions > 0)
+            & (lane_hp < max_hp)
+        )
+        healing = numpy.flatnonzero(heal)
+        heal_amount = 30 + spread(draw_rolls(rng, 1, healing.size)[0])
+        lane_hp[healing] = numpy.minimum(lane_hp[healing] + heal_amount, max_hp)
+        lane_potions[healing] -= 1
+        lane_used[healing] += 1
+
+        attack = playing & ~heal
+        damage = roll_damage(strength, crit, rolls[0], rolls[1])
+        damage <<= rolls[2] < double  # double hits
+        killed = numpy.zeros(lanes.size, dtype=bool)
+        for slot_hp in lane_enemy_hp:
+            hit = attack & (slot_hp > 0)
+            attack &= ~hit  # only the first living enemy is attacked
+            left = numpy.maximum(slot_hp - damage, 0)
+            killed |= hit & (left == 0)
+            slot_hp -= hit * (slot_hp - left)
+        killed = numpy.flatnonzero(killed)
+        dropped = killed[draw_rolls(rng, 1, killed.size)[0] < drop]
+        lane_potions[dropped] += 1
+
+        # enemies' turns: living enemies attack while the player is alive
+        any_alive = numpy.zeros(lanes.size, dtype=bool)
+        for slot, slot_hp in enumerate(lane_enemy_hp):
+            acting = (slot_hp > 0) & (lane_hp > 0)
+            lane_turns += acting  # dead enemies' turns are skipped, not taken
+            damage = roll_damage(
+                lane_strength[slot],
+                lane_crit[slot],
+                *rolls[3 + 2 * slot : 5 + 2 * slot],
+            )
+            lane_hp -= acting * (lane_hp - numpy.maximum(lane_hp - damage, 0))
+            any_alive |= slot_hp > 0
+
+        playing = (lane_hp > 0) & any_alive
+        if numpy.count_nonzero(playing) * 2 <= lanes.size:
+            # indices, as taking them is much faster than masking each array
+            done, kept = numpy.flatnonzero(~playing), numpy.flatnonzero(playing)
+            finished = lanes.take(done)
+            hp[finished] = lane_hp.take(done)
+            potions[finished] = lane_potions.take(done)
+            turns[finished] = lane_turns.take(done)
+            potions_used[finished] = lane_used.take(done)
+
+            lanes = lanes.take(kept)
+            lane_hp, lane_potions = lane_hp.take(kept), lane_potions.take(kept)
+            lane_enemy_hp = lane_enemy_hp.take(kept, axis=1)
+            lane_strength = lane_strength.take(kept, axis=1)
+            lane_crit = lane_crit.take(kept, axis=1)
+            lane_turns, lane_used = lane_turns.take(kept), lane_used.take(kept)
+            playing = playing.take(kept)
+
+    return turns, potions_used
+
+
+def spawn_round(
+    level: int,
+    remaining: numpy.ndarray,
+    in_level: numpy.ndarray,
+    rng: numpy.random.Generator,
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """
+    Rolls the enemies of the next round of every lane with the rules of
+    enemy.spawn_level(): one or two regular enemies until one is left, then the boss.
+
+    Args:
+        level (int): Level number, starting at 1.
+        remaining (numpy.ndarray): Enemies left to fight in the level per lane.
+            Updated in place; lanes that reach their boss drop to -1.
+        in_level (numpy.ndarray): Whether each lane is still playing the level.
+        rng (numpy.random.Generator): Random number generator.
+
+    Returns:
+        tuple: Enemy HP, strength and crit chance per lane, each with a row per
+            enemy slot, and a mask of the lanes fighting their boss.
+    """
+    lanes = remaining.size
+    boss = in_level & (remaining <= 1)
+    regular = in_level & ~boss
+
+    count = numpy.where(
+        regular,
+        numpy.minimum(rng.integers(1, 3, lanes, dtype=numpy.int32), remaining - 1),
+        0,
+    )
+    remaining -= count
+    remaining[boss] = -1
+
+    kind = rng.integers(0, FIRST_BOSS, (MAX_ENEMIES, lanes), dtype=numpy.int32)
+    empty = numpy.arange(MAX_ENEMIES)[:, None] >= count
+    kind += empty * (EMPTY_SLOT - kind)
+    kind[0] += boss * (FIRST_BOSS + level - 1 - kind[0])
+    max_hp, strength, crit_chance = (stat.take(kind) for stat in ENEMY_STATS)
+    return max_hp, strength, crit_chance, boss
+
+
+def simulate_journeys(
+    player: tuple,
+    lanes: int,
+    rng: numpy.random.Generator,
+    heal_threshold: float = HEAL_THRESHOLD,
+) -> BalanceStats:
+    """
+    Plays one journey per lane through every level.
+
+    Args:
+        player (tuple): Row of player.PLAYERS for the character.
+        lanes (int): Number of journeys.
+        rng (numpy.random.Generator): Random number generator.
+        heal_threshold (float): Fraction of max HP below which a potion is drunk.
+
+    Returns:
+        BalanceStats: Totals of the journeys, comparable to simulator.simulate().
+    """
+    stats = BalanceStats(player[0])
+    stats.journeys = lanes
+    hp = numpy.full(lanes, player[1], dtype=numpy.int32)
+    potions = numpy.full(lanes, player[6], dtype=numpy.int32)
+
+    for level in range(1, LEVELS + 1):
+        in_level = hp > 0
+        remaining = level + rng.integers(4, 7, lanes, dtype=numpy.int32)
+        turns = numpy.zeros(lanes, dtype=numpy.int32)
+        potions_used = numpy.zeros(lanes, dtype=numpy.int32)
+        stats.reached[level - 1] = int(in_level.sum())
+
+        while in_level.any():
+            enemy_hp, strength, crit, boss = spawn_round(
+                level, remaining, in_level, rng
+            )
+            round_turns, round_potions = fight(
+                player, hp, potions, enemy_hp, strength, crit, rng, heal_threshold
+            )
+            turns += round_turns
+            potions_used += round_potions
+            in_level &= (hp > 0) & ~boss
+
+        cleared = hp > 0
+        stats.cleared[level - 1] = int(cleared.sum())
+        stats.hp[level - 1] = int(hp[cleared].sum())
+        stats.turns[level - 1] = int(turns.sum())
+        stats.potions_used[level - 1] = int(potions_used.sum())
+
+    stats.wins = stats.cleared[-1]
+    return stats
+
+
+def run_kernel(
+    player: tuple,
+    journeys: int,
+    seed: int | None = None,
+    lanes: int = LANES,
+    heal_threshold: float = HEAL_THRESHOLD,
+) -> BalanceStats:
+    """
+    Plays journeys in batches of at most `lanes` lockstep lanes.
+
+    Args:
+        player (tuple): Row of player.PLAYERS for the character.
+        journeys (int): Number of journeys.
+        seed (int): Seed for reproducible results.
+        lanes (int): Maximum number of journeys per batch.
+        heal_threshold (float): Fraction of max HP below which a potion is drunk;
+            0 never drinks.
+
+    Returns:
+        BalanceStats: Totals of the journeys.
+    """
+    rng = numpy.random.default_rng(seed)
+    stats = BalanceStats(player[0])
+    for first in range(0, journeys, lanes):
+        stats.merge(
+            simulate_journeys(player, min(lanes, journeys - first), rng, heal_threshold)
+        )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate journeys with NumPy.")
+    parser.add_argument(
+        "--journeys", type=int, default=100000, help="journeys per character"
+    )
+    parser.add_argument("--seed", type=int, help="seed for reproducible results")
+    parser.add_argument(
+        "--validate",
+        type=int,
+        default=0,
+        metavar="N",
+        help="also play N journeys per character with the scalar engine",
+    )
+    args = parser.parse_args()
+
+    for character in PLAYERS:
+        start = time.perf_counter()
+        stats = run_kernel(character, args.journeys, args.seed)
+        elapsed = time.perf_counter() - start
+        print(stats.report())
+        print(f"  kernel: {args.journeys / elapsed:.0f} journeys/s")
+
+        if args.validate:
+            start = time.perf_counter()
+            scalar = simulate(
+                character, args.validate, heal_when_low, RandomSource(args.seed)
+            )
+            elapsed = time.perf_counter() - start
+            print(scalar.report().replace(character[0], "scalar engine", 1))
+            print(f"  scalar: {args.validate / elapsed:.0f} journeys/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""
+Headless render benchmark.
+
+Runs scripted scenarios through the real drawing code with SDL's dummy video
+driver and reports frame rate, frame time percentiles, the time of each stage and
+memory allocated, as JSON that can be compared between commits. Frames are fed a
+fixed frame time and never wait for the clock, so every run of a scenario draws
+the same frames as fast as possible. It also reports how many journeys per second
+the balance simulator plays with the scalar combat engine and, with NumPy, with
+the lockstep battle kernel.
+
+Usage:
+    python benchmark.py --output before.json
+    python benchmark.py --compare before.json
+"""
+
+import os
+
+# the benchmark never opens a window; chosen before assets creates the display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import functools
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable
+import pygame
+import assets
+from constants import WIDTH, HEIGHT, PANEL_HEIGHT, CHARACTERS
+from animations import get_animations, AnimationPlayback
+from battle import warm_up_action_texts
+from button import Button
+from character_selection import draw_character_options
+from enemy import Enemy, ENEMIES, BOSSES
+from game import Game, GameState, SIM_STEP
+from profiler import Profiler, percentile
+from player import PLAYERS
+from random_source import RandomSource
+from replay import FrameInput
+from simulator import heal_when_low, simulate
+from utils import BOSS_SCALE, prepare_background, warm_up_frame_cache
+
+try:
+    from battle_kernel import run_kernel
+except ImportError:  # the kernel needs NumPy
+    run_kernel = None
+
+# constants
+SEED = 1  # seed of the battles, so every run plays the same fight
+SELECTION_FRAMES = 600  # frames drawn on the character selection screen
+HOVER_FRAMES = 60  # frames each character option stays hovered
+REPEATS = 3
+HORDE_SIZE = 30  # enemies in the horde scenario
+HORDE_FRAMES = 1500  # frames drawn in the horde scenario, walk in included
+HORDE_HP = 10_000  # player HP in the horde scenario, so the player outlasts it
+SCALAR_JOURNEYS = 2_000  # journeys timed with the scalar combat engine
+KERNEL_JOURNEYS = 200_000  # journeys timed with the battle kernel
+
+
+class ScenarioFinished(Exception):
+    """
+    Raised by the scripted input once a scenario has played out.
+    """
+
+
+class ScriptedInput:
+    """
+    Input source that clicks every frame at a position chosen by the scenario.
+
+    Attributes:
+        pointer (Callable[[], tuple[int, int]]): Returns the pointer position.
+        until (Callable[[], bool] | None): Ends the scenario once it returns True.
+        frames (int): Number of frames read.
+    """
+
+    def __init__(self, pointer: Callable[[], tuple[int, int]], until=None):
+        self.pointer = pointer
+        self.until: Callable[[], bool] | None = until
+        self.frames: int = 0
+
+    def read(self) -> FrameInput:
+        """
+        Returns the input of the next frame.
+
+        Returns:
+            FrameInput: One frame's worth of time, a click and the pointer position.
+
+        Raises:
+            ScenarioFinished: If the scenario's end condition has been met.
+        """
+        if self.until and self.until():
+            raise ScenarioFinished()
+        pygame.event.pump()
+        self.frames += 1
+        return FrameInput(SIM_STEP, True, False, self.pointer())
+
+    def close(self, summary) -> None:
+        """
+        Ends the scenario when the game session ends.
+
+        Raises:
+            ScenarioFinished: Always.
+        """
+        raise ScenarioFinished()
+
+
+def aim(enemy: Enemy) -> tuple[int, int]:
+    """
+    Picks a point on one of the enemy's opaque pixels, so clicking it always hits.
+
+    Args:
+        enemy (Enemy): Enemy to aim at.
+
+    Returns:
+        tuple[int, int]: Point on the screen, or (0, 0) before the enemy is placed.
+    """
+    if enemy.mask is None:
+        return (0, 0)
+    x, y = aim_point(enemy.mask)
+    return (enemy.hitbox.x + x, enemy.hitbox.y + y)
+
+
+@functools.cache
+def aim_point(mask: pygame.mask.Mask) -> tuple[int, int]:
+    """
+    Finds a set bit of a frame's mask, near its centre where possible. Cached, as
+    frames are reused, so the pointer costs nothing in the timed frames.
+
+    Args:
+        mask (pygame.mask.Mask): Mask of a frame.
+
+    Returns:
+        tuple[int, int]: Position of the bit in the mask.
+    """
+    x, y = mask.centroid()
+    return (x, y) if mask.get_at((x, y)) else mask.outline()[0]
+
+
+def create_game(character: int, level: int, profiler: Profiler, pointer, until=None):
+    """
+    Creates a game at the given level with its frames pre-scaled, so the benchmark
+    only measures drawing.
+
+    Args:
+        character (int): Index of the character to play.
+        level (int): Level to play.
+        profiler (Profiler): Profiler timing the game's frames.
+        pointer (Callable[[], tuple[int, int]]): Returns the pointer position.
+        until (Callable[[], bool]): Ends the scenario once it returns True.
+
+    Returns:
+        Game: Game ready to play.
+    """
+    game = Game(
+        character,
+        on_exit=None,
+        rng=RandomSource(SEED),
+        input_source=ScriptedInput(pointer, until),
+        profiler=profiler,
+    )
+    game.current_level = level
+    warm_up_frame_cache(game.player, game.animations, level)
+    warm_up_action_texts()
+    game.background = prepare_background(
+        assets.get(game.backgrounds[level - 1]), WIDTH, HEIGHT - PANEL_HEIGHT
+    )
+    return game
+
+
+def walk_in(character: int, profiler: Profiler) -> None:
+    """
+    The player walks in, followed by two enemies.
+
+    Args:
+        character (int): Index of the character to play.
+        profiler (Profiler): Profiler timing the frames.
+    """
+    game = create_game(character, 1, profiler, pointer=lambda: (0, 0))
+    game.player_walk_in()
+    game.enemy_walk_in([Enemy(*ENEMIES[0]), Enemy(*ENEMIES[1])])
+
+
+def boss_fight(character: int, profiler: Profiler, level: int) -> None:
+    """
+    A full battle against a level's boss, attacking it whenever possible, until
+    the round over message has been shown.
+
+    Args:
+        character (int): Index of the character to play.
+        profiler (Profiler): Profiler timing the frames.
+        level (int): Level whose boss is fought.
+    """
+    boss = Enemy(*BOSSES[level - 1])
+    game = create_game(
+        character,
+        level,
+        profiler,
+        pointer=lambda: aim(boss),
+        until=lambda: game.game_state != GameState.RUNNING,
+    )
+    boss.x_pos = 540 if boss.name == "Bringer" else game.enemy_target_position
+    game.play_round([boss])
+
+
+def horde(character: int, profiler: Profiler) -> None:
+    """
+    A wave of HORDE_SIZE enemies walks in and is fought, attacking the first living
+    enemy whenever possible, until HORDE_FRAMES frames have been drawn.
+
+    Args:
+        character (int): Index of the character to play.
+        profiler (Profiler): Profiler timing the frames.
+    """
+    enemies = [Enemy(*ENEMIES[i % len(ENEMIES)]) for i in range(HORDE_SIZE)]
+
+    def pointer() -> tuple[int, int]:
+        alive = [enemy for enemy in enemies if enemy.alive]
+        return aim(alive[0]) if alive else (0, 0)
+
+    game = create_game(
+        character,
+        1,
+        profiler,
+        pointer=pointer,
+        until=lambda: game.input.frames >= HORDE_FRAMES,
+    )
+    game.player.max_hp = game.player.hp = HORDE_HP
+    game.enemy_walk_in(enemies)
+    game.play_round(enemies)
+
+
+def character_selection(character: int, profiler: Profiler) -> None:
+    """
+    The character selection screen, hovering over each character option in turn.
+
+    Args:
+        character (int): Index of the selected character.
+        profiler (Profiler): Profiler timing the frames.
+    """
+    animations = get_animations()
+    for option in CHARACTERS:
+        animations[option["name"].lower()]  # loaded before the timed frames
+    playback = AnimationPlayback()
+    play_button = Button(
+        assets.SCREEN,
+        x=WIDTH // 2,
+        y=HEIGHT * 0.85,
+        image=assets.PLAY,
+        width=184,
+        height=56,
+    )
+    back_button = Button(
+        assets.SCREEN, x=50, y=50, image=assets.BACK, width=46.5, height=52.5
+    )
+
+    for frame in range(SELECTION_FRAMES):
+        profiler.next_frame()
+        hovered_index = (frame // HOVER_FRAMES) % (len(CHARACTERS) + 1) - 1
+        with profiler.scope("draw_character_options"):
+            draw_character_options(
+                assets.SCREEN,
+                CHARACTERS,
+                character,
+                hovered_index,
+                animations,
+                playback,
+                play_button,
+                back_button,
+            )
+        pygame.event.pump()
+        playback.advance(SIM_STEP)
+    profiler.next_frame()
+
+
+SCENARIOS: dict[str, Callable[[int, Profiler], None]] = {
+    "walk_in": walk_in,
+    **{
+        f"boss_fight_{level}": (
+            lambda character, profiler, level=level: boss_fight(
+                character, profiler, level
+            )
+        )
+        for level in range(1, len(BOSS_SCALE) + 1)
+    },
+    "horde": horde,
+    "character_selection": character_selection,
+}
+
+
+def play(scenario: Callable[[int, Profiler], None], character: int, profiler) -> None:
+    """
+    Plays a scenario to its end.
+
+    Args:
+        scenario (Callable[[int, Profiler], None]): Scenario from SCENARIOS.
+        character (int): Index of the character to play.
+        profiler (Profiler): Profiler timing the frames.
+    """
+    try:
+        scenario(character, profiler)
+    except ScenarioFinished:
+        pass
+
+
+def run_scenario(
+    name: str, character: int, repeats: int = REPEATS, allocations: bool = True
+) -> dict:
+    """
+    Plays a scenario several times and measures its frames. Allocations are
+    measured in a separate run, as tracing them slows every frame down.
+
+    Args:
+        name (str): Key of the scenario in SCENARIOS.
+        character (int): Index of the character to play.
+        repeats (int): Number of timed runs.
+        allocations (bool): Whether to also measure allocations.
+
+    Returns:
+        dict: Frame count, FPS, frame time percentiles in ms, average time of each
+            stage in ms and, optionally, allocations in KiB.
+    """
+    scenario = SCENARIOS[name]
+    profiler = Profiler(window=None, enabled=True)
+
+    for _ in range(repeats):
+        play(scenario, character, profiler)
+        profiler.cancel_frame()  # the scenario ended as this frame began
+
+    frame_times = list(profiler.frame_times)
+    mean = sum(frame_times) / len(frame_times)
+    stages: dict[str, float] = {}
+    for frame_stages in profiler.stage_times:
+        for stage, ms in frame_stages.items():
+            stages[stage] = stages.get(stage, 0.0) + ms
+
+    result = {
+        "frames": len(frame_times) // repeats,
+        "fps": round(1000 / mean, 1),
+        "frame_ms": {
+            "mean": round(mean, 3),
+            "p50": round(percentile(frame_times, 0.5), 3),
+            "p90": round(percentile(frame_times, 0.9), 3),
+            "p99": round(percentile(frame_times, 0.99), 3),
+            "max": round(max(frame_times), 3),
+        },
+        "stage_ms": {
+            stage: round(total / len(frame_times), 3)
+            for stage, total in sorted(stages.items(), key=lambda item: -item[1])
+        },
+    }
+
+    if allocations:
+        tracemalloc.start()
+        play(scenario, character, Profiler())
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["alloc_kib"] = {
+            "peak": round(peak / 1024, 1),
+            "retained": round(current / 1024, 1),
+        }
+    return result
+
+
+def run_simulation(character: int) -> dict:
+    """
+    Times the journeys the balance simulator plays per second, on one core, with
+    the scalar combat engine and with the battle kernel.
+
+    Args:
+        character (int): Index of the character to play.
+
+    Returns:
+        dict: Journeys per second of each, and how many times faster the kernel
+            is, or only the scalar engine's without NumPy.
+    """
+    player = PLAYERS[character]
+    start = time.perf_counter()
+    simulate(player, SCALAR_JOURNEYS, heal_when_low, RandomSource(SEED))
+    scalar = SCALAR_JOURNEYS / (time.perf_counter() - start)
+    result = {"scalar_journeys_per_s": round(scalar)}
+
+    if run_kernel is not None:
+        start = time.perf_counter()
+        run_kernel(player, KERNEL_JOURNEYS, SEED)
+        kernel = KERNEL_JOURNEYS / (time.perf_counter() - start)
+        result["kernel_journeys_per_s"] = round(kernel)
+        result["kernel_speedup"] = round(kernel / scalar, 1)
+    return result
+
+
+def get_commit() -> str | None:
+    """
+    Returns the commit the benchmark is run on, if the game is in a git checkout.
+
+    Returns:
+        str | None: Abbreviated commit hash, or None.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """
+    Compares the frame rate and frame times of two benchmark runs.
+
+    Args:
+        results (dict): Results of this run.
+        baseline (dict): Results of an earlier run, loaded from its JSON.
+
+    Returns:
+        list[str]: One line per scenario found in both runs.
+    """
+    lines = [f"compared with {baseline.get('commit') or 'baseline'}:"]
+    for name, result in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+        lines.append(
+            f"  {name:<20} fps {old['fps']:>8.1f} -> {result['fps']:>8.1f}"
+            f" ({result['fps'] / old['fps'] - 1:+.1%})"
+            f"  p99 {old['frame_ms']['p99']:.2f} -> {result['frame_ms']['p99']:.2f} ms"
+        )
+
+    old = baseline.get("simulation", {})
+    for key, value in results.get("simulation", {}).items():
+        if key in old and key.endswith("per_s"):
+            name = key.removesuffix("_journeys_per_s") + " journeys/s"
+            lines.append(
+                f"  {name:<20}     {old[key]:>8} -> {value:>8}"
+                f" ({value / old[key] - 1:+.1%})"
+            )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the render path.")
+    parser.add_argument(
+        "--scenario",
+        choices=SCENARIOS,
+        action="append",
+        help="scenario to run, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--character",
+        choices=[character["name"] for character in CHARACTERS],
+        default=CHARACTERS[0]["name"],
+        help="character to play",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=REPEATS, help="timed runs of each scenario"
+    )
+    parser.add_argument(
+        "--no-allocations",
+        action="store_true",
+        help="skip the slower run that measures allocations",
+    )
+    parser.add_argument(
+        "--no-simulation",
+        action="store_true",
+        help="skip timing the balance simulator",
+    )
+    parser.add_argument("--output", metavar="FILE", help="write the results to FILE")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="compare with the results in FILE"
+    )
+    args = parser.parse_args()
+
+    character = [c["name"] for c in CHARACTERS].index(args.character)
+    assets.get("SCREEN")  # opened up front so no scenario pays for it
+    results = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "video_driver": pygame.display.get_driver(),
+        "character": args.character,
+        "repeats": args.repeats,
+        "scenarios": {},
+    }
+    for name in args.scenario or SCENARIOS:
+        results["scenarios"][name] = run_scenario(
+            name, character, args.repeats, not args.no_allocations
+        )
+        print(f"{name}: {results['scenarios'][name]['fps']} fps", file=sys.stderr)
+    if not args.no_simulation:
+        results["simulation"] = run_simulation(character)
+        print(f"simulation: {results['simulation']}", file=sys.stderr)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare) as file:
+            print("\n".join(compare(results, json.load(file))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import pygame
+from animations import (
+    ANIMATION_SPEED,
+    ATLAS_IMAGE,
+    ATLAS_INDEX,
+    CHARACTER_FRAMES,
+    FRAME_HEIGHT,
+    FRAME_WIDTH,
+    load_spritesheet_frames,
+)
+from spritesheet import write_atlas_index
+
+# constants
+ATLAS_WIDTH = 2048
+FRAME_PADDING = 1
+
+
+def trim_frame(frame: pygame.Surface) -> tuple[pygame.Surface, tuple[int, int]]:
+    """
+    Crops a fixed-size frame to its visible pixels.
+
+    Args:
+        frame (pygame.Surface): Outlined, fixed-size animation frame.
+
+    Returns:
+        tuple[pygame.Surface, tuple[int, int]]: Cropped image and its position in the frame.
+    """
+    bounds = frame.get_bounding_rect()
+    return frame.subsurface(bounds).copy(), bounds.topleft
+
+
+def pack_frames(sizes: list[tuple[int, int]], width: int) -> tuple[list, int]:
+    """
+    Places rectangles on shelves of a fixed-width atlas, tallest first.
+
+    Args:
+        sizes (list[tuple[int, int]]): Width and height of every image to place.
+        width (int): Width of the atlas.
+
+    Returns:
+        tuple[list, int]: Top-left position of every image, in input order, and the atlas height.
+    """
+    positions = [(0, 0)] * len(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    x = y = shelf_height = 0
+
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x = 0
+            y += shelf_height + FRAME_PADDING
+            shelf_height = 0
+        positions[i] = (x, y)
+        x += w + FRAME_PADDING
+        shelf_height = max(shelf_height, h)
+
+    return positions, y + shelf_height
+
+
+def build_atlas() -> None:
+    """
+    Compiles every character spritesheet into one atlas image and a binary index.
+
+    Frames go through the same fix_size and outline steps as the runtime loader,
+    so the game loads identical frames with a single image decode. Run this from
+    the WarriorQuest folder whenever the spritesheets change.
+    """
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+    entries = []
+    images = []
+    for name, actions in CHARACTER_FRAMES.items():
+        for action in actions:
+            trimmed = [trim_frame(frame) for frame in load_spritesheet_frames(name, action)]
+            entries.append((name, action, trimmed))
+            images.extend(image for image, _ in trimmed)
+
+    positions, height = pack_frames([image.get_size() for image in images], ATLAS_WIDTH)
+    atlas = pygame.Surface((ATLAS_WIDTH, max(height, 1)), pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+
+    animations = []
+    placed = iter(positions)
+    for name, action, trimmed in entries:
+        frames = []
+        for image, (anchor_x, anchor_y) in trimmed:
+            x, y = next(placed)
+            atlas.blit(image, (x, y))
+            frames.append((x, y, image.get_width(), image.get_height(), anchor_x, anchor_y))
+        animations.append((name, action, ANIMATION_SPEED, frames))
+
+    pygame.image.save(atlas, ATLAS_IMAGE)
+    with open(ATLAS_INDEX, "wb") as f:
+        f.write(write_atlas_index(FRAME_WIDTH, FRAME_HEIGHT, animations))
+
+    print(f"Packed {len(images)} frames into {ATLAS_WIDTH}x{height} {ATLAS_IMAGE}")
+
+
+if __name__ == "__main__":
+    build_atlas()
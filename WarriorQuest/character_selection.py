@@ -1,8 +1,10 @@
 import pygame
-from constants import FONT, WIDTH, HEIGHT, SCREEN, CHARACTERS, CLOCK, FPS, PLAY, BACK
-from animations import load_character_animations
+import assets
+from constants import WIDTH, HEIGHT, CHARACTERS, FPS
+from animations import get_animations, AnimationPlayback
 from health_bar import HealthBar
 from button import Button
+from preloader import PRELOADER
 from utils import draw_text
 
 
@@ -18,11 +20,19 @@ def character_selection_screen() -> int:
     selected_index = 0
     hovered_index = -1
 
-    animations = load_character_animations()
+    animations = get_animations()
+    playback = AnimationPlayback()
     play_button = Button(
-        SCREEN, x=WIDTH // 2, y=HEIGHT * 0.85, image=PLAY, width=184, height=56
+        assets.SCREEN,
+        x=WIDTH // 2,
+        y=HEIGHT * 0.85,
+        image=assets.PLAY,
+        width=184,
+        height=56,
+    )
+    back_button = Button(
+        assets.SCREEN, x=50, y=50, image=assets.BACK, width=46.5, height=52.5
     )
-    back_button = Button(SCREEN, x=50, y=50, image=BACK, width=46.5, height=52.5)
 
     while True:
         selected_index, play_clicked = handle_events(
@@ -36,16 +46,18 @@ def character_selection_screen() -> int:
         hovered_index = get_hovered_index(mouse_pos)
 
         draw_character_options(
-            SCREEN,
+            assets.SCREEN,
             CHARACTERS,
             selected_index,
             hovered_index,
             animations,
+            playback,
             play_button,
             back_button,
         )
 
-        CLOCK.tick(FPS)
+        PRELOADER.poll()
+        playback.advance(assets.CLOCK.tick(FPS))
 
 
 def handle_events(
@@ -96,9 +108,8 @@ def get_hovered_index(mouse_pos) -> int:
     y_offset = 170
 
     for index, character in enumerate(CHARACTERS):
-        text_rect = FONT.render(character["name"], True, (100, 100, 100)).get_rect(
-            center=(130, y_offset)
-        )
+        text_rect = pygame.Rect((0, 0), assets.FONT.size(character["name"]))
+        text_rect.center = (130, y_offset)
         if text_rect.collidepoint(mouse_pos):
             hovered_index = index
         y_offset += 50
@@ -111,6 +122,7 @@ def draw_character_options(
     selected_index: int,
     hovered_index: int,
     animations: dict,
+    playback: AnimationPlayback,
     play_button: Button,
     back_button: Button,
 ) -> None:
@@ -123,6 +135,7 @@ def draw_character_options(
         selected_index (int): Index of the currently selected character.
         hovered_index (int): Index of the currently hovered character.
         animations (dict): Loaded animations for characters.
+        playback (AnimationPlayback): Playback cursor for the displayed character.
         play_button (Button): Play button instance.
         back_button (Button): Back button instance.
     """
@@ -152,18 +165,20 @@ def draw_character_options(
 
     if selected_index != -1:
         draw_selected_character(
-            screen, animations, selected_index, hovered_index, play_button
+            screen, animations, playback, selected_index, hovered_index, play_button
         )
 
     if hovered_index != -1 and hovered_index != selected_index:
-        draw_hovered_character(screen, animations, hovered_index)
+        draw_hovered_character(screen, animations, playback, hovered_index)
 
+    PRELOADER.draw_progress(screen)
     pygame.display.flip()
 
 
 def draw_selected_character(
     screen: pygame.Surface,
     animations: dict,
+    playback: AnimationPlayback,
     selected_index: int,
     hovered_index: int,
     play_button: Button,
@@ -174,6 +189,7 @@ def draw_selected_character(
     Args:
         screen (pygame.Surface): Surface to draw on.
         animations (dict): Loaded animations for characters.
+        playback (AnimationPlayback): Playback cursor for the displayed character.
         selected_index (int): Index of the currently selected character.
         hovered_index (int): Index of the currently hovered character.
         play_button (Button): Play button instance.
@@ -184,6 +200,7 @@ def draw_selected_character(
         animate_character(
             screen,
             animations,
+            playback,
             selected_character,
             scale=3.7 if selected_character == "Brute" else 4.5,
         )
@@ -192,7 +209,10 @@ def draw_selected_character(
 
 
 def draw_hovered_character(
-    screen: pygame.Surface, animations: dict, hovered_index: int
+    screen: pygame.Surface,
+    animations: dict,
+    playback: AnimationPlayback,
+    hovered_index: int,
 ) -> None:
     """
     Draws the hovered character's animation and stats on the screen.
@@ -200,12 +220,14 @@ def draw_hovered_character(
     Args:
         screen (pygame.Surface): Surface to draw on.
         animations (dict): Loaded animations for characters.
+        playback (AnimationPlayback): Playback cursor for the displayed character.
         hovered_index (int): Index of the currently hovered character.
     """
     hovered_character = CHARACTERS[hovered_index]["name"]
     animate_character(
         screen,
         animations,
+        playback,
         hovered_character,
         scale=3.7 if hovered_character == "Brute" else 4.5,
     )
@@ -213,7 +235,11 @@ def draw_hovered_character(
 
 
 def animate_character(
-    screen: pygame.Surface, animations: dict, name: str, scale: float
+    screen: pygame.Surface,
+    animations: dict,
+    playback: AnimationPlayback,
+    name: str,
+    scale: float,
 ) -> None:
     """
     Animates the character on the screen based on the provided animation data.
@@ -221,20 +247,23 @@ def animate_character(
     Args:
         screen (pygame.Surface): Surface to draw on.
         animations (dict): Loaded animations for characters.
+        playback (AnimationPlayback): Playback cursor for the displayed character.
         name (str): Name of the character to animate.
         scale (float): Scaling factor for the animation.
     """
+    PRELOADER.wait_for(name)  # rather than the registry loading it a second time
     current_animation = animations[name.lower()]["idle"]
-    current_frame = current_animation.get_current_frame(scale=scale)
+    playback.play(current_animation)
+    current_frame = playback.get_frame(scale=scale)
 
     scale_adjustment = 10 if name == "Brute" else 0
 
-    frame_width = current_frame.get_width()
-    frame_height = current_frame.get_height()
-    x_pos = WIDTH // 2 - frame_width // 1.75
-    y_pos = HEIGHT * 0.78 - frame_height - scale_adjustment
+    frame_width, frame_height = current_frame.size
+    offset_x, offset_y = current_frame.offset
+    x_pos = WIDTH // 2 - frame_width // 1.75 + offset_x
+    y_pos = HEIGHT * 0.78 - frame_height - scale_adjustment + offset_y
 
-    screen.blit(current_frame, (x_pos, y_pos))
+    screen.blit(current_frame.image, (x_pos, y_pos))
 
 
 def draw_character_stats(screen: pygame.Surface, index: int) -> None:
@@ -0,0 +1,461 @@
+import heapq
+import math
+from enum import Enum, auto
+from typing import Callable, NamedTuple
+from random_source import RNG
+
+# constants
+USE_POTION = -1  # policy decision for drinking a potion instead of attacking
+DAMAGE_SPREAD = 5  # attacks deal strength ± DAMAGE_SPREAD
+CRIT_MULTIPLIER = 1.5
+DOUBLE_MULTIPLIER = 2
+HEAL_AMOUNT = 30
+HEAL_SPREAD = 5
+DEFAULT_SPEED = 10
+TURN_TICKS = 10_000  # a combatant acts every TURN_TICKS // speed ticks
+
+
+class EventType(Enum):
+    ATTACK = auto()
+    CRITICAL_HIT = auto()
+    DOUBLE_HIT = auto()
+    DAMAGE = auto()
+    DEATH = auto()
+    HEAL = auto()
+    POTION_DROP = auto()
+
+
+class CombatEvent(NamedTuple):
+    """
+    Something that happened during a battle, for front ends to react to.
+
+    Attributes:
+        type (EventType): Kind of event.
+        source (Combatant): Combatant that caused the event, if any.
+        target (Combatant): Combatant affected by the event, if any.
+        value (int): Damage, healing or other amount carried by the event.
+    """
+
+    type: EventType
+    source: "Combatant | None"
+    target: "Combatant | None"
+    value: int = 0
+
+
+class Combatant:
+    def __init__(
+        self,
+        name: str,
+        max_hp: int,
+        strength: int,
+        crit_chance: int,
+        double_chance: int = 0,
+        potion_chance: int = 0,
+        potions: int = 0,
+        speed: int = DEFAULT_SPEED,
+    ):
+        """
+        Initializes the combat stats shared by the player and enemies.
+
+        Args:
+            name (str): Name of the combatant.
+            max_hp (int): Maximum health points.
+            strength (int): Base attack damage.
+            crit_chance (int): Percentage chance for a critical hit.
+            double_chance (int): Percentage chance to attack twice. Defaults to 0.
+            potion_chance (int): Percentage chance to get a potion from a kill. Defaults to 0.
+            potions (int): Number of potions carried. Defaults to 0.
+            speed (int): Initiative; faster combatants act first and more often.
+                Defaults to DEFAULT_SPEED.
+        """
+        self.name: str = name
+        self.max_hp: int = max_hp
+        self.hp: int = max_hp
+        self.strength: int = strength
+        self.crit_chance: int = crit_chance
+        self.double_chance: int = double_chance
+        self.potion_chance: int = potion_chance
+        self.potions: int = potions
+        self.speed: int = speed
+        self.alive: bool = True
+
+
+def damage_distribution(
+    strength: int, crit_chance: int, double_chance: int = 0
+) -> list[tuple[int, float]]:
+    """
+    Lists every damage an attack can deal, as CombatEngine.attack rolls it, for
+    searches and solvers that weigh every outcome instead of sampling one.
+
+    Args:
+        strength (int): Attacker's strength.
+        crit_chance (int): Percentage chance for a critical hit.
+        double_chance (int): Percentage chance for a double hit. Defaults to 0.
+
+    Returns:
+        list[tuple[int, float]]: Each distinct damage and its probability, from
+            lowest to highest.
+    """
+    crit = crit_chance / 100
+    double = double_chance / 100
+    outcomes: dict[int, float] = {}
+
+    for roll in range(-DAMAGE_SPREAD, DAMAGE_SPREAD + 1):
+        base = strength + roll
+        for damage, p_crit in (
+            (math.floor(base * CRIT_MULTIPLIER), crit),
+            (base, 1 - crit),
+        ):
+            for final, p_double in (
+                (damage * DOUBLE_MULTIPLIER, double),
+                (damage, 1 - double),
+            ):
+                p = p_crit * p_double / (2 * DAMAGE_SPREAD + 1)
+                if p > 0:
+                    outcomes[final] = outcomes.get(final, 0.0) + p
+    return sorted(outcomes.items())
+
+
+def heal_distribution() -> list[tuple[int, float]]:
+    """
+    Lists every amount a potion can heal, as CombatEngine.heal rolls it.
+
+    Returns:
+        list[tuple[int, float]]: Each amount and its probability.
+    """
+    amounts = range(HEAL_AMOUNT - HEAL_SPREAD, HEAL_AMOUNT + HEAL_SPREAD + 1)
+    return [(amount, 1 / len(amounts)) for amount in amounts]
+
+
+class TurnScheduler:
+    """
+    Initiative order of a battle, kept in a priority queue of the tick at which
+    each combatant acts next.
+
+    Combatants act every TURN_TICKS // speed ticks, the first time one interval
+    into the battle, so faster combatants act first and more often. Ties go to
+    whoever comes first in the list, so combatants of equal speed take turns in
+    order. Dead combatants are dropped when they reach the front of the queue, in
+    O(log n) each, rather than being skipped over every round.
+
+    Attributes:
+        combatants (list[Combatant]): Combatants of the battle, indexed by the queue.
+    """
+
+    def __init__(self, combatants: list[Combatant]):
+        self.combatants = combatants
+        self._queue: list[tuple[int, int]] = [
+            (self.interval(combatant), i)
+            for i, combatant in enumerate(combatants)
+            if combatant.alive
+        ]
+        heapq.heapify(self._queue)
+
+    @staticmethod
+    def interval(combatant: Combatant) -> int:
+        """
+        Returns the number of ticks between the combatant's turns.
+        """
+        return max(TURN_TICKS // combatant.speed, 1)
+
+    def current(self) -> int:
+        """
+        Finds the combatant whose turn it is, dropping any that have died.
+
+        Returns:
+            int: Index of the combatant in the list.
+        """
+        queue = self._queue
+        while not self.combatants[queue[0][1]].alive:
+            heapq.heappop(queue)
+        return queue[0][1]
+
+    def advance(self) -> None:
+        """
+        Ends the current combatant's turn and schedules its next one.
+        """
+        i = self.current()
+        tick, _ = self._queue[0]
+        heapq.heapreplace(self._queue, (tick + self.interval(self.combatants[i]), i))
+
+
+class CombatEngine:
+    """
+    Deterministic, rendering-free resolution of a battle between the player and a
+    group of enemies.
+
+    The engine owns turn order, damage, critical and double hits, healing, potion
+    drops and delayed damage. Front ends subscribe to the events it emits to play
+    animations and show action text.
+
+    Attributes:
+        player (Combatant): Player fighting the battle.
+        enemies (list[Combatant]): Enemies fighting the battle.
+        rng (random.Random): Random number generator. Defaults to the shared game RNG.
+        damage_delay (int): Milliseconds between an attack and its damage landing.
+        scheduler (TurnScheduler): Turn order of the player and enemies.
+        potions_used (int): Number of potions the player has drunk during the battle.
+        enemies_left (int): Number of enemies still alive.
+    """
+
+    def __init__(
+        self,
+        player: Combatant,
+        enemies: list[Combatant],
+        rng=None,
+        damage_delay: int = 0,
+    ):
+        self.player = player
+        self.enemies = list(enemies)
+        self.rng = rng if rng is not None else RNG
+        self.damage_delay: int = damage_delay
+        self.scheduler = TurnScheduler([player, *self.enemies])
+        self.potions_used: int = 0
+        self.enemies_left: int = sum(enemy.hp > 0 for enemy in self.enemies)
+        self._listeners: list[Callable[[CombatEvent], None]] = []
+        self._pending_damage: list[list] = []  # [ms remaining, target, damage]
+
+    @property
+    def current_turn(self) -> int:
+        """
+        Returns 0 for the player's turn and i for the turn of enemies[i - 1].
+        """
+        return self.scheduler.current()
+
+    def subscribe(self, listener: Callable[[CombatEvent], None]) -> None:
+        """
+        Registers a callback for every event the engine emits.
+
+        Args:
+            listener (Callable[[CombatEvent], None]): Callback receiving events.
+        """
+        self._listeners.append(listener)
+
+    def emit(self, type: EventType, source=None, target=None, value: int = 0) -> None:
+        """
+        Sends an event to every listener.
+
+        Args:
+            type (EventType): Kind of event.
+            source (Combatant): Combatant that caused the event.
+            target (Combatant): Combatant affected by the event.
+            value (int): Amount carried by the event.
+        """
+        if self._listeners:
+            event = CombatEvent(type, source, target, value)
+            for listener in self._listeners:
+                listener(event)
+
+    def attack(self, attacker: Combatant, target: Combatant) -> int:
+        """
+        Resolves an attack: rolls damage, critical and double hits, queues the damage
+        on the target and rolls a potion drop if the player lands a killing blow.
+
+        Args:
+            attacker (Combatant): Attacking combatant.
+            target (Combatant): Combatant being attacked.
+
+        Returns:
+            int: Damage dealt.
+        """
+        rng = self.rng
+        damage = attacker.strength + rng.randint(-DAMAGE_SPREAD, DAMAGE_SPREAD)
+        self.emit(EventType.ATTACK, attacker, target)
+
+        if rng.random() < attacker.crit_chance / 100:
+            damage *= CRIT_MULTIPLIER
+            self.emit(EventType.CRITICAL_HIT, attacker, target)
+        damage = math.floor(damage)
+
+        is_player = attacker is self.player
+        if is_player and rng.random() < attacker.double_chance / 100:
+            damage *= DOUBLE_MULTIPLIER
+            self.emit(EventType.DOUBLE_HIT, attacker, target)
+
+        killing_blow = target.hp - damage <= 0  # accounts for delayed damage
+        self.queue_damage(target, damage)
+
+        if is_player and killing_blow:
+            if rng.random() < attacker.potion_chance / 100:
+                attacker.potions += 1
+                self.emit(EventType.POTION_DROP, attacker, attacker, 1)
+
+        return damage
+
+    def queue_damage(self, target: Combatant, damage: int) -> None:
+        """
+        Applies damage to the target after the engine's damage delay.
+
+        Args:
+            target (Combatant): Combatant receiving the damage.
+            damage (int): Amount of damage.
+        """
+        if self.damage_delay > 0:
+            self._pending_damage.append([self.damage_delay, target, damage])
+        else:
+            self.apply_damage(target, damage)
+
+    def apply_damage(self, target: Combatant, damage: int) -> None:
+        """
+        Lowers the target's HP and emits damage and death events.
+
+        Args:
+            target (Combatant): Combatant receiving the damage.
+            damage (int): Amount of damage.
+        """
+        was_alive = target.hp > 0
+        target.hp = max(target.hp - damage, 0)
+        target.alive = target.hp > 0
+        self.emit(EventType.DAMAGE, None, target, damage)
+
+        if was_alive and not target.alive:
+            if target is not self.player:
+                self.enemies_left -= 1
+            self.emit(EventType.DEATH, None, target)
+
+    def update(self, dt: int) -> None:
+        """
+        Advances delayed damage by the elapsed time.
+
+        Args:
+            dt (int): Milliseconds since the previous update.
+        """
+        if not self._pending_damage:
+            return
+
+        landed = []
+        for pending in self._pending_damage:
+            pending[0] -= dt
+            if pending[0] <= 0:
+                landed.append(pending)
+
+        for pending in landed:
+            self._pending_damage.remove(pending)
+            self.apply_damage(pending[1], pending[2])
+
+    @property
+    def damage_pending(self) -> bool:
+        return bool(self._pending_damage)
+
+    def can_heal(self) -> bool:
+        """
+        Checks whether the player may drink a potion.
+
+        Returns:
+            bool: True if the player has a potion and is missing HP, False otherwise.
+        """
+        return self.player.potions > 0 and self.player.hp < self.player.max_hp
+
+    def heal(self) -> int:
+        """
+        Drinks one of the player's potions.
+
+        Returns:
+            int: Amount of health restored.
+        """
+        player = self.player
+        heal_amount = HEAL_AMOUNT + self.rng.randint(-HEAL_SPREAD, HEAL_SPREAD)
+        player.hp = min(player.hp + heal_amount, player.max_hp)
+        player.potions -= 1
+        self.potions_used += 1
+        self.emit(EventType.HEAL, player, player, heal_amount)
+        return heal_amount
+
+    def enemy_turn(self) -> None:
+        """
+        Lets the enemy whose turn it is attack the player, if it is still alive.
+        """
+        enemy = self.enemies[self.current_turn - 1]
+        if enemy.alive:
+            self.attack(enemy, self.player)
+
+    def end_turn(self) -> None:
+        """
+        Passes the turn to the next living combatant in initiative order. With equal
+        speeds that is the player, then each enemy in order.
+        """
+        self.scheduler.advance()
+
+    def is_player_turn(self) -> bool:
+        """
+        Checks whether the player acts next.
+
+        Returns:
+            bool: True if the player acts next, False otherwise.
+        """
+        return self.current_turn == 0
+
+    def player_won(self) -> bool:
+        """
+        Checks whether the player has defeated every enemy.
+
+        Returns:
+            bool: True once every enemy has been reduced to 0 HP.
+        """
+        return self.enemies_left == 0
+
+    def player_lost(self) -> bool:
+        """
+        Checks whether the player has been defeated.
+
+        Returns:
+            bool: True once the player has been reduced to 0 HP.
+        """
+        return self.player.hp <= 0
+
+    def is_over(self) -> bool:
+        """
+        Checks whether the battle has ended.
+
+        Returns:
+            bool: True once either side has been defeated.
+        """
+        return self.player.hp <= 0 or self.enemies_left == 0
+
+
+def attack_first_enemy(engine: CombatEngine) -> int:
+    """
+    Simplest player policy: always attack the first living enemy.
+
+    Args:
+        engine (CombatEngine): Battle being played.
+
+    Returns:
+        int: Index of the enemy to attack.
+    """
+    for i, enemy in enumerate(engine.enemies):
+        if enemy.alive:
+            return i
+    return 0
+
+
+def run_battle(
+    engine: CombatEngine, policy: Callable[[CombatEngine], int] = attack_first_enemy
+) -> int:
+    """
+    Plays a battle to the end without any rendering or delays.
+
+    Args:
+        engine (CombatEngine): Battle to play. Its damage delay should be 0.
+        policy (Callable[[CombatEngine], int]): Chooses the player's action, returning
+            the index of the enemy to attack or USE_POTION. Potions that can't be
+            drunk fall back to attacking the first living enemy.
+
+    Returns:
+        int: Number of turns taken.
+    """
+    turns = 0
+    while not engine.is_over():
+        if engine.current_turn == 0:
+            choice = policy(engine)
+            if choice == USE_POTION and engine.can_heal():
+                engine.heal()
+            else:
+                if choice == USE_POTION:
+                    choice = attack_first_enemy(engine)
+                engine.attack(engine.player, engine.enemies[choice])
+        else:
+            engine.enemy_turn()
+        engine.end_turn()
+        turns += 1
+    return turns
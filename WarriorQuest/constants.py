@@ -1,6 +1,9 @@
-import pygame
+"""
+Pure game data: dimensions, settings, asset paths and character stats.
 
-pygame.init()
+Nothing here touches pygame, so any module can import it without opening a window
+or loading files. The display, fonts and images themselves live in assets.py.
+"""
 
 # colours
 RED = (255, 0, 0)
@@ -10,44 +13,44 @@ GREEN = (0, 255, 0)
 WIDTH = 800
 HEIGHT = 550
 PANEL_HEIGHT = 150
+CAPTION = "DungeonQUEST"
 
-# fonts
-FONT_SM = pygame.font.SysFont("Times New Roman", 18)
-FONT = pygame.font.SysFont("Times New Roman", 26)
-FONT_LG = pygame.font.SysFont("Times New Roman", 36)
+# fonts: asset name -> point size
+FONT_NAME = "Times New Roman"
+FONT_SIZES = {
+    "FONT_SM": 18,
+    "FONT": 26,
+    "FONT_LG": 36,
+}
 
 # game settings
 FPS = 60
 ACTION_WAIT_TIME = 90
 POTION_EFFECT = 15
-CLOCK = pygame.time.Clock()
 
-# Pygame screen initialization
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("DungeonQUEST")
-
-# backgrounds
-FOREST1 = pygame.image.load("graphics/backgrounds/forest1.png").convert_alpha()
-FOREST2 = pygame.image.load("graphics/backgrounds/forest2.png").convert_alpha()
-CASTLE1 = pygame.image.load("graphics/backgrounds/castle1.jpg").convert_alpha()
-CASTLE2 = pygame.image.load("graphics/backgrounds/castle2.jpg").convert_alpha()
-CASTLE3 = pygame.image.load("graphics/backgrounds/castle3.jpg").convert_alpha()
-
-# icons
-PANEL = pygame.image.load("graphics/icons/panel.png").convert_alpha()
-SWORD = pygame.image.load("graphics/icons/sword.png").convert_alpha()
-POTION = pygame.image.load("graphics/icons/potion.png").convert_alpha()
-VICTORY = pygame.image.load("graphics/icons/victory.png").convert_alpha()
-DEFEAT = pygame.image.load("graphics/icons/defeat.png").convert_alpha()
-
-# buttons
-RESTART = pygame.image.load("graphics/icons/restart.png").convert_alpha()
-PLAY = pygame.image.load("graphics/buttons/play.png").convert_alpha()
-CONTINUE = pygame.image.load("graphics/buttons/continue.png").convert_alpha()
-TUTORIAL = pygame.image.load("graphics/buttons/tutorial.png").convert_alpha()
-BACK = pygame.image.load("graphics/buttons/back.png").convert_alpha()
-EXIT = pygame.image.load("graphics/buttons/exit.png").convert_alpha()
-QUIT = pygame.image.load("graphics/buttons/quit.png").convert_alpha()
+# images: asset name -> path
+IMAGES = {
+    # backgrounds
+    "FOREST1": "graphics/backgrounds/forest1.png",
+    "FOREST2": "graphics/backgrounds/forest2.png",
+    "CASTLE1": "graphics/backgrounds/castle1.jpg",
+    "CASTLE2": "graphics/backgrounds/castle2.jpg",
+    "CASTLE3": "graphics/backgrounds/castle3.jpg",
+    # icons
+    "PANEL": "graphics/icons/panel.png",
+    "SWORD": "graphics/icons/sword.png",
+    "POTION": "graphics/icons/potion.png",
+    "VICTORY": "graphics/icons/victory.png",
+    "DEFEAT": "graphics/icons/defeat.png",
+    # buttons
+    "RESTART": "graphics/icons/restart.png",
+    "PLAY": "graphics/buttons/play.png",
+    "CONTINUE": "graphics/buttons/continue.png",
+    "TUTORIAL": "graphics/buttons/tutorial.png",
+    "BACK": "graphics/buttons/back.png",
+    "EXIT": "graphics/buttons/exit.png",
+    "QUIT": "graphics/buttons/quit.png",
+}
 
 # character stats
 CHARACTERS = [
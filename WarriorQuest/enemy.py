@@ -1,5 +1,20 @@
 import pygame
+from typing import Iterator
 from fighter import Fighter, Action
+from frame_cache import CachedFrame
+from random_source import RNG
+
+# (name, display name, max hp, strength, crit chance, type)
+ENEMIES = [
+    ("Golem", "Crystal Golem", 28, 4, 3, "enemy"),
+    ("Witch", "Great Witch", 22, 3, 5, "enemy"),
+    ("Fireworm", "Fireworm", 18, 2, 3, "enemy"),
+]
+BOSSES = [
+    ("Bringer", "Bringer of Death", 40, 8, 2, "boss"),
+    ("Mage", "Dark Mage", 30, 6, 5, "boss"),
+    ("Oldking", "Old King", 50, 9, 5, "boss"),
+]
 
 
 class Enemy(Fighter):
@@ -15,7 +30,8 @@ class Enemy(Fighter):
         y_pos: int = 0,
     ):
         super().__init__(name, max_hp, strength, crit_chance, x_pos, y_pos)
-        self.hitbox = pygame.Rect(0, 0, 100, 120)
+        self.hitbox = pygame.Rect(0, 0, 0, 0)  # empty until the enemy is placed
+        self.mask: pygame.mask.Mask | None = None
         self.type = type
         self.display_name = display_name
 
@@ -27,38 +43,54 @@ class Enemy(Fighter):
             target_x (int): x position to move to.
         """
         if self.x_pos > target_x:
-            self.action = Action.WALK
-            self.animation_timer = 0
+            self.set_action(Action.WALK)
 
-    def update_walk_pos(self, target_x: int, speed: int = 10) -> None:
+    def update_walk_pos(self, target_x: int, dt: int, speed: int = 100) -> None:
         """
         Updates the player's position for walking.
 
         Args:
             target_x (int): Target x position to reach.
-            speed (int): Speed of movement.
+            dt (int): Milliseconds since the previous update.
+            speed (int): Speed of movement in pixels per second.
         """
         if self.action == Action.WALK:
             if self.x_pos > target_x:
-                self.x_pos = max(self.x_pos - speed, target_x)
+                self.x_pos = max(self.x_pos - speed * dt / 1000, target_x)
                 if self.x_pos <= target_x:
                     self.action = Action.IDLE
 
-    def update_hitbox(
-        self, x_pos: int, y_pos: int, width: int = 100, height: int = 120
-    ) -> None:
+    def update_hitbox(self, frame: CachedFrame) -> None:
         """
-        Update the position of the enemy's hitbox.
+        Fits the enemy's hitbox to the visible pixels of the frame it is showing,
+        drawn with its feet at its position.
 
         Args:
-            x_pos (int): X-coordinate of the hitbox.
-            y_pos (int): Y-coordinate of the hitbox.
-            width (int): Width of the hitbox (default 100).
-            height (int): Height of the hitbox (default 120).
+            frame (CachedFrame): Current animation frame.
         """
-        if self.type == "boss":
-            self.hitbox = pygame.Rect(0, 0, width, height)
-        self.hitbox.topleft = (x_pos, y_pos)
+        frame_width, frame_height = frame.size
+        offset_x, offset_y = frame.offset
+        self.hitbox.update(
+            self.x_pos - frame_width // 2 + offset_x,
+            self.y_pos - frame_height + offset_y,
+            *frame.image.get_size(),
+        )
+        self.mask = frame.mask
+
+    def hit_test(self, pos: tuple[int, int]) -> bool:
+        """
+        Checks whether a point is on one of the enemy's opaque pixels: against the
+        hitbox first, then the current frame's mask.
+
+        Args:
+            pos (tuple[int, int]): Point on the screen.
+
+        Returns:
+            bool: True if the point is on the enemy, False otherwise.
+        """
+        if not self.hitbox.collidepoint(pos):
+            return False
+        return bool(self.mask.get_at((pos[0] - self.hitbox.x, pos[1] - self.hitbox.y)))
 
 
 def create_enemy(index: int) -> Enemy:
@@ -74,14 +106,8 @@ def create_enemy(index: int) -> Enemy:
     Raises:
         ValueError: If the provided index is out of range.
     """
-    enemies = [
-        ("Golem", "Crystal Golem", 28, 4, 3, "enemy"),
-        ("Witch", "Great Witch", 22, 3, 5, "enemy"),
-        ("Fireworm", "Fireworm", 18, 2, 3, "enemy"),
-    ]
-
-    if 0 <= index < len(enemies):
-        return Enemy(*enemies[index])
+    if 0 <= index < len(ENEMIES):
+        return Enemy(*ENEMIES[index])
     else:
         raise ValueError(f"Invalid enemy index: {index}")
 
@@ -99,40 +125,49 @@ def create_boss(index: int) -> Enemy:
     Raises:
         ValueError: If the provided index is out of range.
     """
-    bosses = [
-        ("Bringer", "Bringer of Death", 40, 8, 2, "boss"),
-        ("Mage", "Dark Mage", 30, 6, 5, "boss"),
-        ("Oldking", "Old King", 50, 9, 5, "boss"),
-    ]
-
-    if 0 <= index < len(bosses):
-        return Enemy(*bosses[index])
+    if 0 <= index < len(BOSSES):
+        return Enemy(*BOSSES[index])
     else:
         raise ValueError(f"Invalid boss index: {index}")
 
 
-def animate_enemy(
-    screen: pygame.Surface, enemy: Enemy, animations: dict, scale: float
-) -> None:
+def spawn_level(level: int, rng=RNG) -> Iterator[list[tuple]]:
     """
-    Render the enemy's current animation frame to the screen.
+    Rolls the enemies of each round of a level: a few rounds of one or two regular
+    enemies, followed by the level's boss.
 
     Args:
-        screen (pygame.Surface): The surface to render on.
-        enemy (Enemy): The enemy to animate.
+        level (int): Level number, starting at 1.
+        rng (random.Random): Random number generator. Defaults to the shared game RNG.
+
+    Yields:
+        list[tuple]: Rows of ENEMIES or BOSSES for the enemies of the next round.
+    """
+    total_level_enemies = level + rng.randint(4, 6)
+
+    while total_level_enemies > 1:
+        current_round_enemies = min(rng.randint(1, 2), total_level_enemies - 1)
+        yield [ENEMIES[rng.randint(0, 2)] for _ in range(current_round_enemies)]
+        total_level_enemies -= current_round_enemies
+
+    yield [BOSSES[level - 1]]
+
+
+def pose_enemy(enemy: Enemy, animations: dict, scale: float) -> CachedFrame:
+    """
+    Picks the enemy's current animation frame and fits its hitbox to it.
+
+    Args:
+        enemy (Enemy): The enemy to pose.
         animations (dict): The dictionary containing animations.
         scale (float): Scaling factor for the animation.
+
+    Returns:
+        CachedFrame: The frame to draw at the enemy's hitbox.
     """
     current_animation = animations[enemy.name.lower()][enemy.action.value]
 
-    if enemy.death_animation_done:
-        current_frame = current_animation.get_last_death_frame(scale=scale)
-    else:
-        current_frame = current_animation.get_current_frame(scale=scale)
-
-    frame_width = current_frame.get_width()
-    frame_height = current_frame.get_height()
-    x_pos = enemy.x_pos - frame_width // 2
-    y_pos = enemy.y_pos - frame_height
-
-    screen.blit(current_frame, (x_pos, y_pos))
+    enemy.playback.play(current_animation, loop=enemy.action != Action.DEATH)
+    current_frame = enemy.playback.get_frame(scale=scale)
+    enemy.update_hitbox(current_frame)
+    return current_frame
@@ -1,8 +1,6 @@
-from random import randint, random
-import math
-from animations import load_character_animations
+from animations import get_animation, AnimationPlayback
 from enum import Enum
-from battle import display_action_text
+from combat import Combatant
 
 
 class Action(Enum):
@@ -14,7 +12,7 @@ class Action(Enum):
     WALK = "walk"
 
 
-class Fighter:
+class Fighter(Combatant):
     def __init__(
         self,
         name: str,
@@ -24,105 +22,40 @@ class Fighter:
         x_pos: int,
         y_pos: int,
     ):
-        self.name: str = name
-        self.max_hp: int = max_hp
-        self.hp: int = max_hp
-        self.strength: int = strength
-        self.crit_chance: int = crit_chance
-
-        self.alive: bool = True
+        super().__init__(name, max_hp, strength, crit_chance)
         self.action: Action = Action.IDLE
-        self.delayed_damage: int = 0
 
         self.x_pos: int = x_pos
         self.y_pos: int = y_pos
 
-        self.animation_timer: int = 0
-        self.delay_counter: int = 0
-        self.current_frame_index: int = 0
-        self.animations = load_character_animations()
+        self.playback = AnimationPlayback()
 
         self.death_animation_done: bool = False
-        self.death_animation_timer: int = 0
 
-    def take_damage(self, damage: int) -> None:
+    def set_action(self, action: Action) -> None:
         """
-        Apply delayed damage to the fighter.
+        Switch to a new action and play its animation from the first frame.
 
         Args:
-            damage (int): Amount of damage to be taken.
-        """
-        self.delayed_damage = damage
-        self.alive = self.hp > 0
-        self.delay_counter = 10
-
-    def attack(self) -> int:
-        """
-        Calculate the damage dealt by the fighter.
-
-        Returns:
-            int: Damage value including potential critical hit.
+            action (Action): Action to perform.
         """
-        damage = self.strength + randint(-5, 5)
-        self.action = Action.ATTACK
-        self.animation_timer = 0
+        self.action = action
+        self.playback.restart(
+            get_animation(self.name, action.value), loop=action != Action.DEATH
+        )
 
-        if random() < self.crit_chance / 100:
-            damage *= 1.5
-            display_action_text(target=self, text="Critical hit!", colour=(0, 0, 255))
-
-        return math.floor(damage)
-
-    def apply_damage(self) -> None:
-        """
-        Apply damage and update the action based on remaining HP.
+    def update_animation(self, dt: int) -> None:
         """
-        self.hp = max(self.hp - self.delayed_damage, 0)
-        self.alive = self.hp > 0
-
-        self.action = Action.HURT if self.alive else Action.DEATH
-        self.animation_timer = 0
-
-        display_action_text(target=self, text=self.delayed_damage, colour=(255, 0, 0))
-        self.delayed_damage = 0
+        Update the fighter's animation, returning to idle once a one-off action ends.
 
-    def update_animation(self) -> None:
-        """
-        Update the fighter's animation and process delayed actions like applying damage.
+        Args:
+            dt (int): Milliseconds since the previous update.
         """
-        if self.delay_counter > 0:
-            self.delay_counter -= 1
-            if self.delay_counter == 0:
-                self.apply_damage()
-            return
-
-        current_animation = self.animations[self.name.lower()][self.action.value]
-        animation_length = current_animation.get_frame_count()
+        current_animation = get_animation(self.name, self.action.value)
+        self.playback.play(current_animation, loop=self.action != Action.DEATH)
+        self.playback.advance(dt)
 
         if self.action == Action.DEATH:
-            self.update_death_animation(animation_length)
-        else:
-            self.update_regular_animation(animation_length)
-
-    def update_death_animation(self, animation_length: int) -> None:
-        """
-        Update death animation to ensure it runs only once.
-        """
-        if not self.death_animation_done:
-            self.death_animation_timer += 1
-            if self.death_animation_timer >= animation_length:
-                self.death_animation_done = True
-
-    def update_regular_animation(self, animation_length: int) -> None:
-        """
-        Update animations for actions other than death.
-        """
-        if self.action != Action.IDLE:
-            self.animation_timer += 1
-            if self.animation_timer >= animation_length:
-                self.animation_timer = 0
-                self.current_frame_index = (
-                    self.current_frame_index + 1
-                ) % animation_length
-                if self.action != Action.WALK:
-                    self.action = Action.IDLE
+            self.death_animation_done = self.playback.finished
+        elif self.action not in (Action.IDLE, Action.WALK) and self.playback.finished:
+            self.action = Action.IDLE
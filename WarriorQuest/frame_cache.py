@@ -0,0 +1,152 @@
+import pygame
+from collections import OrderedDict
+from typing import NamedTuple
+
+# constants
+FRAME_CACHE_BUDGET = 64 * 1024 * 1024  # bytes
+
+
+class CachedFrame(NamedTuple):
+    """
+    A scaled animation frame trimmed to its visible pixels.
+
+    Attributes:
+        image (pygame.Surface): Visible part of the scaled frame.
+        offset (tuple[int, int]): Position of the image inside the full scaled frame.
+        size (tuple[int, int]): Width and height of the full scaled frame.
+        mask (pygame.mask.Mask): Opaque pixels of the image, for hit testing.
+    """
+
+    image: pygame.Surface
+    offset: tuple[int, int]
+    size: tuple[int, int]
+    mask: pygame.mask.Mask
+
+
+class FrameCache:
+    """
+    Least-recently-used cache of scaled animation frames with a memory budget.
+
+    Frames are scaled once per (character, action, frame, scale) and trimmed to
+    their bounding rect, so drawing a fighter is a single blit of a cached surface.
+    Each frame's collision mask is built along with it.
+
+    Attributes:
+        budget (int): Maximum number of bytes of pixel data kept in the cache.
+        size (int): Number of bytes of pixel data currently cached.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to scale a frame.
+    """
+
+    def __init__(self, budget: int = FRAME_CACHE_BUDGET):
+        self.budget: int = budget
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._frames: OrderedDict[tuple, CachedFrame] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get(self, animation, index: int, scale: float) -> CachedFrame:
+        """
+        Gets a scaled frame, scaling and storing it on the first request.
+
+        Args:
+            animation (Animation): Animation the frame belongs to.
+            index (int): Index of the frame in the animation.
+            scale (float): Scale for the frame.
+
+        Returns:
+            CachedFrame: The scaled, trimmed frame.
+        """
+        key = (animation.name, animation.action, index, scale)
+        cached = self._frames.get(key)
+
+        if cached is not None:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        cached = scale_frame(animation.frames[index], scale)
+        self._frames[key] = cached
+        self.size += frame_bytes(cached)
+        self.evict()
+        return cached
+
+    def evict(self) -> None:
+        """
+        Drops least recently used frames until the cache fits its budget.
+        """
+        while self.size > self.budget and len(self._frames) > 1:
+            _, cached = self._frames.popitem(last=False)
+            self.size -= frame_bytes(cached)
+
+    def warm_up(self, animations, scale: float) -> None:
+        """
+        Pre-scales every frame of the given animations so drawing them never misses.
+
+        Args:
+            animations (Iterable[Animation]): Animations to prepare.
+            scale (float): Scale the animations will be drawn at.
+        """
+        for animation in animations:
+            for index in range(animation.get_frame_count()):
+                self.get(animation, index, scale)
+
+    def clear(self) -> None:
+        """
+        Removes every cached frame.
+        """
+        self._frames.clear()
+        self.size = 0
+
+
+def scale_frame(frame: pygame.Surface, scale: float) -> CachedFrame:
+    """
+    Scales a frame, trims away its fully transparent border and builds the mask
+    of its opaque pixels.
+
+    Args:
+        frame (pygame.Surface): Unscaled animation frame.
+        scale (float): Scale for the frame.
+
+    Returns:
+        CachedFrame: The scaled, trimmed frame.
+    """
+    size = (int(frame.get_width() * scale), int(frame.get_height() * scale))
+    scaled = pygame.transform.scale(frame, size) if scale != 1 else frame
+
+    # only search for the scaled bounds around the unscaled ones, a pixel wider
+    # for rounding, as scanning every pixel of large frames is slow
+    bounds = frame.get_bounding_rect()
+    search = pygame.Rect(
+        int(bounds.x * scale) - 1,
+        int(bounds.y * scale) - 1,
+        int(bounds.width * scale) + 3,
+        int(bounds.height * scale) + 3,
+    ).clip(scaled.get_rect())
+    bounds = scaled.subsurface(search).get_bounding_rect().move(search.topleft)
+    image = scaled.subsurface(bounds).copy()
+    if pygame.display.get_surface() is not None:
+        image = image.convert_alpha()
+    return CachedFrame(image, bounds.topleft, size, pygame.mask.from_surface(image))
+
+
+def frame_bytes(cached: CachedFrame) -> int:
+    """
+    Returns the amount of pixel memory held by a cached frame and its mask.
+
+    Args:
+        cached (CachedFrame): Cached frame.
+
+    Returns:
+        int: Size of the frame's pixel and mask data in bytes.
+    """
+    image = cached.image
+    pixels = image.get_width() * image.get_height()
+    return pixels * image.get_bytesize() + pixels // 8
+
+
+FRAME_CACHE = FrameCache()
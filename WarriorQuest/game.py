@@ -1,38 +1,53 @@
 import pygame
-from random import randint
-from constants import (
-    SCREEN,
-    WIDTH,
-    CLOCK,
-    FPS,
-    FOREST1,
-    CASTLE2,
-    CASTLE3,
-    PANEL,
-    HEIGHT,
-    PANEL_HEIGHT,
-    POTION,
-    VICTORY,
-    EXIT,
-    DEFEAT,
+from typing import Iterator
+import assets
+from constants import WIDTH, FPS, HEIGHT, PANEL_HEIGHT, CHARACTERS
+from utils import (
+    draw_text,
+    draw_bg,
+    draw_panel,
+    draw_panel_background,
+    draw_characters,
+    layout_characters,
+    prepare_background,
+    warm_up_frame_cache,
 )
-from utils import draw_text, draw_bg, draw_panel, draw_characters
 from player import create_character
-from enemy import create_enemy, create_boss
-from animations import load_character_animations
+from enemy import Enemy, ENEMIES, BOSSES, spawn_level
+from animations import get_animations
+from combat import CombatEngine
+from random_source import RNG, RandomSource
+from replay import LiveInput, InputRecorder, SessionSummary
 from battle import (
+    DAMAGE_DELAY,
+    MOUSE,
     handle_actions,
-    damage_text_group,
-    heal_text_group,
-    potion_text_group,
-    crit_text_group,
+    handle_combat_event,
+    show_combat_event_text,
+    draw_cursor,
+    warm_up_action_texts,
 )
+from action_text import ACTION_TEXTS
 from button import Button
+from preloader import PRELOADER
+from profiler import Profiler
+from renderer import DirtyRectRenderer
 from enum import Enum, auto
 
+try:
+    from solver import BackgroundSolver, SOLVING
+except ImportError:  # the win odds readout needs NumPy
+    BackgroundSolver = None
+
+
+ROUND_OVER_DURATION = 2500  # ms the round over message stays on screen
+MAX_FRAME_TIME = 100  # ms, caps dt after stalls so timers don't jump ahead
+SIM_STEP = 1000 // FPS  # ms of game time simulated per logic step
+ENEMY_SPACING = 130  # px between enemies in a round
+FORMATION_WIDTH = 400  # px that larger waves are squeezed into
 
 display_round_over = True
-round_display_duration = 25
+round_display_duration = ROUND_OVER_DURATION
 
 
 class GameState(Enum):
@@ -43,12 +58,46 @@ class GameState(Enum):
     GAME_OVER_PLAYER_WIN = auto()
 
 
-def main(selected_char: int, on_exit):
+def main(
+    selected_char: int,
+    on_exit,
+    rng: RandomSource = RNG,
+    record: str | None = None,
+    speed: int = 1,
+    profile: str | None = None,
+):
     """
     Initialize the game and start the main game loop.
+
+    Args:
+        selected_char (int): Index of the character to play.
+        on_exit: Callback function when the game is over.
+        rng (RandomSource): Random number generator for enemy spawns and combat.
+        record (str): Path to record the session's input to, if any.
+        speed (int): Game time simulated per real millisecond.
+        profile (str): Path to write a frame-time trace to, if any.
     """
     pygame.init()
-    game = Game(selected_char, on_exit)
+    # finish the sprites the game needs if the preloader hasn't yet
+    PRELOADER.wait_for(
+        CHARACTERS[selected_char]["name"], *(row[0] for row in ENEMIES + BOSSES)
+    )
+
+    input_source = None
+    if record:
+        # a recorded session starts from a known seed so it can be replayed
+        rng = RandomSource(rng.randrange(2**32))
+        recorder = InputRecorder(record, rng.seed_value, selected_char, speed)
+        input_source = LiveInput(assets.CLOCK, FPS, recorder)
+
+    game = Game(
+        selected_char,
+        on_exit,
+        rng,
+        input_source,
+        speed=speed,
+        profiler=Profiler(profile),
+    )
     game.run()
 
 
@@ -61,25 +110,70 @@ class Game:
         animations (dict): Dictionary containing character animations.
         round (int): Current round number.
         current_level (int): Current level of the game.
-        backgrounds (list): List of background images for each level.
+        backgrounds (list[str]): Asset names of the background of each level.
+        background (pygame.Surface): Scaled background of the level being played.
+        renderer (DirtyRectRenderer): Renderer that only redraws what changed each frame.
         player_target_position (int): Target x-coordinate for player's walk in.
         enemy_start_position (int): Starting x-coordinate for enemies before walk in.
         enemy_target_position (int): Target x-coordinate for enemies' walk in.
+        dt (int): Milliseconds of game time simulated by the current step.
         game_state (GameState): Current state of the game depending on player actions.
         on_exit: Callback function when the game is over.
+        rng (RandomSource): Random number generator for enemy spawns and combat.
+        input (LiveInput | ReplayInput): Source of the input read every frame.
+        headless (bool): Whether drawing is skipped entirely, for fast replays.
+        clicked (bool): Whether the mouse was clicked since the last step handled input.
+        mouse_pos (tuple[int, int]): Pointer position during the current frame.
+        speed (int): Game time simulated per real millisecond; above 1 fast-forwards.
+        accumulator (int): Game time in ms banked by tick() but not yet simulated.
+        round_over_message (str | None): Round over message shown this frame, if any.
+        profiler (Profiler): Times the stages of every frame; F3 shows the overlay.
+        show_odds (bool): Whether the panel shows the chance of winning the battle
+            and the best action, toggled with F4.
+        solver (BackgroundSolver | None): Solver of the round being played,
+            started when the odds are first shown.
+        odds (Solution | None): Latest solution shown on the panel.
+        controller (MouseController | AutoplayController): Chooses the player's
+            actions and presses the exit button.
     """
 
-    def __init__(self, selected_char: int, on_exit):
+    def __init__(
+        self,
+        selected_char: int,
+        on_exit,
+        rng: RandomSource = RNG,
+        input_source=None,
+        headless: bool = False,
+        speed: int = 1,
+        profiler: Profiler | None = None,
+        controller=None,
+    ):
         self.player = create_character(selected_char)
-        self.animations = load_character_animations()
+        self.animations = get_animations()
         self.round: int = 1
+        self.dt: int = SIM_STEP
         self.current_level: int = 1
-        self.backgrounds = [FOREST1, CASTLE3, CASTLE2]
+        self.backgrounds = ["FOREST1", "CASTLE3", "CASTLE2"]
+        self.background: pygame.Surface | None = None
+        self.renderer = DirtyRectRenderer(assets.SCREEN, enabled=not headless)
         self.player_target_position = 100
         self.enemy_start_position: int = WIDTH + 10
         self.enemy_target_position: int = 700
         self.game_state: GameState = GameState.RUNNING
         self.on_exit = on_exit
+        self.rng = rng
+        self.input = input_source if input_source else LiveInput(assets.CLOCK, FPS)
+        self.headless: bool = headless
+        self.clicked: bool = False
+        self.mouse_pos: tuple[int, int] = (0, 0)
+        self.speed: int = speed
+        self.accumulator: int = 0
+        self.round_over_message: str | None = None
+        self.profiler = profiler if profiler else Profiler()
+        self.show_odds: bool = False
+        self.solver = None
+        self.odds = None
+        self.controller = controller if controller else MOUSE
 
     def run(self) -> None:
         """
@@ -92,26 +186,23 @@ class Game:
         """
         Play a single level of the game, managing rounds and enemies.
         """
-        total_level_enemies = self.current_level + randint(4, 6)
+        if not self.headless:
+            warm_up_frame_cache(self.player, self.animations, self.current_level)
+            warm_up_action_texts()
+            self.background = prepare_background(
+                assets.get(self.backgrounds[self.current_level - 1]),
+                WIDTH,
+                HEIGHT - PANEL_HEIGHT,
+            )
 
-        while total_level_enemies >= 0:
+        for round_enemies in spawn_level(self.current_level, self.rng):
             self.player_walk_in()
-
-            if total_level_enemies <= 1:
-                enemies = [create_boss(self.current_level - 1)]
-                total_level_enemies = 0
-                current_round_enemies = 1
-            else:
-                current_round_enemies = min(randint(1, 2), total_level_enemies - 1)
-                enemies = [
-                    create_enemy(randint(0, 2)) for _ in range(current_round_enemies)
-                ]
-
-            total_level_enemies -= current_round_enemies
+            enemies = [Enemy(*row) for row in round_enemies]
             self.enemy_walk_in(enemies)
             self.play_round(enemies)
             self.round += 1
 
+        self.background = None
         self.current_level += 1
         self.round = 1
 
@@ -122,82 +213,136 @@ class Game:
         Args:
             enemies (list): List of enemy instances for the round.
         """
-        global display_round_over, round_display_duration
-        current_fighter = 0
         action_cooldown = 0
         self.game_state = GameState.RUNNING
 
-        while self.game_state == GameState.RUNNING:
-            clicked = self.handle_events()
+        potion_button = Button(
+            assets.SCREEN,
+            x=120,
+            y=HEIGHT - PANEL_HEIGHT * 0.25,
+            image=assets.POTION,
+            width=55,
+            height=55,
+        )
+        if not self.headless:
+            self.renderer.set_background(self.create_battle_background(potion_button))
 
-            self.draw_background()
-            potion_button = self.draw_ui_elements(enemies)
-
-            current_fighter, action_cooldown = handle_actions(
-                SCREEN,
-                clicked=clicked,
-                current_fighter=current_fighter,
-                player=self.player,
-                enemies=enemies,
-                potion_button=potion_button,
-                action_cooldown=action_cooldown,
-            )
+        engine = CombatEngine(
+            self.player, enemies, rng=self.rng, damage_delay=DAMAGE_DELAY
+        )
+        engine.subscribe(handle_combat_event)
+        if not self.headless:
+            engine.subscribe(show_combat_event_text)
+        self.solver = self.odds = None
 
-            self.update_sprites(enemies=enemies)
+        profiler = self.profiler
+        while self.game_state == GameState.RUNNING:
+            self.tick()
+
+            for _ in self.steps():
+                with profiler.scope("handle_actions"):
+                    action_cooldown = handle_actions(
+                        clicked=self.handle_events(),
+                        pos=self.mouse_pos,
+                        engine=engine,
+                        potion_button=potion_button,
+                        action_cooldown=action_cooldown,
+                        dt=self.dt,
+                        controller=self.controller,
+                    )
+                with profiler.scope("combat"):
+                    engine.update(self.dt)
+                with profiler.scope("update_sprites"):
+                    self.update_sprites(enemies=enemies)
+                self.check_round_over(engine, enemies)
+
+                if self.game_state != GameState.RUNNING:
+                    break
+
+            if self.show_odds and not self.headless:
+                with profiler.scope("solver"):
+                    self.update_odds(engine)
+            with profiler.scope("draw_background"):
+                self.draw_background()
+            with profiler.scope("draw_ui_elements"):
+                self.draw_ui_elements(enemies)
+            if not self.headless:
+                with profiler.scope("draw_cursor"):
+                    draw_cursor(self.renderer, self.mouse_pos, engine, action_cooldown)
+            with profiler.scope("draw_sprites"):
+                self.draw_sprites()
+                self.draw_round_over_message()
             self.update_screen()
 
-            if self.player.hp <= 0:
-                if display_round_over:
-                    self.display_round_over_message(is_success=False)
-                else:
-                    round_display_duration = 25
-                    display_round_over = True
-                    self.game_state = GameState.PLAYER_LOSS
-
-            if all(enemy.hp <= 0 for enemy in enemies):
-                if display_round_over:
-                    self.display_round_over_message(is_success=True)
-                else:
-                    round_display_duration = 25
-                    display_round_over = True
-
-                    self.game_state = GameState.PLAYER_WIN
-                    if enemies[0].type == "boss" and self.current_level == 3:
-                        self.game_state = GameState.GAME_OVER_PLAYER_WIN
+        if self.solver:
+            self.solver.close()
+        self.display_game_over_message()
 
-            pygame.display.update()
-            CLOCK.tick(FPS)
+        if self.game_state == GameState.PLAYER_WIN:
+            self.player_walk_out(speed=200, is_boss=enemies[0].type == "boss")
 
-        self.display_game_over_message()
+    def update_odds(self, engine: CombatEngine) -> None:
+        """
+        Solve the battle for the panel's odds readout, once the damage of the last
+        attack has landed. The solving is done on a worker thread, so this never
+        waits on it; the readout shows SOLVING until the solution arrives.
 
-        if self.game_state == GameState.PLAYER_WIN :
-            self.player_walk_out(speed=20, is_boss=enemies[0].type == "boss")
+        Args:
+            engine (CombatEngine): Battle being played.
+        """
+        if self.solver is None:
+            self.solver = BackgroundSolver(self.player, engine.enemies)
+        if not engine.damage_pending:
+            odds = self.solver.request(engine)
+            if odds is None and not self.solver.failed:
+                odds = SOLVING
+            self.odds = odds
 
     def display_game_over_message(self) -> None:
         """
         Display a message indicating the outcome of the game.
         """
-        SCREEN.fill((0, 0, 0))
-
         if self.game_state == GameState.GAME_OVER_PLAYER_WIN:
-            pygame.mouse.set_visible(True)
-            running = True
-            while running:
-                SCREEN.fill((0, 0, 0))
-                clicked = self.handle_events()
-
-                victory_icon = Button(
-                    SCREEN,
-                    x=WIDTH // 2,
-                    y=180,
-                    image=VICTORY,
-                    width=280,
-                    height=64,
-                )
-                victory_icon.draw()
+            icon = Button(
+                assets.SCREEN,
+                x=WIDTH // 2,
+                y=180,
+                image=assets.VICTORY,
+                width=280,
+                height=64,
+            )
+        elif self.game_state == GameState.PLAYER_LOSS:
+            icon = Button(
+                assets.SCREEN,
+                x=WIDTH // 2,
+                y=180,
+                image=assets.DEFEAT,
+                width=240,
+                height=64,
+            )
+        else:
+            return
+
+        exit_button = Button(
+            assets.SCREEN,
+            x=WIDTH // 2,
+            y=380,
+            image=assets.EXIT,
+            width=92 * 2,
+            height=28 * 2,
+        )
+        pygame.mouse.set_visible(True)
 
+        running = True
+        while running:
+            frame_time = self.tick()
+            clicked = self.handle_events()
+
+            if not self.headless:
+                assets.SCREEN.fill((0, 0, 0))
+                icon.draw()
                 draw_text(
-                    SCREEN,
+                    assets.SCREEN,
                     text="JOURNEY IS OVER",
                     x=WIDTH // 2,
                     y=250,
@@ -205,77 +350,49 @@ class Game:
                     size="lg",
                     position="center",
                 )
-
-                exit_button = Button(
-                    SCREEN,
-                    x=WIDTH // 2,
-                    y=380,
-                    image=EXIT,
-                    width=92 * 2,
-                    height=28 * 2,
-                )
                 exit_button.draw()
-
-                if clicked:
-                    mouse_pos = pygame.mouse.get_pos()
-                    if exit_button.rect.collidepoint(mouse_pos):
-                        running = False
-                        if self.on_exit:
-                            self.on_exit()
-
                 pygame.display.update()
-                CLOCK.tick(FPS)
 
-        elif self.game_state == GameState.PLAYER_LOSS:
-            pygame.mouse.set_visible(True)
-            running = True
-            while running:
-                SCREEN.fill((0, 0, 0))
-                clicked = self.handle_events()
-
-                defeat_icon = Button(
-                    SCREEN,
-                    x=WIDTH // 2,
-                    y=180,
-                    image=DEFEAT,
-                    width=240,
-                    height=64,
-                )
-                defeat_icon.draw()
+            if self.controller.press(
+                exit_button, clicked, self.mouse_pos, frame_time * self.speed
+            ):
+                running = False
+                self.exit()
 
-                draw_text(
-                    SCREEN,
-                    text="JOURNEY IS OVER",
-                    x=WIDTH // 2,
-                    y=250,
-                    colour="white",
-                    size="lg",
-                    position="center",
-                )
+    def check_round_over(self, engine: CombatEngine, enemies) -> None:
+        """
+        End the round once either side is defeated, after the round over message
+        has been shown.
 
-                exit_button = Button(
-                    SCREEN,
-                    x=WIDTH // 2,
-                    y=380,
-                    image=EXIT,
-                    width=92 * 2,
-                    height=28 * 2,
-                )
-                exit_button.draw()
+        Args:
+            engine (CombatEngine): Battle being played.
+            enemies (list): List of enemy instances for the round.
+        """
+        global display_round_over, round_display_duration
+        self.round_over_message = None
 
-                if clicked:
-                    mouse_pos = pygame.mouse.get_pos()
-                    if exit_button.rect.collidepoint(mouse_pos):
-                        running = False
-                        if self.on_exit:
-                            self.on_exit()
+        if engine.player_lost():
+            if display_round_over:
+                self.display_round_over_message(is_success=False)
+            else:
+                round_display_duration = ROUND_OVER_DURATION
+                display_round_over = True
+                self.game_state = GameState.PLAYER_LOSS
 
-                pygame.display.update()
-                CLOCK.tick(FPS)
+        if engine.player_won():
+            if display_round_over:
+                self.display_round_over_message(is_success=True)
+            else:
+                round_display_duration = ROUND_OVER_DURATION
+                display_round_over = True
+
+                self.game_state = GameState.PLAYER_WIN
+                if enemies[0].type == "boss" and self.current_level == 3:
+                    self.game_state = GameState.GAME_OVER_PLAYER_WIN
 
     def display_round_over_message(self, is_success: bool = True) -> None:
         """
-        Displays the round over message without blocking the game loop.
+        Counts down the round over message without blocking the game loop.
 
         Args:
             is_success (bool): True if player has defeated enemies, False otherwise.
@@ -283,41 +400,112 @@ class Game:
         global display_round_over, round_display_duration
 
         if round_display_duration > 0:
-            text = (
+            self.round_over_message = (
                 "SUCCESS! ENEMIES DEFEATED"
                 if is_success
                 else "FAILURE! YOU HAVE BEEN DEFEATED"
             )
-            draw_text(
-                SCREEN,
-                text=text,
+            round_display_duration -= self.dt
+        else:
+            display_round_over = False
+
+    def draw_round_over_message(self) -> None:
+        """
+        Draws the round over message while it is being shown.
+        """
+        if self.round_over_message and not self.headless:
+            rect = draw_text(
+                assets.SCREEN,
+                text=self.round_over_message,
                 x=WIDTH // 2,
                 y=100,
                 colour="white",
                 size="lg",
                 position="center",
             )
-            round_display_duration -= 1
-        else:
-            display_round_over = False
+            self.renderer.mark(rect)
+
+    def tick(self) -> int:
+        """
+        Advance to the next frame and read its input, capping the frame rate at FPS.
+        The frame's time, multiplied by the game speed, is banked for steps() to
+        simulate.
+
+        Returns:
+            int: Milliseconds elapsed since the previous frame.
+        """
+        self.profiler.next_frame()
+        with self.profiler.scope("tick"):
+            frame = self.input.read()
+        if frame.overlay:
+            self.profiler.toggle_overlay()
+        if frame.odds and BackgroundSolver is not None:
+            self.show_odds = not self.show_odds
+        frame_time = min(frame.dt, MAX_FRAME_TIME)
+        self.accumulator += frame_time * self.speed
+        self.clicked = self.clicked or frame.clicked
+        self.mouse_pos = frame.pos
+
+        if frame.quit:
+            self.quit()
+        return frame_time
+
+    def steps(self) -> Iterator[int]:
+        """
+        Run the game logic in fixed SIM_STEP increments for the time banked by tick(),
+        so the outcome doesn't depend on the frame rate or game speed.
+
+        Yields:
+            int: Length of the step in milliseconds, also stored in self.dt.
+        """
+        self.dt = SIM_STEP
+        while self.accumulator >= SIM_STEP:
+            self.accumulator -= SIM_STEP
+            yield SIM_STEP
 
     def handle_events(self) -> bool:
         """
-        Handle player input and events.
+        Handle player input and events. A click is kept until a step handles it.
 
         Returns:
             bool: True of the mouse button is clicked, False otherwise.
         """
-        clicked = False
+        clicked = self.clicked
+        self.clicked = False
+        return clicked
+
+    def summary(self) -> SessionSummary:
+        """
+        Describe the current state of the game, to check replays against.
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
+        Returns:
+            SessionSummary: Frames played, level, round, player HP and potions.
+        """
+        return SessionSummary(
+            self.input.frames,
+            self.current_level,
+            self.round,
+            self.player.hp,
+            self.player.potions,
+        )
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                clicked = True
-        return clicked
+    def exit(self) -> None:
+        """
+        End the session and return to the caller's menu.
+        """
+        self.profiler.close()
+        self.input.close(self.summary())
+        if self.on_exit:
+            self.on_exit()
+
+    def quit(self) -> None:
+        """
+        End the session and close the game.
+        """
+        self.profiler.close()
+        self.input.close(self.summary())
+        pygame.quit()
+        quit()
 
     def player_walk_in(self) -> None:
         """
@@ -325,68 +513,54 @@ class Game:
         """
         self.player.x_pos = 0
         self.player.walk(target_x=self.player_target_position)
+        self.set_stage_message(f"LEVEL: {self.current_level} ROUND: {self.round}")
 
         while self.player.x_pos < self.player_target_position:
+            self.tick()
             self.handle_events()
-            SCREEN.fill((0, 0, 0))
 
-            draw_text(
-                SCREEN,
-                text=f"LEVEL: {self.current_level} ROUND: {self.round}",
-                x=WIDTH // 2,
-                y=100,
-                colour="white",
-                size="lg",
-                position="center",
-            )
-
-            self.player.update_walk_pos(target_x=self.player_target_position)
-            self.player.update_animation()
+            with self.profiler.scope("walk"):
+                for _ in self.steps():
+                    self.player.update_walk_pos(
+                        target_x=self.player_target_position, dt=self.dt
+                    )
+                    self.player.update_animation(self.dt)
 
-            draw_characters(SCREEN, self.player, {}, self.animations, self.current_level)
-            pygame.display.update()
-            CLOCK.tick(FPS)
+            with self.profiler.scope("draw_characters"):
+                self.renderer.begin_frame()
+                self.draw_characters([])
+            self.update_screen()
 
-    def player_walk_out(self, speed: int = 5, is_boss=False) -> None:
+    def player_walk_out(self, speed: int = 50, is_boss=False) -> None:
         """
         Handle the player's walking animtion out of the screen.
 
         Args:
-            speed (int): Speed of the player's walking animation.
+            speed (int): Speed of the player's walking animation in pixels per second.
         """
         target_x = WIDTH + 50
         self.player.walk(target_x=target_x)
+        self.set_stage_message(
+            "BUT THE JOURNEY ISN'T OVER YET"
+            if is_boss
+            else "...BUT THE BATTLE CONTINUES!"
+        )
 
         while self.player.x_pos < target_x:
-            self.player.update_walk_pos(target_x=target_x, speed=speed)
-            self.player.update_animation()
+            self.tick()
+            self.handle_events()
 
-            SCREEN.fill((0, 0, 0))
-            draw_characters(
-                SCREEN, player=self.player, enemies=[], animations=self.animations, current_level=self.current_level
-            )
-            if is_boss:
-                draw_text(
-                    SCREEN,
-                    text="BUT THE JOURNEY ISN'T OVER YET",
-                    x=WIDTH // 2,
-                    y=100,
-                    colour="white",
-                    size="lg",
-                    position="center",
-                )
-            else:
-                draw_text(
-                    SCREEN,
-                    text="...BUT THE BATTLE CONTINUES!",
-                    x=WIDTH // 2,
-                    y=100,
-                    colour="white",
-                    size="lg",
-                    position="center",
-                )
-            pygame.display.update()
-            CLOCK.tick(FPS)
+            with self.profiler.scope("walk"):
+                for _ in self.steps():
+                    self.player.update_walk_pos(
+                        target_x=target_x, dt=self.dt, speed=speed
+                    )
+                    self.player.update_animation(self.dt)
+
+            with self.profiler.scope("draw_characters"):
+                self.renderer.begin_frame()
+                self.draw_characters([])
+            self.update_screen()
 
     def enemy_walk_in(self, enemies):
         """
@@ -396,101 +570,153 @@ class Game:
             enemies (list): List of enemy instances.
         """
         walk_targets = []
+        spacing = ENEMY_SPACING
+        if len(enemies) > 1:
+            spacing = min(spacing, FORMATION_WIDTH // (len(enemies) - 1))
+        # the front enemy starts furthest back, so the wave arrives in formation
+        back = max(len(enemies), 2) - 1
 
         for i, enemy in enumerate(enemies):
-            enemy.x_pos = self.enemy_start_position + (1 - i) * 130
-            
+            enemy.x_pos = self.enemy_start_position + (back - i) * spacing
+
             walk_target = (
                 540
                 if enemy.name == "Bringer"
-                else self.enemy_target_position - i * 130 
+                else self.enemy_target_position - i * spacing
             )
 
             enemy.walk(target_x=walk_target)
             walk_targets.append(walk_target)
 
+        self.set_stage_message(f"LEVEL: {self.current_level} ROUND: {self.round}")
+
         enemies_moving = True
         while enemies_moving:
-            enemies_moving = False
-            
-            for i, enemy in enumerate(enemies):
-                enemy.update_walk_pos(target_x=walk_targets[i], speed=20)
-                enemy.update_animation()
-                if enemy.x_pos > walk_targets[i]:
-                    enemies_moving = True
-
-            SCREEN.fill((0, 0, 0))
-            draw_text(
-                SCREEN,
-                text=f"LEVEL: {self.current_level} ROUND: {self.round}",
-                x=WIDTH // 2,
-                y=100,
-                colour="white",
-                size="lg",
-                position="center",
+            self.tick()
+            self.handle_events()
+
+            with self.profiler.scope("walk"):
+                for _ in self.steps():
+                    for i, enemy in enumerate(enemies):
+                        enemy.update_walk_pos(
+                            target_x=walk_targets[i], dt=self.dt, speed=200
+                        )
+                        enemy.update_animation(self.dt)
+
+            enemies_moving = any(
+                enemy.x_pos > walk_targets[i] for i, enemy in enumerate(enemies)
             )
-            draw_characters(SCREEN, self.player, enemies, self.animations, self.current_level)
-            pygame.display.update()
-            CLOCK.tick(FPS)
 
-    def draw_background(self) -> None:
+            with self.profiler.scope("draw_characters"):
+                self.renderer.begin_frame()
+                self.draw_characters(enemies)
+            self.update_screen()
+
+    def set_stage_message(self, text: str) -> None:
         """
-        Draw the background for the current_level.
+        Use a black screen with a centred message as the static background.
+
+        Args:
+            text (str): Message shown above the characters.
         """
-        background_img_scaled = pygame.transform.smoothscale(
-            self.backgrounds[self.current_level - 1], (WIDTH, HEIGHT - PANEL_HEIGHT)
+        if self.headless:
+            return
+
+        stage = pygame.Surface((WIDTH, HEIGHT)).convert()
+        stage.fill((0, 0, 0))
+        draw_text(
+            stage,
+            text=text,
+            x=WIDTH // 2,
+            y=100,
+            colour="white",
+            size="lg",
+            position="center",
         )
-        draw_bg(SCREEN, background_img_scaled)
+        self.renderer.set_background(stage)
 
-    def draw_ui_elements(self, enemies) -> Button:
+    def create_battle_background(self, potion_button: Button) -> pygame.Surface:
         """
-        Draw UI elements, including the characters and panel
+        Compose the static parts of the battle screen: level background and panel.
 
         Args:
-            enemies(list): List of enemy instances for the round.
+            potion_button (Button): Potion button drawn on the panel.
 
         Returns:
-            Button: Potion button instance.
+            pygame.Surface: Full-screen background for the dirty-rect renderer.
         """
-        potion_button = Button(
-            SCREEN,
-            x=120,
-            y=HEIGHT - PANEL_HEIGHT * 0.25,
-            image=POTION,
-            width=55,
-            height=55,
-        )
-        draw_panel(SCREEN, PANEL, self.player, enemies, potion_button)
-        draw_characters(
-            SCREEN, self.player, enemies, self.animations, self.current_level
-        )
-        return potion_button
+        background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        draw_bg(background, self.background)
+        draw_panel_background(background, assets.PANEL, potion_button)
+        return background
+
+    def draw_background(self) -> None:
+        """
+        Restore the background wherever something was drawn during the previous frame.
+        """
+        self.renderer.begin_frame()
+
+    def draw_ui_elements(self, enemies) -> None:
+        """
+        Draw UI elements, including the characters and panel stats.
+
+        Args:
+            enemies(list): List of enemy instances for the round.
+        """
+        if not self.headless:
+            odds = self.odds if self.show_odds else None
+            self.renderer.mark(draw_panel(assets.SCREEN, self.player, enemies, odds))
+        self.draw_characters(enemies)
+
+    def draw_characters(self, enemies) -> None:
+        """
+        Draw the player and enemies, or only fit the enemy hitboxes when headless.
+
+        Args:
+            enemies (list): List of enemy instances on screen.
+        """
+        if self.headless:
+            layout_characters(self.player, enemies, self.animations, self.current_level)
+        else:
+            self.renderer.mark(
+                draw_characters(
+                    assets.SCREEN,
+                    self.player,
+                    enemies,
+                    self.animations,
+                    self.current_level,
+                )
+            )
 
     def update_sprites(self, enemies) -> None:
         """
-        Update and draw sprite groups for characters and action texts.
+        Advance the action texts and the characters' animations by one step.
 
         Args:
             enemies (List): List of enemy instances.
         """
-        damage_text_group.update()
-        damage_text_group.draw(SCREEN)
-        heal_text_group.update()
-        heal_text_group.draw(SCREEN)
-        crit_text_group.update()
-        crit_text_group.draw(SCREEN)
+        ACTION_TEXTS.update(self.dt)
 
-        for sprite in potion_text_group:
-            if sprite.counter >= 0:
-                potion_text_group.draw(SCREEN)
-
-        self.player.update_animation()
+        self.player.update_animation(self.dt)
 
         for enemy in enemies:
-            enemy.update_animation()
+            enemy.update_animation(self.dt)
+
+    def draw_sprites(self) -> None:
+        """
+        Draw the action texts.
+        """
+        if self.headless:
+            return
+
+        self.renderer.mark(ACTION_TEXTS.draw(assets.SCREEN))
 
     def update_screen(self) -> None:
         """
-        Update the display.
+        Update the regions of the display that changed this frame, after drawing
+        the profiler overlay if it is shown.
         """
-        pygame.display.update()
+        if not self.headless:
+            self.renderer.mark(self.profiler.draw(assets.SCREEN))
+        with self.profiler.scope("update_screen"):
+            self.renderer.present()
@@ -38,7 +38,7 @@ class HealthBar:
         self.base_colour = base_colour
         self.secondary_colour = secondary_colour
 
-    def draw(self, screen: pygame.Surface, hp: int, x: int, y: int) -> None:
+    def draw(self, screen: pygame.Surface, hp: int, x: int, y: int) -> pygame.Rect:
         """
         Draw the health bar on the screen.
 
@@ -47,9 +47,15 @@ class HealthBar:
             hp (int): Current health points of the character.
             x (int): X-coordinate for the top-left corner of the health bar.
             y (int): Y-coordinate for the top-left corner of the health bar.
+
+        Returns:
+            pygame.Rect: Region covered by the health bar.
         """
-        pygame.draw.rect(screen, self.base_colour, (x, y, self.width, self.height))
+        rect = pygame.draw.rect(
+            screen, self.base_colour, (x, y, self.width, self.height)
+        )
         current_width = self.width * (hp / self.max_hp)
         pygame.draw.rect(
             screen, self.secondary_colour, (x, y, current_width, self.height)
         )
+        return rect
@@ -1,52 +1,76 @@
+import time
+
+# taken before anything else is imported, for --startup-report
+START_TIME = time.perf_counter()
+
+import argparse
 import pygame
-from constants import SCREEN, HEIGHT, WIDTH, PLAY, TUTORIAL, QUIT, BACK
+import assets
+from constants import HEIGHT, WIDTH
 from button import Button
 from utils import draw_text
 from character_selection import character_selection_screen
 from game import main
+from preloader import PRELOADER
+from random_source import RNG
+
+IMPORT_TIME = time.perf_counter()
+
+# path the input of each game session is recorded to (--record)
+record_path = None
+# game time simulated per real millisecond (--speed)
+game_speed = 1
+# path the frame-time trace of each game session is written to (--profile)
+profile_path = None
+# whether to print where start-up time went once the menu is shown (--startup-report)
+startup_report = False
 
 
 def start_menu() -> None:
     """
     Displays the start menu where players can choose to play the game, view the tutorial, or quit.
+    Sprites are decoded in the background while the menus wait for clicks.
     """
+    PRELOADER.start()
+
     # button 
     button_scale = 2
     button_width = 92 * button_scale
     button_height = 28 * button_scale
 
     play_button = Button(
-        SCREEN,
+        assets.SCREEN,
         x=WIDTH // 2,
         y=HEIGHT // 2 - 50,
-        image=PLAY,
+        image=assets.PLAY,
         width=button_width,
         height=button_height,
     )
     tutorial_button = Button(
-        SCREEN,
+        assets.SCREEN,
         x=WIDTH // 2,
         y=HEIGHT // 2 + 30,
-        image=TUTORIAL,
+        image=assets.TUTORIAL,
         width=button_width,
         height=button_height,
     )
     quit_button = Button(
-        SCREEN,
+        assets.SCREEN,
         x=WIDTH // 2,
         y=HEIGHT // 2 + 110,
-        image=QUIT,
+        image=assets.QUIT,
         width=button_width,
         height=button_height,
     )
 
     while True:
-        SCREEN.fill((0, 0, 0))
-        draw_text(SCREEN, text="WARRIOR QUEST", x=WIDTH // 2, y=100, size="lg")
+        assets.SCREEN.fill((0, 0, 0))
+        draw_text(assets.SCREEN, text="WARRIOR QUEST", x=WIDTH // 2, y=100, size="lg")
 
         play_button.draw()
         tutorial_button.draw()
         quit_button.draw()
+        PRELOADER.draw_progress(assets.SCREEN)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -60,12 +84,37 @@ def start_menu() -> None:
                 elif play_button.rect.collidepoint(event.pos):
                     selected_char = character_selection_screen()
                     if selected_char != -1:
-                        main(selected_char=selected_char, on_exit=start_menu)
+                        main(
+                            selected_char=selected_char,
+                            on_exit=start_menu,
+                            record=record_path,
+                            speed=game_speed,
+                            profile=profile_path,
+                        )
                 elif tutorial_button.rect.collidepoint(event.pos):
                     tutorial()
 
         pygame.display.update()
 
+        if startup_report:
+            print_startup_report()
+
+        PRELOADER.poll()
+
+
+def print_startup_report() -> None:
+    """
+    Prints the time from launch to the first menu frame: module imports, then
+    every asset created so far.
+    """
+    global startup_report
+    startup_report = False
+
+    total = (time.perf_counter() - START_TIME) * 1000
+    print(f"start-up: {total:.1f} ms to the first menu frame")
+    print(f"  {'imports':<10} {(IMPORT_TIME - START_TIME) * 1000:>8.1f} ms")
+    print("\n".join(assets.report()))
+
 
 def tutorial() -> None:
     """
@@ -77,60 +126,60 @@ def tutorial() -> None:
     back_button_height = 35 * back_button_scale
 
     back_button = Button(
-        SCREEN,
+        assets.SCREEN,
         x=50,
         y=50,
-        image=BACK,
+        image=assets.BACK,
         width=back_button_width,
         height=back_button_height,
     )
 
     while True:
-        SCREEN.fill("black")
-        draw_text(SCREEN, text="TUTORIAL", x=WIDTH // 2, y=100, size="lg")
+        assets.SCREEN.fill("black")
+        draw_text(assets.SCREEN, text="TUTORIAL", x=WIDTH // 2, y=100, size="lg")
 
-        draw_text(SCREEN, text="STATS", x=WIDTH // 2, y=170, size="md")
+        draw_text(assets.SCREEN, text="STATS", x=WIDTH // 2, y=170, size="md")
         draw_text(
-            SCREEN,
+            assets.SCREEN,
             text="1. Critical hit: Chance to deal 200% damage.",
             x=WIDTH // 2,
             y=200,
             size="sm",
         )
         draw_text(
-            SCREEN,
+            assets.SCREEN,
             text="2. Double hit: Chance to strike twice in one attack.",
             x=WIDTH // 2,
             y=225,
             size="sm",
         )
 
-        draw_text(SCREEN, text="POTIONS", x=WIDTH // 2, y=280, size="md")
+        draw_text(assets.SCREEN, text="POTIONS", x=WIDTH // 2, y=280, size="md")
         draw_text(
-            SCREEN,
+            assets.SCREEN,
             text="Potions are used to heal HP. All defeated enemies have a chance to drop potions.",
             x=WIDTH // 2,
             y=310,
             size="sm",
         )
 
-        draw_text(SCREEN, text="BATTLE", x=WIDTH // 2, y=365, size="md")
+        draw_text(assets.SCREEN, text="BATTLE", x=WIDTH // 2, y=365, size="md")
         draw_text(
-            SCREEN,
+            assets.SCREEN,
             text="1. All players take turns attacking.",
             x=WIDTH // 2,
             y=395,
             size="sm",
         )
         draw_text(
-            SCREEN,
+            assets.SCREEN,
             text="2. Click the enemy to attack or potion button to heal.",
             x=WIDTH // 2,
             y=425,
             size="sm",
         )
         draw_text(
-            SCREEN,
+            assets.SCREEN,
             text="3. Once all enemies are defeated in the level, the boss appears. Prepare well!",
             x=WIDTH // 2,
             y=455,
@@ -152,4 +201,31 @@ def tutorial() -> None:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play WarriorQuest.")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="seed enemy spawns and combat rolls for a repeatable run",
+    )
+    parser.add_argument(
+        "--record", metavar="FILE", help="record each game session for replay.py"
+    )
+    parser.add_argument(
+        "--speed", type=int, default=1, help="fast-forward the game N times"
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE", help="write a frame-time trace to FILE"
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print where start-up time went once the menu is shown",
+    )
+    args = parser.parse_args()
+    RNG.reseed(args.seed)
+    record_path = args.record
+    game_speed = args.speed
+    profile_path = args.profile
+    startup_report = args.startup_report
+
     start_menu()
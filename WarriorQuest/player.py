@@ -1,6 +1,15 @@
-from random import randint, random
+import pygame
 from fighter import Fighter, Action
 
+# (name, max hp, strength, crit chance, double chance, potion chance, potions)
+PLAYERS = [
+    ("Warrior", 100, 20, 2, 2, 50, 3),
+    ("Rogue", 85, 15, 10, 2, 55, 3),
+    ("Berserker", 75, 30, 5, 10, 60, 3),
+    ("Brute", 130, 15, 2, 2, 50, 3),
+    ("Huntress", 85, 10, 10, 25, 45, 3),
+]
+
 
 class Player(Fighter):
     def __init__(
@@ -30,45 +39,6 @@ class Player(Fighter):
         self.potion_chance: int = potion_chance
         self.potions: int = potions
 
-    def heal(self) -> int:
-        """
-        Heals the player using a potion.
-
-        Returns:
-            int: Amount of health restored.
-        """
-        heal_amount = 30 + randint(-5, 5)
-        self.hp = min(self.hp + heal_amount, self.max_hp)
-        self.potions -= 1
-        return heal_amount
-
-    def attack(self) -> int:
-        """
-        Executes an attack and calculates the damage dealt.
-
-        Returns:
-            int: Total damage dealt, including any critical or double hit bonuses.
-        """
-        damage = super().attack()
-
-        if random() < self.double_chance / 100:
-            damage *= 2
-            self.action = Action.SPECIAL
-
-        return damage
-
-    def get_potion(self) -> bool:
-        """
-        Determines if the player receives a potion after an enemy is defeated.
-
-        Returns:
-            bool: True if a potion was received, False otherwise.
-        """
-        if random() < self.potion_chance / 100:
-            self.potions += 1
-            return True
-        return False
-
     def walk(self, target_x: int) -> None:
         """
         Initiates walking animation towards a target position.
@@ -77,19 +47,19 @@ class Player(Fighter):
             target_x (int): X-coordinate to walk towards.
         """
         if self.x_pos < target_x:
-            self.action = Action.WALK
-            self.animation_timer = 0
+            self.set_action(Action.WALK)
 
-    def update_walk_pos(self, target_x: int, speed: int = 5) -> None:
+    def update_walk_pos(self, target_x: int, dt: int, speed: int = 50) -> None:
         """
         Updates the player's position while walking.
 
         Args:
             target_x (int): Target x-coordinate.
-            speed (int): Movement speed. Defaults to 5.
+            dt (int): Milliseconds since the previous update.
+            speed (int): Movement speed in pixels per second. Defaults to 50.
         """
         if self.action == Action.WALK:
-            self.x_pos = min(self.x_pos + speed, target_x)
+            self.x_pos = min(self.x_pos + speed * dt / 1000, target_x)
             if self.x_pos >= target_x:
                 self.action = Action.IDLE
 
@@ -107,21 +77,29 @@ def create_character(index: int) -> Player:
     Raises:
         ValueError: If the index is invalid.
     """
-    characters = [
-        ("Warrior", 100, 20, 2, 2, 50, 3),
-        ("Rogue", 85, 15, 10, 2, 55, 3),
-        ("Berserker", 75, 30, 5, 10, 60, 3),
-        ("Brute", 130, 15, 2, 2, 50, 3),
-        ("Huntress", 85, 10, 10, 25, 45, 3),
-    ]
-
-    if 0 <= index < len(characters):
-        return Player(*characters[index])
+    if 0 <= index < len(PLAYERS):
+        return Player(*PLAYERS[index])
     else:
         raise ValueError(f"Invalid character index: {index}")
 
 
-def animate_player(screen, player: Player, animations, scale: float) -> None:
+def get_player_scale(name: str, scale: float) -> float:
+    """
+    Adjusts the drawing scale for characters whose sprites are drawn larger.
+
+    Args:
+        name (str): Name of the character.
+        scale (float): Base scale for players.
+
+    Returns:
+        float: Scale the character is drawn at.
+    """
+    if name in ["Brute", "Berserker"]:
+        scale -= 0.5
+    return scale
+
+
+def animate_player(screen, player: Player, animations, scale: float) -> pygame.Rect:
     """
     Animates the player on the screen.
 
@@ -130,21 +108,20 @@ def animate_player(screen, player: Player, animations, scale: float) -> None:
         player (Player): Player character to animate.
         animations: Dictionary of animations keyed by character name and action.
         scale (float): Scale factor for the animation.
+
+    Returns:
+        pygame.Rect: Region of the screen that was drawn.
     """
-    if player.name in ["Brute", "Berserker"]:
-        scale -= 0.5
+    scale = get_player_scale(player.name, scale)
 
     current_animation = animations[player.name.lower()][player.action.value]
-
-    if player.death_animation_done:
-        current_frame = current_animation.get_last_death_frame(scale=scale)
-    else:
-        current_frame = current_animation.get_current_frame(scale=scale)
+    player.playback.play(current_animation, loop=player.action != Action.DEATH)
+    current_frame = player.playback.get_frame(scale=scale)
 
     # Calculate position for drawing
-    frame_width = current_frame.get_width()
-    frame_height = current_frame.get_height()
-    x_pos = player.x_pos - frame_width // 2
-    y_pos = player.y_pos - frame_height
+    frame_width, frame_height = current_frame.size
+    offset_x, offset_y = current_frame.offset
+    x_pos = player.x_pos - frame_width // 2 + offset_x
+    y_pos = player.y_pos - frame_height + offset_y
 
-    screen.blit(current_frame, (x_pos, y_pos))
+    return screen.blit(current_frame.image, (x_pos, y_pos))
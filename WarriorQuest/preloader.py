@@ -0,0 +1,277 @@
+"""
+Background asset preloader.
+
+While the menus wait for clicks, a worker thread reads and decodes the sprite
+atlas, the game's images and every character spritesheet. Converting surfaces to
+the display format and cutting out the frames must happen on the main thread, so
+the menus call poll() every frame to finish a few decoded items within a time
+budget. wait_for() moves characters to the front of the queue and blocks until
+they are ready, for when a character is shown or Play is pressed before the
+preloader has reached them.
+"""
+
+import json
+import queue
+import threading
+import time
+import pygame
+import assets
+from animations import (
+    ANIMATIONS,
+    ATLAS_IMAGE,
+    ATLAS_INDEX,
+    CHARACTER_FRAMES,
+    atlas_is_current,
+    get_spritesheet_path,
+    load_animation,
+)
+from constants import CHARACTERS, IMAGES, WIDTH, HEIGHT
+from enemy import ENEMIES, BOSSES
+from spritesheet import Atlas, read_atlas_index
+from utils import draw_text
+
+# constants
+POLL_BUDGET = 8  # ms of main-thread work per menu frame
+
+# decoded item kinds
+ATLAS = "atlas"
+IMAGE = "image"
+ANIMATION = "animation"
+
+
+def load_order() -> list[str]:
+    """
+    Orders the characters by when they are first needed: the player characters in
+    the order of the selection screen, then the enemies, then the bosses.
+
+    Returns:
+        list[str]: Character names, as keys of CHARACTER_FRAMES.
+    """
+    names = [character["name"] for character in CHARACTERS]
+    names += [row[0] for row in ENEMIES + BOSSES]
+    return [name.lower() for name in names if name.lower() in CHARACTER_FRAMES]
+
+
+class Preloader:
+    """
+    Decodes assets on a worker thread and finishes them on the main thread.
+
+    Attributes:
+        names (list[str]): Characters to load, in order.
+        total (int): Number of items to load.
+        done (int): Number of items finished.
+    """
+
+    def __init__(self, names: list[str] | None = None):
+        self.names: list[str] = names if names is not None else load_order()
+        self.total: int = 0
+        self.done: int = 0
+        self._decoded: queue.Queue = queue.Queue()
+        self._deferred: list[tuple] = []
+        self._actions: dict[str, dict] = {}
+        self._pending: list[str] = list(self.names)  # characters not yet decoded
+        self._lock = threading.Lock()  # guards _pending
+        self._thread: threading.Thread | None = None
+        self._stopped: bool = False  # the worker has handed over its last item
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def finished(self) -> bool:
+        return self.started and self.done >= self.total
+
+    @property
+    def progress(self) -> float:
+        """
+        Returns the fraction of items finished, 0 before the preloader starts.
+        """
+        return self.done / self.total if self.total else 0.0
+
+    def start(self) -> None:
+        """
+        Starts decoding on the worker thread. Does nothing if already started.
+        """
+        if self.started:
+            return
+
+        self.total = 1 + len(IMAGES)
+        self.total += sum(len(CHARACTER_FRAMES[name]) for name in self.names)
+        self._thread = threading.Thread(
+            target=self.decode, name="preloader", daemon=True
+        )
+        self._thread.start()
+
+    def decode(self) -> None:
+        """
+        Reads and decodes every asset in order. Runs on the worker thread, which
+        must not touch the display; surfaces are left unconverted.
+        """
+        try:
+            in_atlas = self.decode_atlas()
+
+            for name, path in IMAGES.items():
+                self._decoded.put((IMAGE, name, pygame.image.load(path)))
+
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        break
+                    name = self._pending.pop(0)
+                for action in CHARACTER_FRAMES[name]:
+                    image = data = None
+                    if (name, action) not in in_atlas:
+                        path = get_spritesheet_path(name, action)
+                        image = pygame.image.load(path)
+                        with open(path.replace("png", "json")) as f:
+                            data = json.load(f)
+                    self._decoded.put((ANIMATION, name, action, image, data))
+        finally:
+            self._decoded.put(None)
+
+    def decode_atlas(self) -> set[tuple[str, str]]:
+        """
+        Reads and decodes the compiled sprite atlas, if it is up to date.
+
+        Returns:
+            set[tuple[str, str]]: Character actions the atlas has frames for.
+        """
+        image = index = None
+        in_atlas = set()
+
+        if atlas_is_current():
+            with open(ATLAS_INDEX, "rb") as f:
+                index = f.read()
+            try:
+                in_atlas = set(read_atlas_index(index)[2])
+                image = pygame.image.load(ATLAS_IMAGE)
+            except ValueError:  # built by an older version of build_atlas.py
+                index = None
+
+        self._decoded.put((ATLAS, image, index))
+        return in_atlas
+
+    def poll(self, budget: float = POLL_BUDGET) -> None:
+        """
+        Finishes decoded items on the main thread for up to `budget` ms. Called
+        every menu frame.
+
+        Args:
+            budget (float): Milliseconds of work allowed.
+        """
+        if not self.started:
+            return
+
+        deadline = time.perf_counter() + budget / 1000
+        while not self.finished and time.perf_counter() < deadline:
+            if self._deferred:
+                self.finish(self._deferred.pop(0))
+                continue
+            try:
+                item = self._decoded.get_nowait()
+            except queue.Empty:
+                return
+            self.finish(item)
+
+    def prioritise(self, names: set[str]) -> None:
+        """
+        Moves characters to the front of the worker's queue, if not yet decoded.
+
+        Args:
+            names (set[str]): Character names, as keys of CHARACTER_FRAMES.
+        """
+        with self._lock:
+            first = [name for name in self._pending if name in names]
+            rest = [name for name in self._pending if name not in names]
+            self._pending[:] = first + rest
+
+    def wait_for(self, *names: str) -> None:
+        """
+        Blocks until the given characters' animations are ready, decoding them
+        next if the worker hasn't reached them. Items for other characters are put
+        aside for poll() to finish later.
+
+        Args:
+            *names (str): Character names, case-insensitive.
+        """
+        if not self.started:
+            return
+
+        needed = {name.lower() for name in names}
+        if all(ANIMATIONS.is_loaded(name) for name in needed):
+            return
+
+        self.prioritise(needed)
+        while not self._stopped and not all(
+            ANIMATIONS.is_loaded(name) for name in needed
+        ):
+            # items put aside by an earlier wait come first, in decoding order
+            put_aside = [item for item in self._deferred if item[1] in needed]
+            if put_aside:
+                self._deferred.remove(put_aside[0])
+                self.finish(put_aside[0])
+                continue
+
+            item = self._decoded.get()
+            if item and item[0] == ANIMATION and item[1] not in needed:
+                self._deferred.append(item)
+            else:
+                self.finish(item)
+
+    def finish(self, item: tuple | None) -> None:
+        """
+        Converts a decoded item to the display format and registers it.
+
+        Args:
+            item (tuple | None): Item from the worker, or None once it has stopped.
+        """
+        if item is None:
+            # if decoding failed, anything not handed over is loaded on first use
+            self._stopped = True
+            self.total = self.done + len(self._deferred)
+            return
+
+        assets.ensure_display()
+        kind, *payload = item
+        if kind == ATLAS:
+            image, index = payload
+            ANIMATIONS.set_atlas(
+                Atlas(ATLAS_IMAGE, ATLAS_INDEX, image, index)
+                if image is not None
+                else None
+            )
+        elif kind == IMAGE:
+            name, image = payload
+            assets.get(name, image.convert_alpha)
+        elif kind == ANIMATION:
+            name, action, image, data = payload
+            if not ANIMATIONS.is_loaded(name):
+                actions = self._actions.setdefault(name, {})
+                actions[action] = load_animation(
+                    name, action, ANIMATIONS.get_atlas(), image, data
+                )
+                if len(actions) == len(CHARACTER_FRAMES[name]):
+                    ANIMATIONS.add(name, self._actions.pop(name))
+        self.done += 1
+
+    def draw_progress(self, screen: pygame.Surface) -> None:
+        """
+        Draws how much has been loaded at the bottom of a menu, until it is done.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+        """
+        if self.started and not self.finished:
+            draw_text(
+                screen,
+                text=f"LOADING {self.progress:.0%}",
+                x=WIDTH // 2,
+                y=HEIGHT - 20,
+                colour="grey",
+                size="sm",
+            )
+
+
+# started by the start menu
+PRELOADER = Preloader()
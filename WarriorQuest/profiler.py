@@ -0,0 +1,225 @@
+"""
+Frame-time profiler.
+
+Named timing scopes measure where each frame goes. The results can be shown on
+screen (toggled with F3) and streamed to a CSV trace with one row per stage per
+frame, so changes to the render path can be compared run to run.
+
+Usage:
+    python main.py --profile trace.csv
+    python replay.py session.wqr --uncapped --profile trace.csv
+"""
+
+import csv
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+import pygame
+import assets
+
+# constants
+FRAME_WINDOW = 240  # frames the overlay statistics are taken over
+OVERLAY_REFRESH = 500  # ms between overlay text updates
+OVERLAY_POSITION = (8, 8)
+OVERLAY_COLOUR = (255, 255, 0)
+OVERLAY_BACKGROUND = (0, 0, 0, 170)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Returns the value below which the given fraction of the values fall.
+
+    Args:
+        values (list[float]): Values, in any order.
+        fraction (float): Fraction between 0 and 1.
+
+    Returns:
+        float: Nearest-rank percentile, or 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Profiler:
+    """
+    Times named stages of every frame.
+
+    Timing only runs while the overlay is shown, a trace is being written or the
+    profiler is enabled, so a profiler that is not in use costs one attribute
+    check per scope.
+
+    Attributes:
+        overlay (bool): Whether the statistics are drawn on screen.
+        enabled (bool): Whether frames are timed without the overlay or a trace.
+        frames (int): Number of frames completed.
+        frame_times (deque[float]): Length in ms of the most recent frames.
+        stage_times (deque[dict[str, float]]): Time in ms spent in each stage of
+            the most recent frames.
+    """
+
+    def __init__(
+        self,
+        trace_path: str | None = None,
+        window: int | None = FRAME_WINDOW,
+        enabled: bool = False,
+    ):
+        self.overlay: bool = False
+        self.enabled: bool = enabled
+        self.frames: int = 0
+        self.frame_times: deque[float] = deque(maxlen=window)
+        self.stage_times: deque[dict[str, float]] = deque(maxlen=window)
+        self._stages: dict[str, float] = {}
+        self._frame_start: float | None = None
+        self._overlay_image: pygame.Surface | None = None
+        self._overlay_age: float = OVERLAY_REFRESH
+        self._trace_file = None
+        self._trace = None
+
+        if trace_path:
+            self._trace_file = open(trace_path, "w", newline="")
+            self._trace = csv.writer(self._trace_file)
+            self._trace.writerow(("frame", "stage", "ms"))
+
+    @property
+    def active(self) -> bool:
+        return self.overlay or self.enabled or self._trace is not None
+
+    def toggle_overlay(self) -> None:
+        """
+        Shows or hides the on-screen statistics.
+        """
+        self.overlay = not self.overlay
+        self._overlay_age = OVERLAY_REFRESH
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as part of the named stage of the current frame.
+        A stage entered several times in one frame accumulates its time.
+
+        Args:
+            name (str): Name of the stage.
+        """
+        if not self.active:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._stages[name] = self._stages.get(name, 0.0) + elapsed
+
+    def next_frame(self) -> None:
+        """
+        Ends the current frame, recording its length and stage times, and starts the
+        next one. Called once per frame, before its input is read.
+        """
+        now = time.perf_counter()
+        if not self.active:
+            self._frame_start = None
+            self._stages.clear()
+            return
+
+        if self._frame_start is not None:
+            frame_time = (now - self._frame_start) * 1000
+            self.frame_times.append(frame_time)
+            self.stage_times.append(self._stages)
+            self._overlay_age += frame_time
+
+            if self._trace:
+                self._trace.writerow((self.frames, "frame", f"{frame_time:.3f}"))
+                for stage, ms in self._stages.items():
+                    self._trace.writerow((self.frames, stage, f"{ms:.3f}"))
+            self.frames += 1
+
+        self._frame_start = now
+        self._stages = {}
+
+    def cancel_frame(self) -> None:
+        """
+        Drops the frame in progress, so time spent before the next frame starts
+        isn't counted.
+        """
+        self._frame_start = None
+        self._stages = {}
+
+    def report(self) -> list[str]:
+        """
+        Summarises the most recent frames.
+
+        Returns:
+            list[str]: Frame rate, median and 99th percentile frame time, then the
+                average time of every stage, slowest first.
+        """
+        frame_times = list(self.frame_times)
+        if not frame_times:
+            return ["profiler: waiting for frames"]
+
+        average = sum(frame_times) / len(frame_times)
+        lines = [
+            f"FPS {1000 / average:.1f}"
+            f"  p50 {percentile(frame_times, 0.5):.2f} ms"
+            f"  p99 {percentile(frame_times, 0.99):.2f} ms"
+        ]
+
+        totals: dict[str, float] = {}
+        for stages in self.stage_times:
+            for stage, ms in stages.items():
+                totals[stage] = totals.get(stage, 0.0) + ms
+        for stage, total in sorted(totals.items(), key=lambda item: -item[1]):
+            lines.append(f"{stage} {total / len(self.stage_times):.2f} ms")
+        return lines
+
+    def draw(self, screen: pygame.Surface) -> pygame.Rect | None:
+        """
+        Draws the overlay if it is shown. The text is re-rendered at most every
+        OVERLAY_REFRESH ms so it stays readable and doesn't skew the frames it measures.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+
+        Returns:
+            pygame.Rect | None: Region covered by the overlay, or None if hidden.
+        """
+        if not self.overlay:
+            return None
+
+        if self._overlay_image is None or self._overlay_age >= OVERLAY_REFRESH:
+            self._overlay_image = self.render_overlay()
+            self._overlay_age = 0.0
+        return screen.blit(self._overlay_image, OVERLAY_POSITION)
+
+    def render_overlay(self) -> pygame.Surface:
+        """
+        Renders the report onto a translucent panel.
+
+        Returns:
+            pygame.Surface: Rendered overlay.
+        """
+        lines = [
+            assets.FONT_SM.render(line, True, OVERLAY_COLOUR) for line in self.report()
+        ]
+        width = max(line.get_width() for line in lines) + 8
+        height = sum(line.get_height() for line in lines) + 8
+
+        image = pygame.Surface((width, height), pygame.SRCALPHA)
+        image.fill(OVERLAY_BACKGROUND)
+        y = 4
+        for line in lines:
+            image.blit(line, (4, y))
+            y += line.get_height()
+        return image
+
+    def close(self) -> None:
+        """
+        Finishes the trace file, if one is being written.
+        """
+        if self._trace_file:
+            self._trace_file.close()
+            self._trace_file = None
+            self._trace = None
@@ -0,0 +1,46 @@
+import random
+
+
+class RandomSource(random.Random):
+    """
+    Seeded random number generator shared by everything that rolls dice: enemy
+    spawns, damage, critical and double hits, healing and potion drops.
+
+    Every source knows its seed, so a run can be reproduced, and can derive
+    independent child streams for workers or subsystems.
+
+    Attributes:
+        seed_value (int | str): Seed the generator was created with.
+    """
+
+    def __init__(self, seed: int | str | None = None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**32)
+        super().__init__(seed)
+        self.seed_value: int | str = seed
+
+    def reseed(self, seed: int | str | None = None) -> None:
+        """
+        Restarts the generator from a new seed.
+
+        Args:
+            seed (int | str | None): New seed. Defaults to a fresh random seed.
+        """
+        self.__init__(seed)
+
+    def spawn(self, *key) -> "RandomSource":
+        """
+        Derives an independent stream from this source's seed and a key. The same
+        seed and key always give the same stream, whatever was drawn from this source.
+
+        Args:
+            *key: Values identifying the child stream, such as a worker and chunk index.
+
+        Returns:
+            RandomSource: Child generator.
+        """
+        return RandomSource("/".join(map(str, (self.seed_value, *key))))
+
+
+# shared by the game; main.py reseeds it from --seed
+RNG = RandomSource()
@@ -0,0 +1,101 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """
+    Tracks which parts of the screen changed each frame and only restores and
+    presents those regions.
+
+    Everything that does not move (level background, panel, static labels) lives in
+    the background surface. Each frame, the regions drawn during the previous frame
+    are restored from the background, dynamic elements are drawn and marked, and
+    the union of old and new regions is pushed to the display.
+
+    Attributes:
+        screen (pygame.Surface): Display surface being drawn on.
+        background (pygame.Surface): Full-screen image of everything static.
+        full_redraw (bool): Whether the next frame must redraw and present the whole screen.
+        enabled (bool): Whether anything is drawn at all. Disabled for headless replays.
+    """
+
+    def __init__(self, screen: pygame.Surface, enabled: bool = True):
+        self.screen = screen
+        self.enabled: bool = enabled
+        self.background: pygame.Surface | None = None
+        self.full_redraw: bool = True
+        self._previous_rects: list[pygame.Rect] = []
+        self._current_rects: list[pygame.Rect] = []
+
+    def set_background(self, background: pygame.Surface) -> None:
+        """
+        Replaces the static background and schedules a full redraw.
+
+        Args:
+            background (pygame.Surface): Full-screen image of everything static.
+        """
+        self.background = background
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Forces the next frame to redraw and present the whole screen.
+        """
+        self.full_redraw = True
+
+    def begin_frame(self) -> None:
+        """
+        Erases everything drawn during the previous frame by restoring the background.
+        """
+        if not self.enabled:
+            return
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self._previous_rects:
+                self.screen.blit(self.background, rect, rect)
+
+    def mark(self, rects) -> None:
+        """
+        Records regions drawn during the current frame.
+
+        Args:
+            rects (pygame.Rect | Iterable[pygame.Rect] | None): Regions that were drawn.
+        """
+        if rects is None or not self.enabled:
+            return
+        if isinstance(rects, pygame.Rect):
+            rects = (rects,)
+        self._current_rects.extend(rect for rect in rects if rect)
+
+    def blit(self, image: pygame.Surface, dest, area=None) -> pygame.Rect:
+        """
+        Draws an image on the screen and marks the covered region as dirty.
+
+        Args:
+            image (pygame.Surface): Image to draw.
+            dest (tuple | pygame.Rect): Position of the image.
+            area (pygame.Rect): Part of the image to draw. Defaults to the whole image.
+
+        Returns:
+            pygame.Rect: Region of the screen that was drawn.
+        """
+        if not self.enabled:
+            return pygame.Rect(dest, image.get_size())
+        rect = self.screen.blit(image, dest, area)
+        self.mark(rect)
+        return rect
+
+    def present(self) -> None:
+        """
+        Pushes the changed regions (or the whole screen after a full redraw) to the display.
+        """
+        if not self.enabled:
+            return
+        if self.full_redraw:
+            pygame.display.update()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self._previous_rects + self._current_rects)
+
+        self._previous_rects = self._current_rects
+        self._current_rects = []
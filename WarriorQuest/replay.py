@@ -0,0 +1,326 @@
+"""
+Input recording and replay.
+
+The game reads all of its input once per frame through an input source: the
+frame time, whether the mouse was clicked, whether the window was closed and the
+pointer position. Recording that stream together with the RNG seed and character
+is enough to play a session again exactly.
+
+Usage:
+    python main.py --seed 1234 --record session.wqr
+    python replay.py session.wqr --headless
+"""
+
+import argparse
+import os
+import struct
+import time
+import zlib
+from typing import NamedTuple
+import pygame
+import assets
+from constants import FPS
+
+# replay log format
+REPLAY_MAGIC = b"WQRP"
+REPLAY_VERSION = 4
+REPLAY_HEADER = struct.Struct("<4sHqBB")  # magic, version, seed, character, speed
+REPLAY_FRAME = struct.Struct("<HBhh")  # frame time in ms, flags, pointer x, y
+REPLAY_FOOTER = struct.Struct("<IBBhB")  # frames, level, round, player hp, potions
+
+# frame flags
+CLICKED = 1
+QUIT = 2
+
+OVERLAY_KEY = pygame.K_F3  # toggles the profiler overlay
+ODDS_KEY = pygame.K_F4  # toggles the win odds readout
+
+
+class FrameInput(NamedTuple):
+    """
+    Everything the game reads from the player during one frame.
+
+    Attributes:
+        dt (int): Milliseconds since the previous frame.
+        clicked (bool): Whether the mouse button was pressed.
+        quit (bool): Whether the window was closed.
+        pos (tuple[int, int]): Pointer position.
+        overlay (bool): Whether the profiler overlay key was pressed. Not recorded,
+            as it doesn't affect the game.
+        odds (bool): Whether the win odds key was pressed. Not recorded either.
+    """
+
+    dt: int
+    clicked: bool
+    quit: bool
+    pos: tuple[int, int]
+    overlay: bool = False
+    odds: bool = False
+
+
+class SessionSummary(NamedTuple):
+    """
+    State of a game when its session ended, used to check that a replay matches.
+
+    Attributes:
+        frames (int): Number of frames played.
+        level (int): Level being played.
+        round (int): Round being played.
+        hp (int): Player HP.
+        potions (int): Player potions.
+    """
+
+    frames: int
+    level: int
+    round: int
+    hp: int
+    potions: int
+
+
+class ReplayFinished(Exception):
+    """
+    Raised when a replayed session ends or its log runs out of frames.
+    """
+
+
+class InputRecorder:
+    """
+    Streams the frames of a session to a compressed replay log.
+
+    Attributes:
+        path (str): Path of the log being written.
+        frames (int): Number of frames written.
+    """
+
+    def __init__(self, path: str, seed: int, character: int, speed: int = 1):
+        if not isinstance(seed, int):
+            raise ValueError(f"Replays need an integer seed, got {seed!r}")
+        self.path: str = path
+        self.frames: int = 0
+        self._file = open(path, "wb")
+        self._file.write(
+            REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, character, speed)
+        )
+        self._compressor = zlib.compressobj(9)
+
+    def write(self, frame: FrameInput) -> None:
+        """
+        Appends one frame to the log.
+
+        Args:
+            frame (FrameInput): Input read during the frame.
+        """
+        flags = (CLICKED if frame.clicked else 0) | (QUIT if frame.quit else 0)
+        data = REPLAY_FRAME.pack(min(frame.dt, 0xFFFF), flags, *frame.pos)
+        self._file.write(self._compressor.compress(data))
+        self.frames += 1
+
+    def close(self, summary: SessionSummary) -> None:
+        """
+        Finishes the log with the final state of the session.
+
+        Args:
+            summary (SessionSummary): State of the game when the session ended.
+        """
+        self._file.write(self._compressor.flush())
+        self._file.write(REPLAY_FOOTER.pack(*summary))
+        self._file.close()
+
+
+class ReplayLog:
+    """
+    Contents of a replay log.
+
+    Attributes:
+        seed (int): Seed of the game's RNG.
+        character (int): Index of the character played.
+        speed (int): Game speed the session was played at.
+        frames (list[FrameInput]): Input of every frame.
+        summary (SessionSummary): State of the game when the session ended.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, self.seed, self.character, self.speed = (
+            REPLAY_HEADER.unpack_from(data)
+        )
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay log")
+
+        body = zlib.decompress(data[REPLAY_HEADER.size : -REPLAY_FOOTER.size])
+        self.frames: list[FrameInput] = [
+            FrameInput(dt, bool(flags & CLICKED), bool(flags & QUIT), (x, y))
+            for dt, flags, x, y in REPLAY_FRAME.iter_unpack(body)
+        ]
+        self.summary = SessionSummary(
+            *REPLAY_FOOTER.unpack(data[-REPLAY_FOOTER.size :])
+        )
+
+
+class LiveInput:
+    """
+    Reads input from pygame, waiting for the clock to cap the frame rate, and
+    optionally records it.
+
+    Attributes:
+        clock (pygame.time.Clock): Clock capping the frame rate.
+        fps (int): Maximum frame rate.
+        recorder (InputRecorder | None): Recorder the frames are written to.
+        frames (int): Number of frames read.
+    """
+
+    def __init__(self, clock: pygame.time.Clock, fps: int, recorder=None):
+        self.clock = clock
+        self.fps: int = fps
+        self.recorder: InputRecorder | None = recorder
+        self.frames: int = 0
+
+    def read(self) -> FrameInput:
+        """
+        Waits for the next frame and collects the input received since the last one.
+
+        Returns:
+            FrameInput: Input of the frame.
+        """
+        dt = self.clock.tick(self.fps)
+        clicked = quit = overlay = odds = False
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit = True
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                clicked = True
+            if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+                overlay = True
+            if event.type == pygame.KEYDOWN and event.key == ODDS_KEY:
+                odds = True
+
+        frame = FrameInput(dt, clicked, quit, pygame.mouse.get_pos(), overlay, odds)
+        self.frames += 1
+        if self.recorder:
+            self.recorder.write(frame)
+        return frame
+
+    def close(self, summary: SessionSummary) -> None:
+        """
+        Ends the session, finishing the recording if there is one.
+
+        Args:
+            summary (SessionSummary): State of the game when the session ended.
+        """
+        if self.recorder:
+            self.recorder.close(summary)
+            self.recorder = None
+
+
+class ReplayInput:
+    """
+    Feeds the frames of a replay log to the game.
+
+    Attributes:
+        log (ReplayLog): Log being replayed.
+        clock (pygame.time.Clock | None): Clock capping the frame rate, or None to
+            replay as fast as possible.
+        fps (int): Maximum frame rate when a clock is given.
+        frames (int): Number of frames read.
+    """
+
+    def __init__(self, log: ReplayLog, clock=None, fps: int = 0):
+        self.log = log
+        self.clock = clock
+        self.fps: int = fps
+        self.frames: int = 0
+
+    def read(self) -> FrameInput:
+        """
+        Returns the next recorded frame.
+
+        Returns:
+            FrameInput: Input of the frame.
+
+        Raises:
+            ReplayFinished: If every recorded frame has been played.
+        """
+        if self.frames >= len(self.log.frames):
+            raise ReplayFinished()
+        if self.clock:
+            self.clock.tick(self.fps)
+        keys = {
+            event.key for event in pygame.event.get() if event.type == pygame.KEYDOWN
+        }
+
+        frame = self.log.frames[self.frames]
+        self.frames += 1
+        return frame._replace(overlay=OVERLAY_KEY in keys, odds=ODDS_KEY in keys)
+
+    def close(self, summary: SessionSummary) -> None:
+        """
+        Ends the replay when the replayed session ends.
+
+        Args:
+            summary (SessionSummary): State of the game when the session ended.
+
+        Raises:
+            ReplayFinished: Always.
+        """
+        raise ReplayFinished()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded session.")
+    parser.add_argument("log", help="replay log written by main.py --record")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="don't open a window or draw anything, and replay as fast as possible",
+    )
+    parser.add_argument(
+        "--uncapped", action="store_true", help="replay as fast as possible"
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE", help="write a frame-time trace to FILE"
+    )
+    args = parser.parse_args()
+
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    # imported here as game imports this module
+    from game import Game
+    from profiler import Profiler
+    from random_source import RandomSource
+
+    log = ReplayLog(args.log)
+    uncapped = args.headless or args.uncapped
+    source = ReplayInput(log, None if uncapped else assets.CLOCK, FPS)
+    game = Game(
+        log.character,
+        on_exit=None,
+        rng=RandomSource(log.seed),
+        input_source=source,
+        headless=args.headless,
+        speed=log.speed,
+        profiler=Profiler(args.profile),
+    )
+
+    start = time.perf_counter()
+    try:
+        game.run()
+    except ReplayFinished:
+        pass
+    finally:
+        game.profiler.close()
+    elapsed = time.perf_counter() - start
+
+    summary = game.summary()
+    print(f"replayed {summary.frames} frames in {elapsed:.1f}s")
+    print(f"recorded: {log.summary}")
+    print(f"replayed: {summary}")
+    print("replay matches" if summary == log.summary else "REPLAY DIVERGED")
+
+
+if __name__ == "__main__":
+    main()
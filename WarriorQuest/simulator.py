@@ -0,0 +1,430 @@
+"""
+Batch balance simulator.
+
+Plays complete three-level journeys with the headless combat engine, using the
+same character stats, enemy tables and spawn rules as the game, and reports how
+each character fares.
+
+The engine plays about a thousand journeys per second per core. With NumPy, the
+built-in policies are instead played by the lockstep battle kernel, which plays
+the same journeys some 70 times faster (benchmark.py measures both); --engine
+scalar keeps the engine, and custom policies always use it.
+
+Usage:
+    python simulator.py --journeys 100000 --policy heal --workers 8
+"""
+
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from typing import Callable, Iterator, NamedTuple
+from combat import Combatant, CombatEngine, USE_POTION, attack_first_enemy, run_battle
+from enemy import BOSSES, spawn_level
+from player import PLAYERS
+from random_source import RNG, RandomSource
+
+# constants
+LEVELS = len(BOSSES)
+HEAL_THRESHOLD = 0.4  # fraction of max HP below which the heal policy drinks
+CHUNK_SIZE = 2000  # journeys per unit of work handed to a worker
+KERNEL_CHUNK_SIZE = 50_000  # journeys per unit of work played by the battle kernel
+
+
+class JourneyResult(NamedTuple):
+    """
+    Outcome of one simulated journey through the dungeon.
+
+    Attributes:
+        character (str): Name of the player character.
+        won (bool): Whether every level was cleared.
+        levels_cleared (int): Number of levels cleared.
+        hp (tuple[int, ...]): Player HP at the end of each level played.
+        turns (tuple[int, ...]): Turns taken in each level played.
+        potions_used (tuple[int, ...]): Potions drunk in each level played.
+    """
+
+    character: str
+    won: bool
+    levels_cleared: int
+    hp: tuple[int, ...]
+    turns: tuple[int, ...]
+    potions_used: tuple[int, ...]
+
+
+def heal_when_low(engine: CombatEngine) -> int:
+    """
+    Player policy: drink a potion when HP falls below HEAL_THRESHOLD, otherwise
+    attack the first living enemy.
+
+    Args:
+        engine (CombatEngine): Battle being played.
+
+    Returns:
+        int: Index of the enemy to attack, or USE_POTION.
+    """
+    player = engine.player
+    if player.hp < player.max_hp * HEAL_THRESHOLD and engine.can_heal():
+        return USE_POTION
+    return attack_first_enemy(engine)
+
+
+POLICIES: dict[str, Callable[[CombatEngine], int]] = {
+    "attack": attack_first_enemy,
+    "heal": heal_when_low,
+}
+
+# heal threshold the battle kernel plays each policy with; 0 never drinks
+KERNEL_POLICIES: dict[str, float] = {"attack": 0.0, "heal": HEAL_THRESHOLD}
+
+
+def kernel_plays(policy_name: str) -> bool:
+    """
+    Returns whether the battle kernel can play a policy: it needs NumPy and only
+    plays the policies in KERNEL_POLICIES.
+
+    Args:
+        policy_name (str): Key of the player policy in POLICIES.
+
+    Returns:
+        bool: Whether the policy can be played by the kernel.
+    """
+    if policy_name not in KERNEL_POLICIES:
+        return False
+    try:
+        import battle_kernel  # imported here, as it imports this module
+    except ImportError:
+        return False
+    return True
+
+
+def run_journey(
+    character: tuple, policy: Callable[[CombatEngine], int], rng=RNG
+) -> JourneyResult:
+    """
+    Plays one journey through every level, stopping when the player dies.
+
+    Args:
+        character (tuple): Row of player.PLAYERS for the character.
+        policy (Callable[[CombatEngine], int]): Chooses the player's actions.
+        rng (random.Random): Random number generator. Defaults to the shared game RNG.
+
+    Returns:
+        JourneyResult: Outcome of the journey.
+    """
+    player = Combatant(*character)
+    hp, turns, potions_used = [], [], []
+
+    for level in range(1, LEVELS + 1):
+        level_turns = level_potions = 0
+
+        for round_enemies in spawn_level(level, rng):
+            enemies = [Combatant(row[0], *row[2:5]) for row in round_enemies]
+            engine = CombatEngine(player, enemies, rng=rng)
+            level_turns += run_battle(engine, policy)
+            level_potions += engine.potions_used
+
+            if engine.player_lost():
+                break
+
+        hp.append(player.hp)
+        turns.append(level_turns)
+        potions_used.append(level_potions)
+
+        if player.hp <= 0:
+            break
+
+    levels_cleared = len(hp) if player.hp > 0 else len(hp) - 1
+    return JourneyResult(
+        player.name,
+        levels_cleared == LEVELS,
+        levels_cleared,
+        tuple(hp),
+        tuple(turns),
+        tuple(potions_used),
+    )
+
+
+class BalanceStats:
+    """
+    Running totals of the journeys played by one character.
+
+    Attributes:
+        character (str): Name of the player character.
+        journeys (int): Number of journeys recorded.
+        wins (int): Number of journeys that cleared every level.
+        reached (list[int]): Number of journeys that played each level.
+        cleared (list[int]): Number of journeys that cleared each level.
+        hp (list[int]): Total HP left after clearing each level.
+        turns (list[int]): Total turns taken in each level.
+        potions_used (list[int]): Total potions drunk in each level.
+    """
+
+    def __init__(self, character: str):
+        self.character: str = character
+        self.journeys: int = 0
+        self.wins: int = 0
+        self.reached: list[int] = [0] * LEVELS
+        self.cleared: list[int] = [0] * LEVELS
+        self.hp: list[int] = [0] * LEVELS
+        self.turns: list[int] = [0] * LEVELS
+        self.potions_used: list[int] = [0] * LEVELS
+
+    def add(self, result: JourneyResult) -> None:
+        """
+        Records the outcome of one journey.
+
+        Args:
+            result (JourneyResult): Journey to record.
+        """
+        self.journeys += 1
+        self.wins += result.won
+
+        for level, hp in enumerate(result.hp):
+            self.reached[level] += 1
+            self.turns[level] += result.turns[level]
+            self.potions_used[level] += result.potions_used[level]
+            if level < result.levels_cleared:
+                self.cleared[level] += 1
+                self.hp[level] += hp
+
+    def merge(self, other: "BalanceStats") -> None:
+        """
+        Adds the totals of another set of journeys of the same character.
+
+        Args:
+            other (BalanceStats): Totals to add.
+        """
+        self.journeys += other.journeys
+        self.wins += other.wins
+        for level in range(LEVELS):
+            self.reached[level] += other.reached[level]
+            self.cleared[level] += other.cleared[level]
+            self.hp[level] += other.hp[level]
+            self.turns[level] += other.turns[level]
+            self.potions_used[level] += other.potions_used[level]
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.journeys if self.journeys else 0.0
+
+    def report(self) -> str:
+        """
+        Formats the averages of every level as a table.
+
+        Returns:
+            str: Multi-line report.
+        """
+        lines = [
+            f"{self.character}: {self.journeys} journeys, win rate {self.win_rate:.2%}",
+            "  level  reached  cleared   hp left   turns  potions",
+        ]
+        for level in range(LEVELS):
+            reached = self.reached[level] or 1
+            cleared = self.cleared[level] or 1
+            lines.append(
+                f"  {level + 1:>5}  {self.reached[level]:>7}"
+                f"  {self.cleared[level] / reached:>7.2%}"
+                f"  {self.hp[level] / cleared:>8.1f}"
+                f"  {self.turns[level] / reached:>6.1f}"
+                f"  {self.potions_used[level] / reached:>7.2f}"
+            )
+        return "\n".join(lines)
+
+
+def simulate(
+    character: tuple, journeys: int, policy: Callable[[CombatEngine], int], rng=RNG
+) -> BalanceStats:
+    """
+    Plays many journeys with one character.
+
+    Args:
+        character (tuple): Row of player.PLAYERS for the character.
+        journeys (int): Number of journeys to play.
+        policy (Callable[[CombatEngine], int]): Chooses the player's actions.
+        rng (random.Random): Random number generator. Defaults to the shared game RNG.
+
+    Returns:
+        BalanceStats: Totals of the journeys played.
+    """
+    stats = BalanceStats(character[0])
+    for _ in range(journeys):
+        stats.add(run_journey(character, policy, rng))
+    return stats
+
+
+def simulate_chunk(task: tuple) -> BalanceStats:
+    """
+    Plays one chunk of journeys. Runs in a worker process.
+
+    Args:
+        task (tuple): Character index, chunk index, number of journeys, policy
+            name, master seed and whether the battle kernel plays it.
+
+    Returns:
+        BalanceStats: Totals of the chunk.
+    """
+    character_index, chunk, journeys, policy_name, seed, kernel = task
+    # every chunk has its own stream, whichever worker plays it
+    rng = RandomSource(seed).spawn(character_index, chunk)
+    if kernel:
+        from battle_kernel import run_kernel
+
+        return run_kernel(
+            PLAYERS[character_index],
+            journeys,
+            rng.getrandbits(64),
+            heal_threshold=KERNEL_POLICIES[policy_name],
+        )
+    return simulate(PLAYERS[character_index], journeys, POLICIES[policy_name], rng)
+
+
+def make_tasks(
+    characters: list[int],
+    journeys: int,
+    policy_name: str,
+    seed: int,
+    chunk_size: int = CHUNK_SIZE,
+    kernel: bool = False,
+) -> Iterator[tuple]:
+    """
+    Splits the journeys of every character into chunks.
+
+    Args:
+        characters (list[int]): Indices of the characters in player.PLAYERS.
+        journeys (int): Journeys per character.
+        policy_name (str): Key of the player policy in POLICIES.
+        seed (int): Master seed of the sweep.
+        chunk_size (int): Maximum number of journeys per chunk.
+        kernel (bool): Whether the chunks are played by the battle kernel.
+
+    Yields:
+        tuple: Task for simulate_chunk().
+    """
+    for character_index in characters:
+        for chunk, first in enumerate(range(0, journeys, chunk_size)):
+            count = min(chunk_size, journeys - first)
+            yield character_index, chunk, count, policy_name, seed, kernel
+
+
+def run_sweep(
+    characters: list[int],
+    journeys: int,
+    policy_name: str,
+    seed: int,
+    workers: int = 1,
+    chunk_size: int | None = None,
+    kernel: bool = False,
+) -> dict[str, BalanceStats]:
+    """
+    Plays journeys for several characters, spreading the chunks over worker processes.
+
+    Each chunk is seeded from the master seed and its own position, and the totals
+    are integer sums, so the results are identical for any number of workers.
+
+    Args:
+        characters (list[int]): Indices of the characters in player.PLAYERS.
+        journeys (int): Journeys per character.
+        policy_name (str): Key of the player policy in POLICIES.
+        seed (int): Master seed of the sweep.
+        workers (int): Number of worker processes. 1 plays every chunk in this process.
+        chunk_size (int | None): Maximum number of journeys per chunk. Defaults to
+            KERNEL_CHUNK_SIZE for the kernel and CHUNK_SIZE for the engine.
+        kernel (bool): Whether the battle kernel plays the journeys, which needs
+            NumPy and a policy in KERNEL_POLICIES.
+
+    Returns:
+        dict[str, BalanceStats]: Totals of every character, in the order given.
+    """
+    if chunk_size is None:
+        chunk_size = KERNEL_CHUNK_SIZE if kernel else CHUNK_SIZE
+    totals = {PLAYERS[i][0]: BalanceStats(PLAYERS[i][0]) for i in characters}
+    tasks = make_tasks(characters, journeys, policy_name, seed, chunk_size, kernel)
+
+    if workers == 1:
+        for stats in map(simulate_chunk, tasks):
+            totals[stats.character].merge(stats)
+        return totals
+
+    with Pool(workers) as pool:
+        for stats in pool.imap_unordered(simulate_chunk, tasks):
+            totals[stats.character].merge(stats)
+    return totals
+
+
+def positive_int(value: str) -> int:
+    """
+    Parses a command line count that must be at least 1.
+    Args:
+        value (str): Argument as given on the command line.
+    Returns:
+        int: Parsed count.
+    """
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {count}")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate journeys to check balance.")
+    parser.add_argument(
+        "--journeys", type=positive_int, default=10000, help="journeys per character"
+    )
+    parser.add_argument(
+        "--policy", choices=POLICIES, default="heal", help="player policy"
+    )
+    parser.add_argument(
+        "--character",
+        choices=[character[0] for character in PLAYERS],
+        help="only simulate this character",
+    )
+    parser.add_argument("--seed", type=int, help="seed for reproducible results")
+    parser.add_argument(
+        "--workers", type=positive_int, default=os.cpu_count(), help="worker processes"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        help=f"journeys per work unit (default: {KERNEL_CHUNK_SIZE} with the kernel,"
+        f" {CHUNK_SIZE} with the engine)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "kernel", "scalar"],
+        default="auto",
+        help="play the journeys with the battle kernel or the combat engine"
+        " (default: the kernel when NumPy is installed)",
+    )
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else RNG.seed_value
+    characters = [i for i, c in enumerate(PLAYERS) if args.character in (None, c[0])]
+    kernel = args.engine != "scalar" and kernel_plays(args.policy)
+    if args.engine == "kernel" and not kernel:
+        parser.error("the battle kernel needs NumPy")
+
+    start = time.perf_counter()
+    totals = run_sweep(
+        characters,
+        args.journeys,
+        args.policy,
+        seed,
+        args.workers,
+        args.chunk_size,
+        kernel,
+    )
+    elapsed = time.perf_counter() - start
+
+    for stats in totals.values():
+        print(stats.report())
+    total = args.journeys * len(characters)
+    engine = "battle kernel" if kernel else "combat engine"
+    print(
+        f"seed {seed}: {total} journeys in {elapsed:.1f}s ({total / elapsed:.0f}/s)"
+        f" with the {engine}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,526 @@
+"""
+Exact battle solver.
+
+Every roll in a battle has a small discrete distribution: damage is strength ± 5,
+critical hits multiply it by 1.5, the player's double hits by 2, potions heal
+30 ± 5 and killing blows may drop a potion. The solver treats the battle as a
+Markov decision process over (whose turn, player HP, potions, each enemy's HP),
+averaging over those distributions on enemy turns and taking the best action on
+the player's. It gives the exact chance of winning under optimal play together
+with the action that achieves it, rather than an estimate from sampled battles.
+
+States are solved for every player HP at once, as NumPy vectors indexed by HP, so
+one table entry per (potions, enemy HP) covers a whole column of states. Solved
+tables are memoised, and the table of each character and enemy line-up can be
+saved to disk so later battles against the same enemies start warm. Requires NumPy.
+
+BackgroundSolver runs a solver on a worker thread for the in-game readout, so a
+cold table never holds up a frame.
+
+Usage:
+    python solver.py Warrior Golem Witch --hp 60 --potions 2
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import NamedTuple
+import numpy
+from combat import (
+    Combatant,
+    CombatEngine,
+    USE_POTION,
+    damage_distribution,
+    heal_distribution,
+)
+from enemy import ENEMIES, BOSSES
+from player import PLAYERS
+
+# constants
+SOLVER_CACHE = "solver_cache"  # directory the solved tables are saved to
+SOLVER_VERSION = 1  # bump when the rules change, so old tables are discarded
+TIE_TOLERANCE = 1e-12  # actions this close count as equal; attacking wins ties
+
+
+class Solution(NamedTuple):
+    """
+    Value of a battle state under optimal play.
+
+    Attributes:
+        win_probability (float | None): Chance that the player wins the battle,
+            or None while it is being solved.
+        action (int | None): Index of the enemy to attack or USE_POTION, on the
+            player's turn; None on an enemy's turn or once the battle is over.
+    """
+
+    win_probability: float | None
+    action: int | None
+
+
+# shown by the in-game readout while the worker solves the state
+SOLVING = Solution(None, None)
+
+
+def line_up(player: Combatant, enemies: list[Combatant]) -> tuple[tuple, tuple]:
+    """
+    Collects the stats a battle's outcome depends on.
+
+    Args:
+        player (Combatant): Player fighting the battle.
+        enemies (list[Combatant]): Enemies fighting the battle, in turn order.
+
+    Returns:
+        tuple[tuple, tuple]: Player stats (name, max hp, strength, crit chance,
+            double chance, potion chance) and the stats of each enemy (name, max
+            hp, strength, crit chance).
+    """
+    return (
+        (
+            player.name,
+            player.max_hp,
+            player.strength,
+            player.crit_chance,
+            player.double_chance,
+            player.potion_chance,
+        ),
+        tuple(
+            (enemy.name, enemy.max_hp, enemy.strength, enemy.crit_chance)
+            for enemy in enemies
+        ),
+    )
+
+
+class BattleSolver:
+    """
+    Solves one battle between a player and a line-up of enemies.
+
+    The table only depends on the combatants' stats, not on their current HP or
+    potions, so one solver answers every state of every battle against the same
+    enemies in the same order. Above `safe_hp` the player can't lose even if every
+    roll goes against them, so the HP vectors stop there.
+
+    Attributes:
+        player (tuple): Player stats, as given by line_up().
+        enemies (tuple[tuple, ...]): Stats of each enemy in turn order, as given
+            by line_up().
+        path (str | None): File the table is saved to, or None to keep it in memory.
+        safe_hp (int): HP above which every state is won.
+        table (dict[tuple[int, tuple[int, ...]], tuple]): Win probability and best
+            action at the start of the player's turn, as vectors indexed by HP,
+            keyed by potions and enemy HP.
+    """
+
+    def __init__(
+        self,
+        player: Combatant,
+        enemies: list[Combatant],
+        cache_dir: str | None = SOLVER_CACHE,
+    ):
+        if any(enemy.speed != player.speed for enemy in enemies):
+            raise ValueError("the solver needs every combatant to act once a round")
+        self.player, self.enemies = line_up(player, enemies)
+        self.path: str | None = None
+        if cache_dir:
+            names = [player.name] + [enemy.name for enemy in enemies]
+            self.path = os.path.join(cache_dir, "-".join(names).lower() + ".pkl")
+
+        self._player_damage = damage_distribution(*self.player[2:5])
+        if self._player_damage[0][0] <= 0:
+            raise ValueError(f"{player.name}'s attacks must always deal damage")
+        enemy_damage = [damage_distribution(*enemy[2:4]) for enemy in self.enemies]
+        self.safe_hp: int = self.find_safe_hp(enemy_damage)
+        self.table: dict[tuple[int, tuple[int, ...]], tuple] = {}
+        self._saved_size: int = 0
+        # derived from the table as it is solved, so not saved with it
+        self._acted: dict[tuple[int, int, tuple[int, ...]], numpy.ndarray] = {}
+        self._attack_outcomes: dict[int, list[tuple[int, float]]] = {}
+
+        # gathering a vector at these indices moves every HP by every roll at once
+        hp = numpy.arange(self.safe_hp + 1)
+        self._enemy_attacks = [
+            self.make_shift(hp, [(-damage, p) for damage, p in dist])
+            for dist in enemy_damage
+        ]
+        index, p = self.make_shift(hp, heal_distribution())
+        self._heal = (numpy.minimum(index, player.max_hp), p)
+        self._can_heal = (hp > 0) & (hp < player.max_hp)
+        self.load()
+
+    def find_safe_hp(self, enemy_damage: list[list[tuple[int, float]]]) -> int:
+        """
+        Finds the HP above which the player can't lose. Attacking the enemies in
+        order with the lowest damage every time kills each of them within a known
+        number of turns; a player who outlasts every enemy attack in that time at
+        its highest damage wins whatever is rolled.
+
+        Args:
+            enemy_damage (list[list[tuple[int, float]]]): Damage distribution of
+                each enemy.
+
+        Returns:
+            int: Safe HP at the start of any turn of the battle.
+        """
+        min_damage = self._player_damage[0][0]
+        max_damage = [max(dist[-1][0], 0) for dist in enemy_damage]
+        safe = sum(max_damage)  # enemies yet to act before the player's next turn
+        attacks = 0
+        for damage, enemy in zip(max_damage, self.enemies):
+            attacks += -(-enemy[1] // min_damage)
+            safe += damage * (attacks - 1)
+        return safe
+
+    def make_shift(
+        self, hp: numpy.ndarray, outcomes: list[tuple[int, float]]
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Builds the indices that move every HP by the change of each outcome, for
+        vectors with a 1 appended for HP above safe_hp.
+
+        Args:
+            hp (numpy.ndarray): HP of each vector entry.
+            outcomes (list[tuple[int, float]]): HP change and probability of each
+                outcome.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Indices, one row per outcome, and
+                the outcome probabilities.
+        """
+        changes = numpy.array([change for change, _ in outcomes])
+        index = numpy.clip(hp + changes[:, None], 0, self.safe_hp + 1)
+        return index, numpy.array([p for _, p in outcomes])
+
+    def solve(
+        self, turn: int, hp: int, potions: int, enemy_hps: tuple[int, ...]
+    ) -> Solution:
+        """
+        Returns the exact chance of winning from a state and the best action in it.
+
+        Args:
+            turn (int): 0 for the player's turn, i for the turn of enemy i - 1.
+            hp (int): Player HP.
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+
+        Returns:
+            Solution: Win probability and, on the player's turn, the best action.
+        """
+        if hp <= 0:
+            return Solution(0.0, None)
+        if not any(enemy_hps):
+            return Solution(1.0, None)
+
+        if turn != 0:
+            values = self.enemies_act(turn, potions, enemy_hps)
+            value = values[min(hp, self.safe_hp + 1)]
+            return Solution(min(float(value), 1.0), None)
+
+        if hp > self.safe_hp:
+            return Solution(1.0, next(i for i, left in enumerate(enemy_hps) if left))
+        values, actions = self.solve_player_turn(potions, enemy_hps)
+        return Solution(float(values[hp]), int(actions[hp]))
+
+    def solve_engine(self, engine: CombatEngine) -> Solution:
+        """
+        Solves the current state of a battle being played. Damage still waiting to
+        land isn't counted, so call it between turns.
+
+        Args:
+            engine (CombatEngine): Battle against this solver's enemies.
+
+        Returns:
+            Solution: Win probability and, on the player's turn, the best action.
+        """
+        return self.solve(
+            engine.current_turn,
+            engine.player.hp,
+            engine.player.potions,
+            tuple(enemy.hp for enemy in engine.enemies),
+        )
+
+    def solve_player_turn(
+        self, potions: int, enemy_hps: tuple[int, ...]
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Weighs attacking each living enemy and drinking a potion, for every HP.
+
+        Args:
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Win probability of the best action
+                and the action, indexed by HP.
+        """
+        key = (potions, enemy_hps)
+        solved = self.table.get(key)
+        if solved is not None:
+            return solved
+
+        potion_chance = self.player[5] / 100
+        choices, options = [], []
+
+        for i, enemy_hp in enumerate(enemy_hps):
+            if enemy_hp <= 0:
+                continue
+            rows, weights = [], []
+            for left, p in self.attack_outcomes(enemy_hp):
+                after = enemy_hps[:i] + (left,) + enemy_hps[i + 1 :]
+                rows.append(self.enemies_act(1, potions, after))
+                weights.append(p)
+                if left == 0 and potion_chance:  # killing blows may drop a potion
+                    rows.append(self.enemies_act(1, potions + 1, after))
+                    weights[-1] *= 1 - potion_chance
+                    weights.append(p * potion_chance)
+            choices.append(i)
+            options.append(numpy.array(weights) @ numpy.array(rows)[:, :-1])
+
+        if potions > 0:
+            after = self.enemies_act(1, potions - 1, enemy_hps)
+            index, p = self._heal
+            choices.append(USE_POTION)
+            options.append(numpy.where(self._can_heal, p @ after[index], -1.0))
+
+        options = numpy.array(options)
+        best = numpy.minimum(options.max(axis=0), 1.0)  # drop rounding errors
+        best[0] = 0.0  # an HP of 0 has lost, whatever the rolls were
+        # the first choice within the tolerance, so attacks win ties with potions
+        chosen = (options >= best - TIE_TOLERANCE).argmax(axis=0)
+        solved = (best, numpy.array(choices, dtype=numpy.int8)[chosen])
+        self.table[key] = solved
+        return solved
+
+    def attack_outcomes(self, enemy_hp: int) -> list[tuple[int, float]]:
+        """
+        Lists the HP an enemy can be left with after the player attacks it.
+
+        Args:
+            enemy_hp (int): Enemy HP before the attack.
+
+        Returns:
+            list[tuple[int, float]]: Each distinct HP left and its probability.
+        """
+        outcomes = self._attack_outcomes.get(enemy_hp)
+        if outcomes is None:
+            left: dict[int, float] = {}
+            for damage, p in self._player_damage:
+                hp = max(enemy_hp - damage, 0)
+                left[hp] = left.get(hp, 0.0) + p
+            outcomes = self._attack_outcomes[enemy_hp] = list(left.items())
+        return outcomes
+
+    def enemies_act(
+        self, turn: int, potions: int, enemy_hps: tuple[int, ...]
+    ) -> numpy.ndarray:
+        """
+        Averages the outcomes of the rest of a round's enemy attacks, for every HP.
+        Enemies can roll negative damage, which raises the player's HP.
+
+        Args:
+            turn (int): Turn of the first enemy to act, enemy turn - 1.
+            potions (int): Potions the player carries.
+            enemy_hps (tuple[int, ...]): HP of each enemy, 0 once dead.
+
+        Returns:
+            numpy.ndarray: Win probability indexed by HP, with a 1 appended for HP
+                above safe_hp.
+        """
+        key = (turn, potions, enemy_hps)
+        values = self._acted.get(key)
+        if values is not None:
+            return values
+
+        if not any(enemy_hps):
+            values = numpy.ones(self.safe_hp + 2)
+        else:
+            values = numpy.append(self.solve_player_turn(potions, enemy_hps)[0], 1.0)
+            for i in reversed(range(turn - 1, len(enemy_hps))):
+                if enemy_hps[i] > 0:  # dead enemies pass their turn
+                    index, p = self._enemy_attacks[i]
+                    values[: self.safe_hp + 1] = p @ values[index]
+                    values[0] = 0.0
+        self._acted[key] = values
+        return values
+
+    def load(self) -> None:
+        """
+        Loads the table saved for this line-up, unless it was solved with other
+        stats or rules.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                version, player, enemies, table = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return
+        if (version, player, enemies) == (SOLVER_VERSION, self.player, self.enemies):
+            self.table = table
+            self._saved_size = len(table)
+
+    def save(self) -> None:
+        """
+        Saves the table if states have been solved since it was loaded or saved.
+        """
+        if not self.path or len(self.table) == self._saved_size:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "wb") as f:
+            pickle.dump(
+                (SOLVER_VERSION, self.player, self.enemies, self.table),
+                f,
+                pickle.HIGHEST_PROTOCOL,
+            )
+        self._saved_size = len(self.table)
+
+
+class BackgroundSolver:
+    """
+    Solves the states of a battle on a worker thread, for the in-game readout.
+
+    Loading the saved table and solving a cold one take hundreds of milliseconds,
+    so none of it happens on the game loop: request() hands the state over and
+    returns at once, with the solution only once the worker has found it. States
+    requested while the worker is busy replace each other, so only the latest one
+    is solved next.
+
+    Attributes:
+        solver (BattleSolver | None): Solver of the battle, once the worker has
+            created it.
+        failed (bool): Whether the battle can't be solved, such as when the
+            combatants' speeds differ.
+    """
+
+    def __init__(
+        self,
+        player: Combatant,
+        enemies: list[Combatant],
+        cache_dir: str | None = SOLVER_CACHE,
+    ):
+        self.solver: BattleSolver | None = None
+        self.failed: bool = False
+        self._lock = threading.Condition()
+        self._request: tuple | None = None
+        self._result: tuple[tuple, Solution] | None = None
+        self._closed: bool = False
+        self._thread = threading.Thread(
+            target=self.work,
+            args=(player, list(enemies), cache_dir),
+            name="solver",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def request(self, engine: CombatEngine) -> Solution | None:
+        """
+        Asks for the current state of a battle to be solved, without waiting.
+        Damage still waiting to land isn't counted, so call it between turns.
+
+        Args:
+            engine (CombatEngine): Battle against this solver's enemies.
+
+        Returns:
+            Solution | None: Solution of the state, or None until it is solved.
+        """
+        state = (
+            engine.current_turn,
+            engine.player.hp,
+            engine.player.potions,
+            tuple(enemy.hp for enemy in engine.enemies),
+        )
+        with self._lock:
+            if self._result and self._result[0] == state:
+                return self._result[1]
+            if self._request != state and not self._closed:
+                self._request = state
+                self._lock.notify()
+        return None
+
+    def close(self) -> None:
+        """
+        Stops the worker once it has finished the state it is solving, then saves
+        the table. Doesn't wait for either.
+        """
+        with self._lock:
+            self._closed = True
+            self._request = None
+            self._lock.notify()
+
+    def work(
+        self, player: Combatant, enemies: list[Combatant], cache_dir: str | None
+    ) -> None:
+        """
+        Creates the solver and solves the requested states until closed. Runs on
+        the worker thread.
+
+        Args:
+            player (Combatant): Player fighting the battle.
+            enemies (list[Combatant]): Enemies fighting the battle, in turn order.
+            cache_dir (str | None): Directory the table is saved to, or None to
+                keep it in memory.
+        """
+        try:
+            self.solver = BattleSolver(player, enemies, cache_dir)
+        except ValueError:
+            self.failed = True
+            return
+
+        while True:
+            with self._lock:
+                while self._request is None and not self._closed:
+                    self._lock.wait()
+                if self._closed:
+                    break
+                state, self._request = self._request, None
+            solution = self.solver.solve(*state)
+            with self._lock:
+                self._result = (state, solution)
+        self.solver.save()
+
+
+def main() -> None:
+    rows = {row[0].lower(): row for row in ENEMIES + BOSSES}
+    characters = {row[0].lower(): row for row in PLAYERS}
+
+    parser = argparse.ArgumentParser(description="Solve a battle exactly.")
+    parser.add_argument("character", type=str.lower, choices=characters)
+    parser.add_argument("enemies", nargs="+", type=str.lower, choices=rows)
+    parser.add_argument("--hp", type=int, help="player HP (default: max HP)")
+    parser.add_argument(
+        "--potions", type=int, help="potions carried (default: starting potions)"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="don't load or save the solved table"
+    )
+    args = parser.parse_args()
+
+    character = characters[args.character]
+    player = Combatant(*character)
+    enemies = [Combatant(rows[name][0], *rows[name][2:5]) for name in args.enemies]
+    player.hp = args.hp if args.hp is not None else player.max_hp
+    player.potions = args.potions if args.potions is not None else character[6]
+
+    solver = BattleSolver(player, enemies, None if args.no_cache else SOLVER_CACHE)
+    cached = len(solver.table)
+    start = time.perf_counter()
+    solution = solver.solve_engine(CombatEngine(player, enemies))
+    elapsed = (time.perf_counter() - start) * 1000
+    solver.save()
+
+    if solution.action is None:
+        action = "none, the battle is over"
+    elif solution.action == USE_POTION:
+        action = "drink a potion"
+    else:
+        action = f"attack {enemies[solution.action].name}"
+    print(f"win probability {solution.win_probability:.4%}, best action: {action}")
+    print(
+        f"{len(solver.table)} tables ({cached} from cache) in {elapsed:.1f} ms",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,35 @@
 import pygame
 import json
+import struct
+import assets
+
+try:
+    import numpy
+except ImportError:  # outlines fall back to pygame masks
+    numpy = None
+
+# outlines
+OUTLINE_COLOUR = (0, 0, 0)
+OUTLINE_THICKNESS = 1
+OUTLINE_PADDING = 10
+
+# compiled atlas index format
+ATLAS_MAGIC = b"WQAT"
+ATLAS_VERSION = 2  # bumped whenever the frame format or outline style changes
+ATLAS_HEADER = struct.Struct("<4sHHHH")  # magic, version, frame w, frame h, animations
+ATLAS_ANIMATION = struct.Struct("<BBHH")  # name length, action length, fps, frames
+ATLAS_FRAME = struct.Struct("<HHHHhh")  # atlas x, y, w, h, anchor x, anchor y
 
 
 class Spritesheet:
-    def __init__(self, filename: str, frame_width: int, frame_height: int):
+    def __init__(
+        self,
+        filename: str,
+        frame_width: int,
+        frame_height: int,
+        image: pygame.Surface | None = None,
+        data: dict | None = None,
+    ):
         """
         Initializes the Spritesheet object by loading the image and corresponding metadata.
 
@@ -11,14 +37,21 @@ class Spritesheet:
             filename (str): Path to the spritesheet image file.
             frame_width (int): Width of each frame in the spritesheet.
             frame_height (int): The height of each frame in the spritesheet.
+            image (pygame.Surface): Spritesheet image already decoded, e.g. by the
+                preloader, but not yet converted. Defaults to loading the file.
+            data (dict): Metadata already read. Defaults to reading the file.
         """
         self.filename = filename
-        self.sprite_sheet = pygame.image.load(filename).convert_alpha()
+        self.sprite_sheet = (
+            image.convert_alpha() if image is not None else assets.load_image(filename)
+        )
         self.meta_data = self.filename.replace("png", "json")
         self.frame_width = frame_width
         self.frame_height = frame_height
-        with open(self.meta_data) as f:
-            self.data = json.load(f)
+        if data is None:
+            with open(self.meta_data) as f:
+                data = json.load(f)
+        self.data = data
 
     def get_sprite(self, x: int, y: int, w: int, h: int) -> pygame.Surface:
         """
@@ -59,34 +92,40 @@ class Spritesheet:
         return fixed_size_sprite
 
     def add_outline(
-        self, image: pygame.Surface, outline_colour=(0, 0, 0), outline_thickness=10
+        self,
+        image: pygame.Surface,
+        outline_colour=OUTLINE_COLOUR,
+        outline_thickness: int = OUTLINE_THICKNESS,
+        padding: int = OUTLINE_PADDING,
     ) -> pygame.Surface:
         """
-        Adds an outline to the given sprite image.
+        Adds an outline around the visible pixels of the given sprite image.
+
+        The outline is a dilation of the sprite's alpha channel, computed with
+        NumPy array operations when available and pygame masks otherwise.
 
         Args:
             image (pygame.Surface): Sprite image to outline.
             outline_colour (tuple): Colour of the outline. Defaults to black.
-            outline_thickness (int): Thickness of the outline. Defaults to 10.
+            outline_thickness (int): Thickness of the outline in pixels. Defaults to 1.
+            padding (int): Transparent border added around the image. Defaults to 10.
 
         Returns:
-            pygame.Surface: Sprite image with an added outline.
+            pygame.Surface: Padded sprite image with an added outline.
         """
-        mask = pygame.mask.from_surface(image)
-        outline = mask.outline()
+        padding = max(padding, outline_thickness)
         outline_image = pygame.Surface(
-            (
-                image.get_width() + outline_thickness * 2,
-                image.get_height() + outline_thickness * 2,
-            ),
+            (image.get_width() + padding * 2, image.get_height() + padding * 2),
             pygame.SRCALPHA,
         )
-        for point in outline:
-            outline_image.set_at(
-                (point[0] + outline_thickness, point[1] + outline_thickness),
-                outline_colour,
-            )
-        outline_image.blit(image, (outline_thickness, outline_thickness))
+
+        if outline_thickness > 0:
+            make_outline = outline_numpy if numpy is not None else outline_mask
+            outline = make_outline(image, outline_colour, outline_thickness)
+            offset = padding - outline_thickness
+            outline_image.blit(outline, (offset, offset))
+
+        outline_image.blit(image, (padding, padding))
         return outline_image
 
     def fix_size(
@@ -110,3 +149,210 @@ class Spritesheet:
         y_offset = height - image_with_outline.get_height()
         fixed_surface.blit(image_with_outline, (x_offset, y_offset))
         return fixed_surface
+
+
+def outline_numpy(
+    image: pygame.Surface, colour: tuple[int, int, int], thickness: int
+) -> pygame.Surface:
+    """
+    Builds a solid silhouette of the image grown by the given thickness using NumPy.
+
+    Args:
+        image (pygame.Surface): Sprite image to outline.
+        colour (tuple[int, int, int]): Colour of the outline.
+        thickness (int): Radius of the dilation in pixels.
+
+    Returns:
+        pygame.Surface: Silhouette, thickness pixels larger than the image on every side.
+    """
+    width, height = image.get_size()
+    solid = numpy.zeros((width + thickness * 2, height + thickness * 2), dtype=bool)
+    solid[thickness : thickness + width, thickness : thickness + height] = (
+        pygame.surfarray.array_alpha(image) > 0
+    )
+
+    dilated = numpy.zeros_like(solid)
+    for dx in range(-thickness, thickness + 1):
+        for dy in range(-thickness, thickness + 1):
+            if dx * dx + dy * dy <= thickness * thickness:
+                dilated[
+                    max(dx, 0) : dilated.shape[0] + min(dx, 0),
+                    max(dy, 0) : dilated.shape[1] + min(dy, 0),
+                ] |= solid[
+                    max(-dx, 0) : solid.shape[0] + min(-dx, 0),
+                    max(-dy, 0) : solid.shape[1] + min(-dy, 0),
+                ]
+
+    outline = pygame.Surface(dilated.shape, pygame.SRCALPHA)
+    outline.fill(colour)
+    pygame.surfarray.pixels_alpha(outline)[:] = dilated * numpy.uint8(255)
+    return outline
+
+
+def outline_mask(
+    image: pygame.Surface, colour: tuple[int, int, int], thickness: int
+) -> pygame.Surface:
+    """
+    Builds a solid silhouette of the image grown by the given thickness using pygame masks.
+
+    Args:
+        image (pygame.Surface): Sprite image to outline.
+        colour (tuple[int, int, int]): Colour of the outline.
+        thickness (int): Radius of the dilation in pixels.
+
+    Returns:
+        pygame.Surface: Silhouette, thickness pixels larger than the image on every side.
+    """
+    size = thickness * 2 + 1
+    disk = pygame.mask.Mask((size, size))
+    for x in range(size):
+        for y in range(size):
+            if (x - thickness) ** 2 + (y - thickness) ** 2 <= thickness * thickness:
+                disk.set_at((x, y))
+
+    dilated = pygame.mask.from_surface(image, 0).convolve(disk)
+    return dilated.to_surface(setcolor=(*colour, 255), unsetcolor=(0, 0, 0, 0))
+
+
+class Atlas:
+    def __init__(
+        self,
+        image_filename: str,
+        index_filename: str,
+        image: pygame.Surface | None = None,
+        index: bytes | None = None,
+    ):
+        """
+        Initializes the Atlas object by decoding the packed frame image and reading its index.
+
+        Args:
+            image_filename (str): Path to the atlas image built by build_atlas.py.
+            index_filename (str): Path to the binary atlas index built by build_atlas.py.
+            image (pygame.Surface): Atlas image already decoded, e.g. by the
+                preloader, but not yet converted. Defaults to loading the file.
+            index (bytes): Atlas index already read. Defaults to reading the file.
+        """
+        self.atlas_image = (
+            image.convert_alpha()
+            if image is not None
+            else assets.load_image(image_filename)
+        )
+        if index is None:
+            with open(index_filename, "rb") as f:
+                index = f.read()
+        self.frame_width, self.frame_height, self.animations = read_atlas_index(index)
+
+    def has_frames(self, name: str, action: str) -> bool:
+        """
+        Checks whether the atlas contains frames for a character action.
+
+        Args:
+            name (str): Name of the character.
+            action (str): Action of the character.
+
+        Returns:
+            bool: True if the action was compiled into the atlas, False otherwise.
+        """
+        return (name, action) in self.animations
+
+    def get_fps(self, name: str, action: str) -> int:
+        """
+        Returns the playback speed stored for a character action.
+
+        Args:
+            name (str): Name of the character.
+            action (str): Action of the character.
+
+        Returns:
+            int: Frames per second of the animation.
+        """
+        return self.animations[(name, action)][0]
+
+    def get_frames(self, name: str, action: str) -> list[pygame.Surface]:
+        """
+        Rebuilds the fixed-size frames of a character action from the atlas.
+
+        Args:
+            name (str): Name of the character.
+            action (str): Action of the character.
+
+        Returns:
+            list[pygame.Surface]: Frames of the action, in playback order.
+        """
+        frames = []
+        for x, y, w, h, anchor_x, anchor_y in self.animations[(name, action)][1]:
+            frame = pygame.Surface((self.frame_width, self.frame_height), pygame.SRCALPHA)
+            frame.blit(self.atlas_image, (anchor_x, anchor_y), (x, y, w, h))
+            frames.append(frame)
+        return frames
+
+
+def write_atlas_index(
+    frame_width: int, frame_height: int, animations: list[tuple]
+) -> bytes:
+    """
+    Serializes the atlas index.
+
+    Args:
+        frame_width (int): Width of each fixed-size frame.
+        frame_height (int): Height of each fixed-size frame.
+        animations (list[tuple]): (name, action, fps, frames) entries where each frame
+            is an (x, y, w, h, anchor_x, anchor_y) tuple.
+
+    Returns:
+        bytes: Binary atlas index.
+    """
+    data = bytearray(
+        ATLAS_HEADER.pack(
+            ATLAS_MAGIC, ATLAS_VERSION, frame_width, frame_height, len(animations)
+        )
+    )
+    for name, action, fps, frames in animations:
+        name_bytes, action_bytes = name.encode(), action.encode()
+        data += ATLAS_ANIMATION.pack(
+            len(name_bytes), len(action_bytes), fps, len(frames)
+        )
+        data += name_bytes + action_bytes
+        for frame in frames:
+            data += ATLAS_FRAME.pack(*frame)
+    return bytes(data)
+
+
+def read_atlas_index(data: bytes) -> tuple[int, int, dict]:
+    """
+    Parses an atlas index produced by write_atlas_index.
+
+    Args:
+        data (bytes): Binary atlas index.
+
+    Returns:
+        tuple[int, int, dict]: Frame width, frame height and a dictionary mapping
+            (name, action) to (fps, frames).
+
+    Raises:
+        ValueError: If the data is not an atlas index of the supported version.
+    """
+    magic, version, frame_width, frame_height, count = ATLAS_HEADER.unpack_from(data)
+    if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+        raise ValueError("Unsupported sprite atlas index")
+
+    offset = ATLAS_HEADER.size
+    animations = {}
+    for _ in range(count):
+        name_length, action_length, fps, frame_count = ATLAS_ANIMATION.unpack_from(
+            data, offset
+        )
+        offset += ATLAS_ANIMATION.size
+        name = data[offset : offset + name_length].decode()
+        offset += name_length
+        action = data[offset : offset + action_length].decode()
+        offset += action_length
+
+        frames = [
+            ATLAS_FRAME.unpack_from(data, offset + i * ATLAS_FRAME.size)
+            for i in range(frame_count)
+        ]
+        offset += frame_count * ATLAS_FRAME.size
+        animations[(name, action)] = (fps, frames)
+
+    return frame_width, frame_height, animations
@@ -0,0 +1,46 @@
+import time
+import pytest
+
+pytest.importorskip("numpy")
+
+from combat import CombatEngine
+from enemy import Enemy, ENEMIES
+from game import Game
+from solver import SOLVING, BackgroundSolver, BattleSolver
+
+FRAME_TIME = 16  # ms a frame may take
+SOLVE_TIMEOUT = 30  # s the worker may take to solve a cold table
+
+
+def make_battle() -> tuple[Game, CombatEngine]:
+    game = Game(0, on_exit=None, headless=True)
+    golem = next(row for row in ENEMIES if row[0] == "Golem")
+    enemies = [Enemy(*golem), Enemy(*golem)]
+    return game, CombatEngine(game.player, enemies)
+
+
+def test_update_odds_doesnt_block_on_a_cold_solver():
+    game, engine = make_battle()
+    game.solver = BackgroundSolver(game.player, engine.enemies, cache_dir=None)
+
+    start = time.perf_counter()
+    game.update_odds(engine)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    assert elapsed < FRAME_TIME
+    assert game.odds == SOLVING
+
+
+def test_update_odds_shows_the_solution_once_solved():
+    game, engine = make_battle()
+    game.solver = BackgroundSolver(game.player, engine.enemies, cache_dir=None)
+
+    deadline = time.perf_counter() + SOLVE_TIMEOUT
+    game.update_odds(engine)
+    while game.odds == SOLVING and time.perf_counter() < deadline:
+        time.sleep(0.01)
+        game.update_odds(engine)
+    game.solver.close()
+
+    expected = BattleSolver(game.player, engine.enemies, None).solve_engine(engine)
+    assert game.odds == expected
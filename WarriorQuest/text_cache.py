@@ -0,0 +1,181 @@
+import pygame
+from collections import OrderedDict
+
+# constants
+TEXT_CACHE_SIZE = 256  # rendered strings kept alive
+GLYPHS = "0123456789+-"  # characters drawn from glyph atlases
+
+
+class TextCache:
+    """
+    Least-recently-used cache of rendered text surfaces.
+
+    Attributes:
+        max_entries (int): Maximum number of rendered strings kept in the cache.
+        hits (int): Number of renders served from the cache.
+        misses (int): Number of renders that called Font.render.
+    """
+
+    def __init__(self, max_entries: int = TEXT_CACHE_SIZE):
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(
+        self, font: pygame.font.Font, text: str, antialias: bool, colour
+    ) -> pygame.Surface:
+        """
+        Renders text, reusing the surface from an earlier identical render.
+
+        The returned surface is shared and must not be drawn on.
+
+        Args:
+            font (pygame.font.Font): Font to render with.
+            text (str): Text to render.
+            antialias (bool): Whether to smooth the text edges.
+            colour: Colour of the text.
+
+        Returns:
+            pygame.Surface: Rendered text.
+        """
+        key = (text, font, colour, antialias)
+        surface = self._surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, colour)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        """
+        Removes every cached surface.
+        """
+        self._surfaces.clear()
+
+
+class GlyphAtlas:
+    """
+    Pre-rendered glyphs of one font and colour, used to draw numbers that change
+    every frame without rendering or allocating new surfaces.
+
+    Attributes:
+        glyphs (dict[str, pygame.Surface]): Rendered surface of every supported character.
+        height (int): Height of the rendered glyphs.
+    """
+
+    def __init__(self, font: pygame.font.Font, colour, antialias: bool):
+        self.glyphs: dict[str, pygame.Surface] = {
+            char: font.render(char, antialias, colour) for char in GLYPHS
+        }
+        self.height: int = font.get_height()
+
+    def supports(self, text: str) -> bool:
+        """
+        Checks whether every character of the text has a pre-rendered glyph.
+
+        Args:
+            text (str): Text to check.
+
+        Returns:
+            bool: True if the text can be drawn from the atlas, False otherwise.
+        """
+        return bool(text) and all(char in self.glyphs for char in text)
+
+    def split_suffix(self, text: str) -> tuple[str, str]:
+        """
+        Splits off the longest run of supported characters at the end of the
+        text, such as the value of "HP: 57".
+
+        Args:
+            text (str): Text to split.
+
+        Returns:
+            tuple[str, str]: Text before the run, and the run drawn from the atlas.
+        """
+        start = len(text)
+        while start and text[start - 1] in self.glyphs:
+            start -= 1
+        return text[:start], text[start:]
+
+    def get_size(self, text: str) -> tuple[int, int]:
+        """
+        Measures the text as it will be drawn from the atlas.
+
+        Args:
+            text (str): Text made only of supported characters.
+
+        Returns:
+            tuple[int, int]: Width and height of the text.
+        """
+        return sum(self.glyphs[char].get_width() for char in text), self.height
+
+    def draw(self, screen: pygame.Surface, text: str, topleft) -> pygame.Rect:
+        """
+        Draws the text glyph by glyph.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            text (str): Text made only of supported characters.
+            topleft (tuple[int, int]): Position of the top-left corner of the text.
+
+        Returns:
+            pygame.Rect: Region covered by the text.
+        """
+        x, y = topleft
+        for char in text:
+            glyph = self.glyphs[char]
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(topleft, (x - topleft[0], self.height))
+
+
+TEXT_CACHE = TextCache()
+_glyph_atlases: dict[tuple, GlyphAtlas] = {}
+
+
+def render_text(
+    font: pygame.font.Font, text: str, antialias: bool, colour
+) -> pygame.Surface:
+    """
+    Renders text through the shared text cache.
+
+    Args:
+        font (pygame.font.Font): Font to render with.
+        text (str): Text to render.
+        antialias (bool): Whether to smooth the text edges.
+        colour: Colour of the text.
+
+    Returns:
+        pygame.Surface: Rendered text, shared with other callers.
+    """
+    return TEXT_CACHE.render(font, text, antialias, colour)
+
+
+def get_glyph_atlas(font: pygame.font.Font, colour, antialias: bool) -> GlyphAtlas:
+    """
+    Returns the glyph atlas for a font and colour, building it on first use.
+
+    Args:
+        font (pygame.font.Font): Font of the glyphs.
+        colour: Colour of the glyphs.
+        antialias (bool): Whether the glyphs are smoothed.
+
+    Returns:
+        GlyphAtlas: Shared glyph atlas.
+    """
+    key = (font, colour, antialias)
+    atlas = _glyph_atlases.get(key)
+    if atlas is None:
+        atlas = _glyph_atlases[key] = GlyphAtlas(font, colour, antialias)
+    return atlas
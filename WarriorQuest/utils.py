@@ -1,7 +1,13 @@
-from constants import FONT, FONT_SM, FONT_LG, WIDTH, HEIGHT, PANEL_HEIGHT
+import math
+import pygame
+import assets
+from constants import WIDTH, HEIGHT, PANEL_HEIGHT
+from combat import USE_POTION
 from health_bar import HealthBar
-from enemy import animate_enemy
-from player import animate_player
+from enemy import pose_enemy, ENEMIES, BOSSES
+from player import animate_player, get_player_scale
+from frame_cache import FRAME_CACHE, CachedFrame
+from text_cache import render_text, get_glyph_atlas
 
 
 # layout
@@ -11,13 +17,13 @@ ENEMY_Y_POS = HEIGHT * 0.66
 BOSS_Y_POS = HEIGHT * 0.68
 HEALTHBAR_WIDTH = 250
 HEALTHBAR_HEIGHT = 25
+ENEMY_GRID = pygame.Rect(WIDTH // 2 + 20, HEIGHT - PANEL_HEIGHT + 15, 360, 120)
+ENEMY_GRID_ROWS = 6  # compact enemy rows per column in large waves
 SCALE_PLAYER = 3.5
 SCALE_ENEMY = 2.5
 SCALE_BOSS_SMALL = 4
 SCALE_BOSS_LARGE = 3.2
 
-BOSS_HITBOX = [(140, 220), (100, 190), (100, 210)]
-BOSS_HITBOX_OFFSET = [(-65, 260), (70, 230), (80, 260)]  # Bringer, Wizard1, Oldking
 BOSS_SCALE = [4, 3.2, 4.3]  # Bringer, Wizard, OldKing
 
 
@@ -32,66 +38,204 @@ def draw_bg(screen, background_img) -> None:
     screen.blit(background_img, (0, 0))
 
 
-def draw_panel(screen, panel_img, player, enemies, potion_button) -> None:
+def prepare_background(
+    background_img, width: int, height: int, opaque: bool = True
+) -> pygame.Surface:
     """
-    Draws the game panel, including player and enemy stats.
+    Scales a background once and converts it to the display's pixel format.
 
     Args:
-        screen (pygame.Surface): Game screen surface.
+        background_img (pygame.Surface): Background image at its original size.
+        width (int): Width to scale the background to.
+        height (int): Height to scale the background to.
+        opaque (bool): Whether to drop the alpha channel for faster blits. Defaults to True.
+
+    Returns:
+        pygame.Surface: Background ready to be blitted every frame.
+    """
+    background_img = pygame.transform.smoothscale(background_img, (width, height))
+    return background_img.convert() if opaque else background_img.convert_alpha()
+
+
+def draw_panel_background(screen, panel_img, potion_button) -> None:
+    """
+    Draws the static parts of the game panel.
+
+    Args:
+        screen (pygame.Surface): Surface to draw on.
         panel_img (pygame.Surface): Panel image to be drawn.
-        player (Player): Player object containing stats.
-        enemies (list): List of enemy objects.
         potion_button (Button): Potion button to be drawn.
     """
     screen.blit(panel_img, (0, HEIGHT - PANEL_HEIGHT))
+    screen.blit(potion_button.image, potion_button.rect)
+
 
+def draw_panel(screen, player, enemies, odds=None) -> list[pygame.Rect]:
+    """
+    Draws the player and enemy stats on top of the game panel.
+
+    Args:
+        screen (pygame.Surface): Game screen surface.
+        player (Player): Player object containing stats.
+        enemies (list): List of enemy objects.
+        odds (Solution): Win probability and best action from the battle solver,
+            drawn between the stats if given.
+
+    Returns:
+        list[pygame.Rect]: Regions of the screen that were drawn.
+    """
     # draw player stats
-    draw_text(
-        screen,
-        f"{player.name} HP: {player.hp}",
-        x=WIDTH // 4,
-        y=HEIGHT - PANEL_HEIGHT + 30,
-        colour="white",
-    )
-    draw_health_bar(
-        screen,
-        player.hp,
-        player.max_hp,
-        WIDTH // 4 - HEALTHBAR_WIDTH // 2,
-        HEIGHT - PANEL_HEIGHT + 50,
-    )
-    potion_button.draw()
-    draw_text(
-        screen, str(player.potions), x=140, y=HEIGHT - PANEL_HEIGHT * 0.35, size="sm"
-    )
+    rects = [
+        draw_text(
+            screen,
+            f"{player.name} HP: {player.hp}",
+            x=WIDTH // 4,
+            y=HEIGHT - PANEL_HEIGHT + 30,
+            colour="white",
+        ),
+        draw_health_bar(
+            screen,
+            player.hp,
+            player.max_hp,
+            WIDTH // 4 - HEALTHBAR_WIDTH // 2,
+            HEIGHT - PANEL_HEIGHT + 50,
+        ),
+        draw_text(
+            screen,
+            str(player.potions),
+            x=140,
+            y=HEIGHT - PANEL_HEIGHT * 0.35,
+            size="sm",
+        ),
+    ]
 
     # draw enemy stats
-    panel_offsets = [(90, 110), (20, 40)] if len(enemies) == 2 else [(30, 50)]
+    if len(enemies) > 2:
+        rects += draw_enemy_grid(screen, enemies)
+    elif enemies:
+        panel_offsets = [(90, 110), (20, 40)] if len(enemies) == 2 else [(30, 50)]
 
-    if enemies:
         for i, (text_offset, bar_offset) in enumerate(panel_offsets):
             x = WIDTH * 0.75
             text_y = HEIGHT - PANEL_HEIGHT + text_offset
             bar_y = HEIGHT - PANEL_HEIGHT + bar_offset
 
-            draw_text(
-                screen,
-                f"{enemies[i].display_name}",
-                x=x,
-                y=text_y,
-                colour="white",
+            rects += [
+                draw_text(
+                    screen,
+                    f"{enemies[i].display_name}",
+                    x=x,
+                    y=text_y,
+                    colour="white",
+                ),
+                draw_health_bar(
+                    screen,
+                    enemies[i].hp,
+                    enemies[i].max_hp,
+                    x - HEALTHBAR_WIDTH // 2,
+                    bar_y,
+                ),
+            ]
+
+    if odds:
+        rects.append(draw_odds(screen, odds, enemies))
+
+    return rects
+
+
+def draw_enemy_grid(screen, enemies) -> list[pygame.Rect]:
+    """
+    Draws the stats of a large wave as a grid of small health bars, filling columns
+    of up to ENEMY_GRID_ROWS rows. Names are shown while the wave fits in one column.
+
+    Args:
+        screen (pygame.Surface): Game screen surface.
+        enemies (list): List of enemy objects.
+
+    Returns:
+        list[pygame.Rect]: Regions of the screen that were drawn.
+    """
+    rows = min(len(enemies), ENEMY_GRID_ROWS)
+    columns = math.ceil(len(enemies) / rows)
+    cell_width = ENEMY_GRID.width // columns
+    cell_height = ENEMY_GRID.height // rows
+    name_width = ENEMY_GRID.width // 2 if columns == 1 else 0
+    bar_width = cell_width - name_width - 8
+    bar_height = max(cell_height - 6, 2)
+    rects = []
+
+    for i, enemy in enumerate(enemies):
+        x = ENEMY_GRID.x + i // rows * cell_width
+        y = ENEMY_GRID.y + i % rows * cell_height
+        if name_width:
+            rects.append(
+                draw_text(
+                    screen,
+                    enemy.display_name,
+                    x=x,
+                    y=y + (cell_height - assets.FONT_SM.get_height()) // 2,
+                    colour="white",
+                    size="sm",
+                    position="topleft",
+                )
             )
+        rects.append(
             draw_health_bar(
-                screen, enemies[i].hp, enemies[i].max_hp, x - HEALTHBAR_WIDTH // 2, bar_y
+                screen,
+                enemy.hp,
+                enemy.max_hp,
+                x + name_width,
+                y + (cell_height - bar_height) // 2,
+                bar_width,
+                bar_height,
             )
+        )
+    return rects
+
+
+def draw_odds(screen, odds, enemies) -> pygame.Rect:
+    """
+    Draws the chance of winning the battle and, on the player's turn, the action
+    that gives the best chance, or an ellipsis while they are being solved.
+
+    Args:
+        screen (pygame.Surface): Game screen surface.
+        odds (Solution): Win probability and best action from the battle solver.
+        enemies (list): List of enemy objects, indexed by the action.
+
+    Returns:
+        pygame.Rect: Region of the screen that was drawn.
+    """
+    # rounded down, so only a certain win reads 100%, give or take float error
+    if odds.win_probability is None:
+        text = "WIN ..."
+    else:
+        text = f"WIN {math.floor(odds.win_probability * 1000 + 1e-9) / 10:.1f}%"
+    if odds.action == USE_POTION:
+        text += "\nDRINK POTION"
+    elif odds.action is not None:
+        text += f"\nATTACK {enemies[odds.action].display_name.upper()}"
+
+    return draw_text(
+        screen,
+        text,
+        x=WIDTH // 4 + 70,  # beside the potion button
+        y=HEIGHT - PANEL_HEIGHT * 0.3,
+        colour="yellow",
+        size="sm",
+    )
 
 
 def draw_text(
     screen, text, x, y, colour="white", size="med", position="center"
-) -> None:
+) -> pygame.Rect:
     """
     Renders and draws text on the screen.
 
+    Numbers at the end of a line, such as the value of "HP: 57", are drawn from a
+    glyph atlas and the rest of the line is reused from the text cache, so
+    changing values don't render new surfaces.
+
     Args:
         screen (pygame.Surface): Game screen surface.
         text (str): Text to be drawn.
@@ -100,25 +244,53 @@ def draw_text(
         colour (str): Colourof the text. Defaults to "white".
         size (str): Font size ("sm", "med", "lg"). Defaults to "med".
         position (str): Position of the text ("center", "topleft"). Defaults to "center".
+
+    Returns:
+        pygame.Rect: Region of the screen covered by the text.
     """
-    font = {"sm": FONT_SM, "med": FONT, "lg": FONT_LG}.get(size, FONT)
+    font = {"sm": assets.FONT_SM, "med": assets.FONT, "lg": assets.FONT_LG}.get(
+        size, assets.FONT
+    )
     lines = text.split("\n")
     y_offset = 0
+    rects = []
 
+    glyph_atlas = get_glyph_atlas(font, colour, False)
     for line in lines:
-        img = font.render(line, False, colour)
-        img_rect = img.get_rect()
+        label, number = glyph_atlas.split_suffix(line)
+        img = render_text(font, label, False, colour) if label else None
+        label_width = img.get_width() if img else 0
+        img_rect = pygame.Rect(
+            0,
+            0,
+            label_width + glyph_atlas.get_size(number)[0],
+            img.get_height() if img else glyph_atlas.height,
+        )
 
         if position == "center":
             img_rect.center = (x, y + y_offset)
         elif position == "topleft":
             img_rect.topleft = (x, y + y_offset)
 
-        screen.blit(img, img_rect)
+        if img is not None:
+            screen.blit(img, img_rect)
+        if number:
+            glyph_atlas.draw(screen, number, (img_rect.x + label_width, img_rect.y))
+        rects.append(img_rect)
         y_offset += img_rect.height
 
+    return rects[0].unionall(rects[1:])
 
-def draw_health_bar(screen, hp: int, max_hp: int, x: int, y: int) -> None:
+
+def draw_health_bar(
+    screen,
+    hp: int,
+    max_hp: int,
+    x: int,
+    y: int,
+    width: int = HEALTHBAR_WIDTH,
+    height: int = HEALTHBAR_HEIGHT,
+) -> pygame.Rect:
     """
     Draws a health bar on the screen.
 
@@ -128,47 +300,91 @@ def draw_health_bar(screen, hp: int, max_hp: int, x: int, y: int) -> None:
         max_hp (int): Maximum health of the character.
         x (int): X-coordinate for the health bar position.
         y (int): Y-coordinate for the health bar position.
+        width (int): Width of the health bar. Defaults to HEALTHBAR_WIDTH.
+        height (int): Height of the health bar. Defaults to HEALTHBAR_HEIGHT.
+
+    Returns:
+        pygame.Rect: Region of the screen covered by the health bar.
     """
-    health_bar = HealthBar(
-        width=HEALTHBAR_WIDTH, height=HEALTHBAR_HEIGHT, max_hp=max_hp
-    )
-    health_bar.draw(screen, hp=hp, x=x, y=y)
+    health_bar = HealthBar(width=width, height=height, max_hp=max_hp)
+    return health_bar.draw(screen, hp=hp, x=x, y=y)
 
 
-def draw_characters(screen, player, enemies, animations, current_level: int) -> None:
+def layout_characters(
+    player, enemies, animations, current_level: int
+) -> list[CachedFrame]:
     """
-    Draws the player and enemies on the screen.
+    Places the player and enemies at their battle heights and fits the enemy
+    hitboxes to their current frames, without drawing anything.
 
     Args:
-        screen (pygame.Surface): Game screen surface.
-        player (Player): Player object to be drawn.
-        enemies (list): List of enemy objects to be drawn.
+        player (Player): Player object to place.
+        enemies (list): List of enemy objects to place.
         animations (dict): Dictionary of animations for the characters.
-        current_level (int): Current level of the game, used for boss scaling and hitbox.
+        current_level (int): Current level of the game, used for boss scaling.
+
+    Returns:
+        list[CachedFrame]: Frame each enemy is drawn with, at its hitbox.
     """
     player.y_pos = PLAYER_Y_POS
-    animate_player(screen, player, animations, scale=SCALE_PLAYER)
+    frames = []
 
     for enemy in enemies:
         if enemy.type == "boss":
-            width, height = BOSS_HITBOX[current_level - 1]
-            x_pos_offset, y_pos_offset = BOSS_HITBOX_OFFSET[current_level - 1]
             enemy.y_pos = BOSS_Y_POS
-            enemy.update_hitbox(
-                x_pos=enemy.x_pos - x_pos_offset,
-                y_pos=BOSS_Y_POS - y_pos_offset,
-                width=width,
-                height=height,
-            )
             scale = BOSS_SCALE[current_level - 1]
         else:
             enemy.y_pos = ENEMY_Y_POS
-            enemy.update_hitbox(enemy.x_pos - 50, ENEMY_Y_POS - 140)
             scale = SCALE_ENEMY
+        frames.append(pose_enemy(enemy, animations, scale))
 
-        animate_enemy(
-            screen=screen,
-            animations=animations,
-            enemy=enemy,
-            scale=scale,
-        )
+    return frames
+
+
+def draw_characters(
+    screen, player, enemies, animations, current_level: int
+) -> list[pygame.Rect]:
+    """
+    Draws the player and enemies on the screen.
+
+    Args:
+        screen (pygame.Surface): Game screen surface.
+        player (Player): Player object to be drawn.
+        enemies (list): List of enemy objects to be drawn.
+        animations (dict): Dictionary of animations for the characters.
+        current_level (int): Current level of the game, used for boss scaling.
+
+    Returns:
+        list[pygame.Rect]: Regions of the screen that were drawn.
+    """
+    frames = layout_characters(player, enemies, animations, current_level)
+    rects = [animate_player(screen, player, animations, scale=SCALE_PLAYER)]
+
+    for enemy, frame in zip(enemies, frames):
+        rects.append(screen.blit(frame.image, enemy.hitbox))
+
+    return rects
+
+
+def warm_up_frame_cache(player, animations, current_level: int) -> None:
+    """
+    Pre-scales every frame that can be drawn during a level so the battle loop
+    never rescales a sprite.
+
+    Args:
+        player (Player): Player object whose animations are prepared.
+        animations (dict): Dictionary of animations for the characters.
+        current_level (int): Current level of the game, used to pick the boss and its scale.
+    """
+    FRAME_CACHE.warm_up(
+        animations[player.name.lower()].values(),
+        get_player_scale(player.name, SCALE_PLAYER),
+    )
+
+    for name, *_ in ENEMIES:
+        FRAME_CACHE.warm_up(animations[name.lower()].values(), SCALE_ENEMY)
+
+    boss_name = BOSSES[current_level - 1][0]
+    FRAME_CACHE.warm_up(
+        animations[boss_name.lower()].values(), BOSS_SCALE[current_level - 1]
+    )